@@ -0,0 +1,70 @@
+# engine/animation.py
+"""
+Clips de animación inmutables y compartibles.
+
+Un AnimationClip guarda las Surfaces de una animación y la tabla de tiempos
+acumulados (fin de cada frame en ms). El frame que corresponde a un tiempo
+transcurrido se busca con bisect, así que un dt grande salta directo al frame
+correcto en vez de avanzar de a uno. Los objetos solo guardan cuánto tiempo
+llevan en el clip: miles de sprites pueden compartir el mismo clip.
+
+Los frames de un atlas recortado (atlas_packer) traen su lugar dentro del
+lienzo original (offsets) para dibujarlos donde iban.
+"""
+
+from bisect import bisect_right
+
+
+class AnimationClip:
+    """
+    frames: [(Surface, duration_ms), ...] como devuelve
+    Spritesheet.get_animation_frames(..., with_duration=True).
+    Se indexa igual que esa lista: clip[i] -> (Surface, duration_ms).
+    offsets: por frame (ox, oy, sw, sh) como Spritesheet.get_offset(), o
+    None si el frame no está recortado.
+    """
+
+    __slots__ = ("name", "surfaces", "durations", "ends", "total", "offsets")
+
+    def __init__(self, frames, name=None, offsets=None):
+        if not frames:
+            raise ValueError(f"El clip '{name}' no tiene frames")
+        self.name = name
+        self.surfaces = tuple(surf for surf, _ in frames)
+        # Frames sin duración (o 0) cuentan como 1 ms para que la tabla sea creciente
+        self.durations = tuple(max(1, dur or 0) for _, dur in frames)
+        ends = []
+        t = 0
+        for dur in self.durations:
+            t += dur
+            ends.append(t)
+        self.ends = tuple(ends)
+        self.total = t
+
+        self.offsets = tuple(offsets) if offsets else (None,) * len(self.surfaces)
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def __getitem__(self, i):
+        return self.surfaces[i], self.durations[i]
+
+    def index_at(self, t):
+        """Índice del frame activo a los t ms desde el inicio (t en 0..total)."""
+        i = bisect_right(self.ends, t)
+        return i if i < len(self.ends) else len(self.ends) - 1
+
+    def source_size(self, i=0):
+        """Tamaño del frame i sin recortar (el que usan los rects de colisión)."""
+        off = self.offsets[i]
+        return off[2:] if off else self.surfaces[i].get_size()
+
+    def frame_at(self, t):
+        """Surface activa a los t ms, dando la vuelta si t pasa del total."""
+        return self.surfaces[self.index_at(t % self.total)]
+
+
+def build_clips(animations):
+    """{nombre: [(Surface, ms), ...]} -> {nombre: AnimationClip}; los clips ya armados se reutilizan."""
+    return {name: frames if isinstance(frames, AnimationClip) else AnimationClip(frames, name)
+            for name, frames in animations.items()}
@@ -1,51 +1,175 @@
+import io
 import os
-from .sprite_sheet import Spritesheet
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .sound_bank import SoundBank, sintetizar_muestras
+from .sprite_sheet import Spritesheet, convert_alpha
+from .surface_cache import surface_bytes
+
+
+def _decode_image(image_path):
+    """Lee y decodifica un PNG (sin convert_alpha: eso va en el hilo principal)."""
+    import pygame
+    with open(image_path, "rb") as f:
+        data = f.read()
+    return pygame.image.load(io.BytesIO(data), os.path.basename(image_path))
+
+
+def _decode_spritesheet(json_path, cache_path):
+    index = Spritesheet.load_index(json_path, cache_path)
+    return index, _decode_image(index["image"])
+
+
+def _prepare_sound_bank(sound_dir, efectos, formato):
+    """
+    {nombre: ruta del .wav/.ogg o muestras sintetizadas} de los efectos
+    (sin pygame: corre en los hilos de carga). formato: (frecuencia,
+    canales) del mixer si es de 16 bits, o None (solo archivos).
+    """
+    preparados = {}
+    for name in efectos:
+        for ext in (".wav", ".ogg"):
+            path = os.path.join(sound_dir, name + ext)
+            if os.path.exists(path):
+                preparados[name] = path
+                break
+        else:
+            if formato is not None:
+                muestras = sintetizar_muestras(name, *formato)
+                if muestras is not None:
+                    preparados[name] = muestras
+    return preparados
+
+
+def _sound_format():
+    """(frecuencia, canales) del mixer para sintetizar, o None si no es de 16 bits."""
+    import pygame
+    frecuencia, bits, canales = pygame.mixer.get_init()
+    return (frecuencia, canales) if abs(bits) == 16 else None
+
+
+_DECODERS = {
+    "spritesheet": _decode_spritesheet,
+    "image": _decode_image,
+    "sound_bank": _prepare_sound_bank,
+}
+
+
+def _sound_bytes(sound):
+    """Bytes de muestras PCM de un Sound (en el formato del mixer)."""
+    import pygame
+    init = pygame.mixer.get_init()
+    if init is None:
+        return 0
+    frecuencia, bits, canales = init
+    return int(sound.get_length() * frecuencia) * canales * (abs(bits) // 8)
+
 
 class AssetManager:
-    def __init__(self):
+    """
+    Spritesheets, imágenes y sonidos cargados por nombre (único entre
+    spritesheets e imágenes; un sonido puede llamarse igual que una imagen).
+
+    Memoria: cada asset se mide en bytes de píxeles (o de muestras, los
+    sonidos) y memory_report() lo resume por asset y por categoría, junto
+    con los caches de frames derivados registrados con track_cache().
+
+    budget_bytes: si se indica, al pasarse se liberan los spritesheets e
+    imágenes usados hace más tiempo que no estén fijados con pin(); los
+    spritesheets con dueños (Spritesheet.acquire) tampoco se liberan.
+    get_spritesheet() / get_image() los vuelven a cargar al pedirlos.
+    """
+
+    CATEGORIAS = ("spritesheet", "imagen", "sonido", "derivados")
+
+    def __init__(self, budget_bytes=None):
         self.spritesheets = {}  # name -> Spritesheet instance
         self.images = {}        # name -> pygame.Surface
         self.sounds = {}        # name -> Sound (if se usa)
+        self.sound_bank = None  # Efectos con canales reservados (load_sound_bank)
+        self._bank_channels = 8
+
+        # Presupuesto: orden de uso (del más viejo al más reciente), de dónde
+        # recargar cada asset liberado y los que no se liberan nunca
+        self.budget_bytes = budget_bytes
+        self._lru = OrderedDict()  # name -> categoría
+        self._sources = {}         # name -> (categoría, args de load_*)
+        self._pinned = set()
+        self._caches = {}          # name -> SurfaceCache de frames derivados
+        self.evictions = 0
+        self.reloads = 0
 
-    def load_spritesheet(self, name, json_path):
+        # Carga asíncrona: [(tipo, name, args)] en cola y futures en curso
+        self._queue = []
+        self._futures = []
+        self._pool = None
+        self._on_progress = None
+        self.loaded = 0
+        self.total = 0
+
+    def load_spritesheet(self, name, json_path, cache_path=None):
         """
         Carga un spritesheet (JSON + image) y lo guarda bajo la clave name.
         json_path: ruta al archivo json del spritesheet (puede contener ruta absoluta en meta.image)
+        cache_path: archivo opcional con el índice precompilado (ver Spritesheet)
         """
         if name in self.spritesheets:
+            self._touch(name, "spritesheet")
             return self.spritesheets[name]
-        sheet = Spritesheet(json_path)
+        sheet = Spritesheet(json_path, cache_path=cache_path)
         self.spritesheets[name] = sheet
+        self._register(name, "spritesheet", (json_path, cache_path))
         return sheet
 
+    def get_spritesheet(self, name):
+        """Spritesheet por nombre; si fue liberado por el presupuesto se recarga."""
+        sheet = self.spritesheets.get(name)
+        if sheet is not None:
+            self._touch(name, "spritesheet")
+            return sheet
+        fuente = self._sources.get(name)
+        if fuente is None or fuente[0] != "spritesheet":
+            return None
+        return self.load_spritesheet(name, *fuente[1])
+
     def load_image(self, name, image_path):
         """
         Carga una imagen estática y la guarda por nombre.
         """
         import pygame
         if name in self.images:
+            self._touch(name, "imagen")
             return self.images[name]
-        surf = pygame.image.load(image_path).convert_alpha()
+        surf = convert_alpha(pygame.image.load(image_path))
         self.images[name] = surf
+        self._register(name, "imagen", (image_path,))
         return surf
 
-    def get_sprite(self, sheet_name, sprite_name):
+    def get_sprite(self, sheet_name, sprite_name, owner=None):
         """
         Obtiene una Surface con el sprite individual.
+        owner: quien la guarda; el spritesheet no se libera mientras viva
+        (ver Spritesheet.acquire).
         """
-        sheet = self.spritesheets.get(sheet_name)
+        sheet = self.get_spritesheet(sheet_name)
         if not sheet:
             raise KeyError(f"Spritesheet '{sheet_name}' no cargado")
+        if owner is not None:
+            sheet.acquire(owner)
         return sheet.get_frame(sprite_name)
 
-    def get_animation(self, sheet_name, anim_name):
+    def get_animation(self, sheet_name, anim_name, owner=None):
         """
         Obtiene lista de Surfaces para una animación.
         anim_name puede ser un prefijo (p. ej. 'Sprites') que coincida con 'Sprites 0.ase', etc.
+        owner: como en get_sprite().
         """
-        sheet = self.spritesheets.get(sheet_name)
+        sheet = self.get_spritesheet(sheet_name)
         if not sheet:
             return []
+        if owner is not None:
+            sheet.acquire(owner)
         # intentamos por nombre exacto de animación dentro del json meta.frameTags si existiera
         frames = sheet.get_animation_frames(anim_name)
         if frames:
@@ -54,5 +178,253 @@ class AssetManager:
         return sheet.get_animation_frames_by_prefix(anim_name)
 
     def get_image(self, name):
-        return self.images.get(name)
+        """Imagen por nombre; si fue liberada por el presupuesto se recarga."""
+        surf = self.images.get(name)
+        if surf is not None:
+            self._touch(name, "imagen")
+            return surf
+        fuente = self._sources.get(name)
+        if fuente is None or fuente[0] != "imagen":
+            return None
+        return self.load_image(name, *fuente[1])
+
+    def load_sound(self, name, sound_path):
+        """
+        Carga un sonido y lo guarda por nombre. El mixer se inicializa
+        recién aquí, con el primer sonido.
+        """
+        import pygame
+        from . import startup
+        if name in self.sounds:
+            return self.sounds[name]
+        startup.ensure("mixer")
+        sound = pygame.mixer.Sound(sound_path)
+        self.sounds[name] = sound
+        return sound
+
+    def load_sound_bank(self, sound_dir, efectos, channels=8):
+        """
+        Precarga los efectos {nombre: prioridad} desde sound_dir/<nombre>.wav
+        (u .ogg) en un SoundBank con `channels` canales reservados. Los que no
+        tienen archivo se sintetizan. Devuelve None si no hay dispositivo de audio.
+        Con la carga asíncrona conviene queue_sound_bank().
+        """
+        if self.sound_bank is not None:
+            return self.sound_bank
+        if not self._ensure_mixer():
+            return None
+        preparados = _prepare_sound_bank(sound_dir, efectos, _sound_format())
+        return self._build_sound_bank(efectos, channels, preparados)
+
+    def _ensure_mixer(self):
+        import pygame
+        from . import startup
+        try:
+            startup.ensure("mixer")
+        except pygame.error as e:
+            print(f"Sin audio: {e}")
+            return False
+        return True
+
+    def _build_sound_bank(self, efectos, channels, preparados):
+        """Arma el SoundBank (hilo principal) con lo que dejó _prepare_sound_bank."""
+        import pygame
+        bank = SoundBank(channels)
+        for name, prioridad in efectos.items():
+            fuente = preparados.get(name)
+            if fuente is None:
+                continue
+            if isinstance(fuente, str):
+                sound = self.load_sound(name, fuente)
+            else:
+                sound = self.sounds[name] = pygame.mixer.Sound(buffer=fuente)
+            bank.add(name, sound, prioridad)
+        self.sound_bank = bank
+        return bank
+
+
+    # --- Carga asíncrona ---
+    def queue_spritesheet(self, name, json_path, cache_path=None):
+        """Encola un spritesheet para start_loading()."""
+        self._queue.append(("spritesheet", name, (json_path, cache_path)))
+
+    def queue_image(self, name, image_path):
+        """Encola una imagen estática para start_loading()."""
+        self._queue.append(("image", name, (image_path,)))
+
+    def queue_sound_bank(self, sound_dir, efectos, channels=8):
+        """
+        Encola load_sound_bank() para start_loading(): la búsqueda de
+        archivos y la síntesis de los que faltan van en el pool de hilos, y
+        el SoundBank queda en self.sound_bank al terminar. El mixer se
+        inicializa ya (aquí), para conocer su formato.
+        """
+        if self.sound_bank is not None or not self._ensure_mixer():
+            return
+        self._bank_channels = channels
+        self._queue.append(("sound_bank", "sound_bank", (sound_dir, efectos, _sound_format())))
+
+    def start_loading(self, on_progress=None, max_workers=4):
+        """
+        Lanza lo encolado en un pool de hilos: lectura de archivos, parseo
+        del JSON, decodificación de PNG y síntesis de sonidos. convert_alpha
+        y el armado final se hacen en poll(), desde el hilo principal.
+        on_progress(loaded, total) se llama cada vez que termina un asset.
+        """
+        self._on_progress = on_progress
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        for kind, name, args in self._queue:
+            self._futures.append((kind, name, args, self._pool.submit(_DECODERS[kind], *args)))
+        self.total += len(self._queue)
+        self._queue = []
+
+    def poll(self):
+        """
+        Termina (en el hilo principal) los assets ya decodificados.
+        Devuelve True cuando no queda nada pendiente. Los errores de carga
+        se propagan aquí.
+        """
+        pendientes = []
+        for kind, name, args, future in self._futures:
+            if not future.done():
+                pendientes.append((kind, name, args, future))
+                continue
+            if kind == "spritesheet":
+                index, image = future.result()
+                self.spritesheets[name] = Spritesheet(args[0], index=index, image=image)
+                self._register(name, "spritesheet", args)
+            elif kind == "sound_bank":
+                self._build_sound_bank(args[1], self._bank_channels, future.result())
+            else:
+                self.images[name] = convert_alpha(future.result())
+                self._register(name, "imagen", args)
+            self.loaded += 1
+            if self._on_progress:
+                self._on_progress(self.loaded, self.total)
+        self._futures = pendientes
+
+        if not pendientes and self._pool:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        return not pendientes
+
+    def wait(self):
+        """Bloquea hasta terminar la carga (modo headless, pruebas)."""
+        for *_, future in self._futures:
+            future.result()
+        self.poll()
+
+    @property
+    def progress(self):
+        """Fracción cargada (0..1)."""
+        return self.loaded / self.total if self.total else 1.0
+
+    # --- Memoria y presupuesto ---
+    def pin(self, *names):
+        """Fija assets: el presupuesto no los libera (p. ej. los de la escena actual)."""
+        self._pinned.update(names)
+
+    def unpin(self, *names):
+        self._pinned.difference_update(names)
+
+    def track_cache(self, name, cache):
+        """Registra un SurfaceCache de frames derivados para contarlo y limpiarlo al liberar."""
+        self._caches[name] = cache
+
+    def _touch(self, name, categoria):
+        self._lru[name] = categoria
+        self._lru.move_to_end(name)
+
+    def _register(self, name, categoria, args):
+        if name in self._sources:
+            self.reloads += 1
+        self._sources[name] = (categoria, args)
+        self._touch(name, categoria)
+        self._enforce_budget(keep=name)
+
+    def asset_bytes(self, name, categoria=None):
+        """
+        Bytes que ocupa el asset cargado `name` (0 si no está en memoria).
+        categoria desempata entre tipos (p. ej. la imagen y el sonido "red").
+        """
+        if name in self.spritesheets and categoria in (None, "spritesheet"):
+            return self.spritesheets[name].memory_bytes()
+        if name in self.images and categoria in (None, "imagen"):
+            return surface_bytes(self.images[name])
+        if name in self.sounds and categoria in (None, "sonido"):
+            return _sound_bytes(self.sounds[name])
+        return 0
+
+    def _assets(self):
+        """(categoría, nombre) de todo lo que está en memoria."""
+        yield from (("spritesheet", name) for name in self.spritesheets)
+        yield from (("imagen", name) for name in self.images)
+        yield from (("sonido", name) for name in self.sounds)
+
+    def memory_total(self):
+        return (sum(self.asset_bytes(name, categoria) for categoria, name in self._assets())
+                + sum(cache.bytes for cache in self._caches.values()))
+
+    def memory_report(self):
+        """
+        {"total", "budget", "categorias": {categoría: bytes},
+         "assets": {categoría: {nombre: {"bytes", "pinned"}}}, "evictions", "reloads"}.
+        Los caches registrados van en la categoría "derivados". pinned: el
+        presupuesto no lo libera (fijados, sonidos y caches).
+        """
+        assets = {categoria: {} for categoria in self.CATEGORIAS}
+        for categoria, name in self._assets():
+            assets[categoria][name] = {"bytes": self.asset_bytes(name, categoria),
+                                       "pinned": name in self._pinned or categoria == "sonido"}
+        for name, cache in self._caches.items():
+            assets["derivados"][name] = {"bytes": cache.bytes, "pinned": True}
+
+        categorias = {categoria: sum(info["bytes"] for info in grupo.values())
+                      for categoria, grupo in assets.items()}
+        return {
+            "total": sum(categorias.values()),
+            "budget": self.budget_bytes,
+            "categorias": categorias,
+            "assets": assets,
+            "evictions": self.evictions,
+            "reloads": self.reloads,
+        }
+
+    def evict(self, name):
+        """
+        Libera el spritesheet o la imagen `name` (se recarga al pedirlo).
+        Devuelve los bytes liberados. Un spritesheet con dueños (acquire)
+        no se libera (sus frames siguen en memoria): devuelve 0.
+        """
+        if name in self.spritesheets:
+            if self.spritesheets[name].in_use():
+                return 0
+            liberado = self.asset_bytes(name, "spritesheet")
+            frames = self.spritesheets.pop(name).loaded_frames()
+        elif name in self.images:
+            liberado = self.asset_bytes(name, "imagen")
+            frames = [self.images.pop(name)]
+        else:
+            return 0
+        # Las transformaciones en cache apuntan al atlas: también se sueltan
+        for cache in self._caches.values():
+            cache.forget(frames)
+        self._lru.pop(name, None)
+        self.evictions += 1
+        return liberado
+
+    def set_budget(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._enforce_budget()
 
+    def _enforce_budget(self, keep=None):
+        """Libera lo usado hace más tiempo (sin fijar) hasta entrar en budget_bytes."""
+        if self.budget_bytes is None:
+            return
+        total = self.memory_total()
+        for name in list(self._lru):
+            if total <= self.budget_bytes:
+                break
+            if name == keep or name in self._pinned:
+                continue
+            total -= self.evict(name)
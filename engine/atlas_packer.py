@@ -0,0 +1,296 @@
+# engine/atlas_packer.py
+"""
+Empaquetador de atlas de sprites (herramienta offline).
+
+Uso desde la línea de comandos:
+    python -m engine.atlas_packer assets/sprites/sprites.json assets/sprites/pelota.png=32x32 \\
+        --salida assets/sprites/atlas.json
+
+Entradas:
+  - JSON de spritesheet (formato hash de LibreSprite/Aseprite, el que lee
+    Spritesheet): todos sus frames con nombre, duración y frameTags.
+  - imagen suelta, opcionalmente cortada en celdas (ruta.png=32x32): frames
+    "<nombre> 0", "<nombre> 1", ... y un tag <nombre> que los cubre.
+
+A cada frame se le recortan los bordes totalmente transparentes y los
+frames que quedan idénticos se guardan una sola vez. Los recortes se
+empaquetan por estantes (de más alto a más bajo) probando varios anchos y
+se queda el atlas de menor área. El JSON de salida es el mismo formato de
+entrada con trimmed / spriteSourceSize / sourceSize, así Spritesheet
+dibuja cada frame en su posición original sin los píxeles vacíos.
+
+Si no entra todo en un atlas de --max x --max se abren más páginas
+(atlas.json, atlas_1.json, ...); los frames de una entrada quedan siempre
+en la misma página para no partir sus tags.
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+
+import pygame
+
+
+class Frame:
+    """Frame recortado: Surface sin bordes vacíos y su lugar en el lienzo original."""
+
+    __slots__ = ("name", "surface", "ox", "oy", "source_w", "source_h", "duration", "key")
+
+    def __init__(self, name, surface, ox, oy, source_w, source_h, duration):
+        self.name = name
+        self.surface = surface
+        self.ox = ox
+        self.oy = oy
+        self.source_w = source_w
+        self.source_h = source_h
+        self.duration = duration
+        w, h = surface.get_size()
+        self.key = (w, h, pygame.image.tobytes(surface, "RGBA"))
+
+
+def _con_alpha(surf):
+    """Copia RGBA de surf (las imágenes sin canal alfa no tienen nada que recortar)."""
+    if surf.get_flags() & pygame.SRCALPHA:
+        return surf
+    copia = pygame.Surface(surf.get_size(), pygame.SRCALPHA)
+    copia.blit(surf, (0, 0))
+    return copia
+
+
+def recortar(name, surf, duration=100, ox=0, oy=0, source_size=None):
+    """
+    Frame con los bordes transparentes de surf quitados. ox / oy /
+    source_size: lugar de surf dentro del lienzo original (si ya venía
+    recortado).
+    """
+    surf = _con_alpha(surf)
+    source_w, source_h = source_size or surf.get_size()
+    r = surf.get_bounding_rect()
+    if r.w == 0 or r.h == 0:
+        # Frame vacío: un píxel transparente para no perder el nombre
+        r = pygame.Rect(0, 0, 1, 1)
+    return Frame(name, surf.subsurface(r).copy(), ox + r.x, oy + r.y, source_w, source_h, duration)
+
+
+def leer_spritesheet(json_path):
+    """Frames recortados y tags [(nombre, desde, hasta, dirección)] de un JSON de spritesheet."""
+    with open(json_path, "r") as f:
+        data = json.load(f)
+    image_path = data["meta"]["image"]
+    if not os.path.isabs(image_path):
+        image_path = os.path.join(os.path.dirname(json_path), image_path)
+    image = _con_alpha(pygame.image.load(image_path))
+
+    frames = []
+    for name, info in data["frames"].items():
+        if info.get("rotated"):
+            raise ValueError(f"{json_path}: el frame '{name}' está rotado (no soportado)")
+        r = info["frame"]
+        sss = info.get("spriteSourceSize", {"x": 0, "y": 0})
+        source = info.get("sourceSize", {"w": r["w"], "h": r["h"]})
+        sub = image.subsurface(pygame.Rect(r["x"], r["y"], r["w"], r["h"]))
+        frames.append(recortar(name, sub, info.get("duration", 100), sss["x"], sss["y"],
+                               (source["w"], source["h"])))
+
+    tags = [(t["name"], t["from"], t["to"], t.get("direction", "forward"))
+            for t in data["meta"].get("frameTags", [])]
+    return frames, tags
+
+
+def leer_imagen(image_path, celda=None, duration=100):
+    """Frames de una imagen suelta cortada en celdas de `celda` (w, h); sin celda, un solo frame."""
+    image = _con_alpha(pygame.image.load(image_path))
+    nombre = os.path.splitext(os.path.basename(image_path))[0]
+    cw, ch = celda or image.get_size()
+    frames = []
+    for y in range(0, image.get_height() - ch + 1, ch):
+        for x in range(0, image.get_width() - cw + 1, cw):
+            sub = image.subsurface(pygame.Rect(x, y, cw, ch))
+            frames.append(recortar(f"{nombre} {len(frames)}", sub, duration))
+    if not frames:
+        raise ValueError(f"{image_path}: la celda {cw}x{ch} no entra en la imagen")
+    return frames, [(nombre, 0, len(frames) - 1, "forward")]
+
+
+def leer_entrada(entrada, duration=100):
+    """'x.json' o 'x.png[=WxH]' -> (frames, tags)."""
+    ruta, _, celda = entrada.partition("=")
+    if ruta.lower().endswith(".json"):
+        return leer_spritesheet(ruta)
+    tam = tuple(int(v) for v in celda.lower().split("x")) if celda else None
+    return leer_imagen(ruta, tam, duration)
+
+
+# --- Empaquetado ---
+def _estantes(tamanos, ancho, alto_max, padding):
+    """
+    Coloca (w, h) por estantes dentro de `ancho`. Devuelve ([(x, y)], ancho
+    usado, alto usado) en el orden de tamanos, o None si no entra.
+    """
+    orden = sorted(range(len(tamanos)), key=lambda i: (-tamanos[i][1], -tamanos[i][0]))
+    pos = [None] * len(tamanos)
+    x = y = alto_estante = ancho_usado = 0
+    for i in orden:
+        w, h = tamanos[i]
+        if w > ancho:
+            return None
+        if x + w > ancho:
+            # Estante nuevo debajo del anterior
+            y += alto_estante + padding
+            x = alto_estante = 0
+        pos[i] = (x, y)
+        x += w + padding
+        alto_estante = max(alto_estante, h)
+        ancho_usado = max(ancho_usado, x - padding)
+    alto = y + alto_estante
+    if alto > alto_max:
+        return None
+    return pos, ancho_usado, alto
+
+
+def empaquetar(tamanos, lado_max=2048, padding=1):
+    """
+    Mejor acomodo de los rectángulos (w, h) en un atlas de a lo sumo
+    lado_max x lado_max: ([(x, y)], (ancho, alto)) o None si no entran.
+    """
+    mejor = None
+    ancho = 64
+    while True:
+        ancho = min(ancho, lado_max)
+        res = _estantes(tamanos, ancho, lado_max, padding)
+        if res is not None:
+            pos, w, h = res
+            # Menor área y, a igual área, el más cuadrado
+            clave = (w * h, abs(w - h))
+            if mejor is None or clave < mejor[0]:
+                mejor = (clave, pos, (w, h))
+        if ancho >= lado_max:
+            break
+        ancho *= 2
+    return None if mejor is None else (mejor[1], mejor[2])
+
+
+def _unicos(frames):
+    """Frames con píxeles distintos (los repetidos comparten lugar en el atlas)."""
+    vistos = {}
+    for f in frames:
+        vistos.setdefault(f.key, f)
+    return list(vistos.values())
+
+
+def _acomodar(entradas, lado_max, padding):
+    """(frames únicos, acomodo de empaquetar()) de un grupo de entradas, o None si no entra."""
+    unicos = _unicos([f for frames, _ in entradas for f in frames])
+    res = empaquetar([f.surface.get_size() for f in unicos], lado_max, padding)
+    return None if res is None else (unicos, res)
+
+
+def paginar(entradas, lado_max=2048, padding=1):
+    """
+    Reparte las entradas [(frames, tags)] en páginas que entren en
+    lado_max, sin partir ninguna entrada. Devuelve [(entradas, acomodo)]
+    con el acomodo de _acomodar().
+    """
+    paginas = []
+    actual = []
+    acomodo = None
+    for entrada in entradas:
+        res = _acomodar(actual + [entrada], lado_max, padding)
+        if res is None and actual:
+            # No entra con lo anterior: se cierra la página y se abre otra
+            paginas.append((actual, acomodo))
+            actual = []
+            res = _acomodar([entrada], lado_max, padding)
+        if res is None:
+            raise ValueError(f"Un grupo de frames no entra en un atlas de {lado_max}x{lado_max}")
+        actual.append(entrada)
+        acomodo = res
+    if actual:
+        paginas.append((actual, acomodo))
+    return paginas
+
+
+def escribir_pagina(json_path, entradas, acomodo):
+    """Guarda el PNG y el JSON (formato de Spritesheet) de una página."""
+    unicos, (pos, (ancho, alto)) = acomodo
+    lugar = {f.key: p for f, p in zip(unicos, pos)}
+
+    atlas = pygame.Surface((max(1, ancho), max(1, alto)), pygame.SRCALPHA)
+    atlas.fill((0, 0, 0, 0))
+    for f, p in zip(unicos, pos):
+        # MAX sobre el fondo en cero copia los píxeles tal cual (sin mezclar el alfa)
+        atlas.blit(f.surface, p, special_flags=pygame.BLEND_RGBA_MAX)
+
+    frames_json = {}
+    tags_json = []
+    for frames, tags in entradas:
+        base = len(frames_json)
+        for f in frames:
+            if f.name in frames_json:
+                raise ValueError(f"Frame repetido: '{f.name}'")
+            x, y = lugar[f.key]
+            w, h = f.surface.get_size()
+            frames_json[f.name] = {
+                "frame": {"x": x, "y": y, "w": w, "h": h},
+                "rotated": False,
+                "trimmed": (f.ox, f.oy, w, h) != (0, 0, f.source_w, f.source_h),
+                "spriteSourceSize": {"x": f.ox, "y": f.oy, "w": w, "h": h},
+                "sourceSize": {"w": f.source_w, "h": f.source_h},
+                "duration": f.duration,
+            }
+        for name, desde, hasta, direccion in tags:
+            tags_json.append({"name": name, "from": base + desde, "to": base + hasta,
+                              "direction": direccion})
+
+    image_path = os.path.splitext(json_path)[0] + ".png"
+    pygame.image.save(atlas, image_path)
+    data = {
+        "frames": frames_json,
+        "meta": {
+            "app": "engine.atlas_packer",
+            "image": os.path.basename(image_path),
+            "format": "RGBA8888",
+            "size": {"w": atlas.get_width(), "h": atlas.get_height()},
+            "scale": "1",
+            "frameTags": tags_json,
+        },
+    }
+    with open(json_path, "w") as f:
+        json.dump(data, f, indent=1)
+    return atlas.get_size()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Empaqueta frames recortados en atlas para Spritesheet")
+    parser.add_argument("entradas", nargs="+",
+                        help="spritesheet .json o imagen, cortada en celdas con ruta.png=WxH")
+    parser.add_argument("--salida", required=True, help="JSON del atlas (el PNG va al lado)")
+    parser.add_argument("--max", type=int, default=2048, help="lado máximo de cada atlas en píxeles")
+    parser.add_argument("--padding", type=int, default=1, help="píxeles libres entre frames")
+    parser.add_argument("--duracion", type=int, default=100,
+                        help="ms por frame de las imágenes sueltas")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    try:
+        entradas = [leer_entrada(e, args.duracion) for e in args.entradas]
+        paginas = paginar(entradas, args.max, args.padding)
+    except (OSError, ValueError, pygame.error) as e:
+        parser.error(str(e))
+
+    raiz = os.path.splitext(args.salida)[0]
+    for i, (grupo, acomodo) in enumerate(paginas):
+        json_path = args.salida if i == 0 else f"{raiz}_{i}.json"
+        w, h = escribir_pagina(json_path, grupo, acomodo)
+        frames = [f for fs, _ in grupo for f in fs]
+        antes = sum(f.source_w * f.source_h for f in frames)
+        despues = sum(f.surface.get_width() * f.surface.get_height() for f in _unicos(frames))
+        print(f"{json_path}: {w}x{h}, {len(frames)} frames ({len(acomodo[0])} únicos), "
+              f"píxeles {antes} -> {despues} ({despues / antes:.0%})")
+
+
+if __name__ == "__main__":
+    main()
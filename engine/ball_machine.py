@@ -0,0 +1,213 @@
+# engine/ball_machine.py
+"""
+Máquina lanzapelotas: cientos de pelotas simultáneas para práctica.
+
+Las pelotas se guardan como estructura de arrays (x, y, z, vx, vy, vz en
+arrays de NumPy) y cada paso integra, rebota, refleja en las paredes y
+prueba la red para todas a la vez con unas pocas operaciones vectoriales.
+Es la misma física que la pelota del partido en Game.update_game_logic.
+
+Requiere numpy (solo este modo; el partido normal no lo necesita).
+"""
+
+import numpy as np
+
+
+class BallStore:
+    """
+    Almacén vectorizado de pelotas. Las `n` activas ocupan siempre los
+    primeros índices: se lanzan al final del tramo activo y las muertas se
+    compactan, así cada paso opera sobre vistas [:n] sin tocar los huecos.
+    """
+
+    def __init__(self, capacidad, gravity=-500, bounce=-0.7,
+                 bounds=(60, 30, 580, 450), net_y=230, net_height=55, net_x=(100, 540),
+                 scale_table=None):
+        self.capacidad = capacidad
+        self.gravity = gravity
+        self.bounce = bounce
+        self.left, self.top, self.right, self.bottom = bounds
+        self.net_y = net_y
+        self.net_height = net_height
+        self.net_x = net_x
+        # Escala por fila de pantalla (CourtProjection.scale_table); sin ella, la fórmula
+        self.scale_table = np.asarray(scale_table) if scale_table is not None else None
+
+        self.x = np.zeros(capacidad)
+        self.y = np.zeros(capacidad)
+        self.z = np.zeros(capacidad)
+        self.vx = np.zeros(capacidad)
+        self.vy = np.zeros(capacidad)
+        self.vz = np.zeros(capacidad)
+        self.n = 0  # pelotas activas (índices 0..n-1)
+
+        # Posición del paso anterior (para interpolar al dibujar)
+        self.prev_x = np.zeros(capacidad)
+        self.prev_y = np.zeros(capacidad)
+        self.prev_z = np.zeros(capacidad)
+
+        self._arrays = (self.x, self.y, self.z, self.vx, self.vy, self.vz,
+                        self.prev_x, self.prev_y, self.prev_z)
+
+    def __len__(self):
+        return self.n
+
+    def save_previous_state(self):
+        n = self.n
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self.prev_z[:n] = self.z[:n]
+
+    def spawn(self, x, y, z, vx, vy, vz):
+        """
+        Activa pelotas a continuación de las activas con los arrays de estado
+        dados. Devuelve cuántas se pudieron lanzar (limitado por la capacidad).
+        """
+        i = self.n
+        k = min(len(x), self.capacidad - i)
+        for dst, src in ((self.x, x), (self.y, y), (self.z, z),
+                         (self.vx, vx), (self.vy, vy), (self.vz, vz)):
+            dst[i:i + k] = src[:k]
+        self.prev_x[i:i + k] = self.x[i:i + k]
+        self.prev_y[i:i + k] = self.y[i:i + k]
+        self.prev_z[i:i + k] = self.z[i:i + k]
+        self.n += k
+        return k
+
+    def update(self, dt):
+        """Un paso de física para las pelotas activas."""
+        n = self.n
+        if not n:
+            return
+        x, y, z = self.x[:n], self.y[:n], self.z[:n]
+        vx, vy, vz = self.vx[:n], self.vy[:n], self.vz[:n]
+        y_antes = y.copy()
+
+        x += vx * dt
+        y += vy * dt
+        vz += self.gravity * dt
+        z += vz * dt
+
+        # --- Red: cruzó la línea de la red por debajo de su altura ---
+        cruzo = ((y_antes < self.net_y) & (self.net_y <= y)) | \
+                ((y <= self.net_y) & (self.net_y < y_antes))
+        choque = cruzo & (self.net_x[0] < x) & (x < self.net_x[1]) & (z < self.net_height)
+        if choque.any():
+            vx[choque] = 0
+            vy[choque] = 0
+            # Se deja del lado desde el que venía
+            y[choque] = np.where(y_antes[choque] < self.net_y, self.net_y - 1, self.net_y + 1)
+
+        # --- Rebote en el suelo ---
+        suelo = z <= 0
+        z[suelo] = 0
+        vz[suelo] = np.where(np.abs(vz[suelo]) > 20, vz[suelo] * self.bounce, 0)
+
+        # --- Paredes ---
+        fuera_x = (x < self.left) | (x > self.right)
+        vx[fuera_x] *= -1
+        fuera_y = (y < self.top) | (y > self.bottom)
+        vy[fuera_y] *= -1
+
+        # Muertas: ya no rebotan (se quedan rodando o pegadas a la red)
+        muertas = suelo & (vz == 0)
+        if muertas.any():
+            self._compactar(~muertas)
+
+    def _compactar(self, vivas):
+        """Deja al principio solo las pelotas marcadas en `vivas` (máscara sobre [:n])."""
+        n = self.n
+        k = int(vivas.sum())
+        for arr in self._arrays:
+            arr[:k] = arr[:n][vivas]
+        self.n = k
+
+    def golpear(self, lo, hi, vy, vz, centro_x, efecto=4):
+        """
+        Golpe del jugador de abajo: las pelotas activas dentro de la caja
+        lo..hi (x, y, z) que vienen hacia él salen con vy / vz y vx según
+        cuánto se alejan de centro_x (como en el partido). Devuelve cuántas.
+        """
+        n = self.n
+        x, y, z = self.x[:n], self.y[:n], self.z[:n]
+        dentro = ((lo[0] <= x) & (x <= hi[0]) & (lo[1] <= y) & (y <= hi[1]) &
+                  (lo[2] <= z) & (z <= hi[2]) & (self.vy[:n] > 0))
+        golpeadas = int(dentro.sum())
+        if golpeadas:
+            self.vx[:n][dentro] = (x[dentro] - centro_x) * efecto
+            self.vy[:n][dentro] = vy
+            self.vz[:n][dentro] = vz
+        return golpeadas
+
+    def scale_factors(self, min_y=20, max_y=460):
+        """Escala por perspectiva de las activas según la profundidad (igual que la pelota del partido)."""
+        y = self.y[:self.n]
+        if self.scale_table is not None:
+            filas = np.clip(y.astype(np.int64), 0, len(self.scale_table) - 1)
+            return self.scale_table[filas]
+        return 0.2 + np.clip((y - min_y) / (max_y - min_y), 0, 1) * 0.2
+
+    def interpolated_positions(self, alpha=1.0):
+        """(x, y, z) de las pelotas activas, interpolados entre pasos fijos."""
+        n = self.n
+        x, y, z = self.x[:n], self.y[:n], self.z[:n]
+        if alpha >= 1.0:
+            return x, y, z
+        px, py, pz = self.prev_x[:n], self.prev_y[:n], self.prev_z[:n]
+        return (px + (x - px) * alpha, py + (y - py) * alpha, pz + (z - pz) * alpha)
+
+
+class BallMachine:
+    """
+    Lanzador: dispara ráfagas de pelotas desde el fondo de la cancha hacia
+    el jugador con dispersión aleatoria (RNG con semilla, reproducible).
+    """
+
+    def __init__(self, capacidad=300, por_segundo=60, origen=(320, 90), seed=0, **store_kwargs):
+        self.store = BallStore(capacidad, **store_kwargs)
+        self.por_segundo = por_segundo
+        self.origen = origen
+        self.rng = np.random.default_rng(seed)
+        self._pendiente = 0.0
+
+    def fire(self, n):
+        """Lanza n pelotas (o las que quepan)."""
+        if n <= 0:
+            return 0
+        r = self.rng
+        ox, oy = self.origen
+        return self.store.spawn(
+            x=np.full(n, float(ox)) + r.normal(0, 10, n),
+            y=np.full(n, float(oy)),
+            z=np.full(n, 60.0),
+            vx=r.uniform(-150, 150, n),
+            vy=r.uniform(220, 320, n),
+            vz=r.uniform(150, 300, n),
+        )
+
+    def update(self, dt):
+        # Cadencia de disparo independiente del tick rate
+        self._pendiente += self.por_segundo * dt
+        n = int(self._pendiente)
+        self._pendiente -= n
+        self.fire(n)
+        self.store.update(dt)
+
+    def save_previous_state(self):
+        self.store.save_previous_state()
+
+    def draw(self, surface, frame, cache, alpha=1.0):
+        """
+        Dibujado por lotes: todas las pelotas en un solo surface.blits().
+        cache: SurfaceCache con el frame ya escalado por cada escala cuantizada.
+        """
+        store = self.store
+        xs, ys, zs = store.interpolated_positions(alpha)
+        escalas = store.scale_factors()
+
+        lote = []
+        for x, y, z, escala in zip(xs.tolist(), ys.tolist(), zs.tolist(), escalas.tolist()):
+            img = cache.get(frame, False, escala)
+            iw, ih = img.get_size()
+            lote.append((img, (round(x - iw / 2), round(y - z - ih / 2))))
+        surface.blits(lote, doreturn=False)
@@ -0,0 +1,183 @@
+# engine/benchmark.py
+"""
+Benchmarks de carga de sprites, update/draw de objetos y frame completo.
+
+Uso desde la línea de comandos:
+    python -m engine.benchmark
+    python -m engine.benchmark --guardar-base bench_base.json
+    python -m engine.benchmark --comparar bench_base.json --umbral 0.15
+
+Corre con el driver de video "dummy" de SDL (sin ventana). Cada caso se
+repite hasta ocupar --tiempo-min segundos y se informa ops/s y ms por op.
+Con --comparar se marca como regresión todo caso cuyo ms por op supere
+al de la línea base en más del umbral; en ese caso el código de salida es 1.
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import sys
+import time
+
+import pygame
+
+from engine.asset_manager import AssetManager
+from engine.game_object import GameObject
+from engine.sprite_sheet import Spritesheet
+
+SPRITES_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "sprites"))
+SPRITES_JSON = os.path.join(SPRITES_DIR, "sprites.json")
+
+CANTIDADES = (1, 100, 10_000)
+
+
+def medir(fn, tiempo_min=0.2):
+    """
+    Llama a fn() hasta acumular tiempo_min segundos (al menos una vez).
+    Devuelve {"ops_per_sec", "ms_per_op", "iteraciones"}.
+    """
+    iteraciones = 0
+    inicio = time.perf_counter()
+    transcurrido = 0.0
+    while iteraciones == 0 or transcurrido < tiempo_min:
+        fn()
+        iteraciones += 1
+        transcurrido = time.perf_counter() - inicio
+    return {
+        "ops_per_sec": iteraciones / transcurrido,
+        "ms_per_op": transcurrido * 1000.0 / iteraciones,
+        "iteraciones": iteraciones,
+    }
+
+
+def _crear_objetos(n, animations):
+    objetos = []
+    for i in range(n):
+        obj = GameObject(20 + (i * 7) % 600, 20 + (i * 13) % 440, animations)
+        obj.vx = 60 if i % 2 else -60
+        obj.vy = 30
+        objetos.append(obj)
+    return objetos
+
+
+def bench_sprites(tiempo_min):
+    sheet = Spritesheet(SPRITES_JSON)
+    return {
+        "spritesheet_init": medir(lambda: Spritesheet(SPRITES_JSON), tiempo_min),
+        "get_animation_frames": medir(
+            lambda: sheet.get_animation_frames("PlayerIdle", with_duration=True), tiempo_min),
+        "load_spritesheet": medir(
+            lambda: AssetManager().load_spritesheet("player", SPRITES_JSON), tiempo_min),
+    }
+
+
+def bench_objetos(screen, cantidades, tiempo_min):
+    sheet = Spritesheet(SPRITES_JSON)
+    animations = {"PlayerWalk": sheet.get_clip("PlayerWalk")}
+    dt = 1.0 / 60
+
+    resultados = {}
+    for n in cantidades:
+        objetos = _crear_objetos(n, animations)
+
+        def update():
+            for obj in objetos:
+                obj.update(dt)
+
+        def draw():
+            for obj in objetos:
+                obj.draw(screen)
+
+        resultados[f"gameobject_update_{n}"] = medir(update, tiempo_min)
+        resultados[f"gameobject_draw_{n}"] = medir(draw, tiempo_min)
+    return resultados
+
+
+def bench_frame(tiempo_min):
+    """Un frame completo de Game: paso fijo + dibujado + presentación."""
+    from engine.game import Game
+    from engine.input_source import ScriptedInput
+
+    game = Game(input_source=ScriptedInput(), async_load=False)
+    game.ai_error = 30
+    game.start_match(num_players=1, option_speed=1, ai_p1=True)
+
+    def frame():
+        game.step()
+        game._draw()
+
+    return {"game_frame": medir(frame, tiempo_min)}
+
+
+def correr(cantidades=CANTIDADES, tiempo_min=0.2):
+    pygame.init()
+    screen = pygame.display.set_mode((640, 480))
+
+    resultados = {}
+    resultados.update(bench_sprites(tiempo_min))
+    resultados.update(bench_objetos(screen, cantidades, tiempo_min))
+    resultados.update(bench_frame(tiempo_min))
+    return resultados
+
+
+def comparar(resultados, base, umbral=0.10):
+    """
+    Devuelve [(caso, ms_base, ms_actual, cambio)] con los casos que empeoraron
+    más del umbral (0.10 = 10 % más lento). Los casos nuevos se ignoran.
+    """
+    regresiones = []
+    for nombre, actual in resultados.items():
+        previo = base.get(nombre)
+        if previo is None:
+            continue
+        cambio = actual["ms_per_op"] / previo["ms_per_op"] - 1.0
+        if cambio > umbral:
+            regresiones.append((nombre, previo["ms_per_op"], actual["ms_per_op"], cambio))
+    return regresiones
+
+
+def imprimir(resultados):
+    for nombre, r in resultados.items():
+        print(f"{nombre:<28} {r['ops_per_sec']:>12.1f} ops/s {r['ms_per_op']:>10.4f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de sprites, objetos y frame completo")
+    parser.add_argument("--cantidades", type=int, nargs="+", default=list(CANTIDADES),
+                        help="cantidades de GameObjects a medir")
+    parser.add_argument("--tiempo-min", type=float, default=0.2,
+                        help="segundos mínimos por caso")
+    parser.add_argument("--guardar-base", metavar="JSON",
+                        help="guarda los resultados como línea base")
+    parser.add_argument("--comparar", metavar="JSON",
+                        help="compara contra una línea base guardada")
+    parser.add_argument("--umbral", type=float, default=0.10,
+                        help="empeoramiento tolerado (0.10 = 10 %%)")
+    args = parser.parse_args(argv)
+
+    resultados = correr(args.cantidades, args.tiempo_min)
+    imprimir(resultados)
+
+    if args.guardar_base:
+        with open(args.guardar_base, "w") as f:
+            json.dump(resultados, f, indent=2)
+        print(f"Línea base guardada en {args.guardar_base}")
+
+    if args.comparar:
+        with open(args.comparar) as f:
+            base = json.load(f)
+        regresiones = comparar(resultados, base, args.umbral)
+        for nombre, ms_base, ms_actual, cambio in regresiones:
+            print(f"[REGRESIÓN] {nombre}: {ms_base:.4f} ms -> {ms_actual:.4f} ms (+{cambio:.0%})")
+        if regresiones:
+            return 1
+        print("Sin regresiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# engine/collision.py
+"""
+Colisiones continuas (barridas) de la pelota.
+
+En vez de comparar solo la posición actual, se prueba el segmento que la
+pelota recorrió durante el paso, de p0 a p1 en coordenadas (x, y, z).
+Así no atraviesa la raqueta ni la red aunque el paso sea largo (velocidad
+FAST, tick rate bajo o un frame perdido). Las funciones devuelven el
+instante de impacto t en [0, 1] a lo largo del segmento, o None.
+"""
+
+
+def _aabb_overlap(p0, p1, lo, hi):
+    """Descarte rápido: la caja que envuelve al segmento toca la caja lo..hi."""
+    for a, b, mn, mx in zip(p0, p1, lo, hi):
+        if (a if a < b else b) > mx or (a if a > b else b) < mn:
+            return False
+    return True
+
+
+def segment_box_toi(p0, p1, lo, hi):
+    """
+    Primer instante t en [0, 1] en que el segmento p0 -> p1 entra en la
+    caja alineada a los ejes lo..hi (método de slabs). None si no la toca.
+    Si p0 ya está dentro, devuelve 0.
+    """
+    if not _aabb_overlap(p0, p1, lo, hi):
+        return None
+
+    t_in, t_out = 0.0, 1.0
+    for a, b, mn, mx in zip(p0, p1, lo, hi):
+        d = b - a
+        if d == 0:
+            if a < mn or a > mx:
+                return None
+            continue
+        ta = (mn - a) / d
+        tb = (mx - a) / d
+        if ta > tb:
+            ta, tb = tb, ta
+        if ta > t_in:
+            t_in = ta
+        if tb < t_out:
+            t_out = tb
+        if t_in > t_out:
+            return None
+    return t_in
+
+
+def segment_plane_y_toi(y0, y1, plane_y):
+    """
+    Instante t en que el segmento cruza la línea de profundidad plane_y
+    (de un lado al otro, mismo criterio que antes: y0 < plane <= y1 o al revés).
+    """
+    if (y0 < plane_y <= y1) or (y1 <= plane_y < y0):
+        return (plane_y - y0) / (y1 - y0)
+    return None
+
+
+def net_toi(p0, p1, net_y, net_x, net_height):
+    """
+    Impacto contra la red: cruza net_y con x dentro de net_x=(min, max)
+    y por debajo de net_height, todo evaluado en el instante del cruce.
+    """
+    t = segment_plane_y_toi(p0[1], p1[1], net_y)
+    if t is None:
+        return None
+    x = p0[0] + (p1[0] - p0[0]) * t
+    z = p0[2] + (p1[2] - p0[2]) * t
+    if net_x[0] < x < net_x[1] and z < net_height:
+        return t
+    return None
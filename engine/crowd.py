@@ -0,0 +1,241 @@
+# engine/crowd.py
+"""
+Público del estadio: miles de espectadores animados dibujados por lotes.
+
+El estado de cada espectador (posición, variante de ropa, fase de la
+animación, entusiasmo) vive en arrays de NumPy. En cada frame la pose de
+todos se calcula con unas pocas operaciones vectoriales y cada capa (un
+sector de la tribuna) se dibuja en el momento que toca según si queda
+detrás o delante de los jugadores.
+
+Rects sucios: solo se repintan los espectadores que cambiaron de pose (o
+aparecieron / desaparecieron) desde el frame anterior, más lo que el
+renderer restauró con el fondo encima de la tribuna. Cada uno se repinta
+recortado a su rect, con los vecinos que lo pisan en el mismo orden que el
+dibujo completo, y solo esos rects se presentan.
+
+Presupuesto: Crowd mide lo que cuesta por frame (restaurar, dibujar y su
+parte de la presentación) y ajusta cuántos espectadores muestra para no
+pasarse de `presupuesto_ms`. El orden de los asientos está mezclado, así
+que recortar la cola ralea la tribuna de forma pareja en vez de vaciar una
+zona.
+
+Requiere numpy (igual que la máquina lanzapelotas).
+"""
+
+import time
+
+import numpy as np
+import pygame
+
+from engine.sprite_sheet import convert_alpha
+
+# Poses de cada variante: sentado, sentado balanceándose, brazos arriba, saltando
+POSES = 4
+COLORES = ((200, 40, 40), (40, 80, 200), (230, 200, 40), (40, 160, 70),
+           (230, 230, 230), (150, 60, 170), (240, 130, 40), (60, 60, 60))
+PIEL = ((240, 200, 160), (190, 140, 100), (120, 80, 50))
+
+
+def crear_frames(tam=(5, 8)):
+    """
+    Sprites de espectador generados (el repo no trae arte de público):
+    lista plana indexada por variante * POSES + pose.
+    """
+    w, h = tam
+    frames = []
+    for ropa in COLORES:
+        for piel in PIEL:
+            for pose in range(POSES):
+                # 2 px de margen arriba para el salto; balanceándose baja 1 px
+                surf = pygame.Surface((w, h + 2), pygame.SRCALPHA)
+                arriba = (2, 3, 2, 0)[pose]
+                pygame.draw.rect(surf, piel, (1, arriba, w - 2, 3))
+                pygame.draw.rect(surf, ropa, (0, arriba + 3, w, h - 4))
+                if pose >= 2:
+                    # Brazos arriba
+                    pygame.draw.line(surf, piel, (0, arriba - 2), (0, arriba + 3))
+                    pygame.draw.line(surf, piel, (w - 1, arriba - 2), (w - 1, arriba + 3))
+                frames.append(convert_alpha(surf))
+    return frames
+
+
+class Crowd:
+    """
+    asientos: [(x, y, capa), ...] centro de cada espectador y número de capa
+    (sector que se dibuja junto). frames: lista de crear_frames().
+    """
+
+    def __init__(self, asientos, frames=None, presupuesto_ms=1.0, seed=0):
+        self.frames = frames or crear_frames()
+        self.variantes = len(self.frames) // POSES
+        self.presupuesto_ms = presupuesto_ms
+
+        rng = np.random.default_rng(seed)
+        self.rng = rng
+        asientos = np.asarray(asientos, dtype=np.int32).reshape(-1, 3)
+        # Orden mezclado: los primeros `visibles` quedan repartidos por toda la tribuna
+        asientos = asientos[rng.permutation(len(asientos))]
+        n = len(asientos)
+        self.x, self.y, self.capa = asientos[:, 0], asientos[:, 1], asientos[:, 2]
+        self.variante = rng.integers(0, self.variantes, n)
+        self.fase = rng.uniform(0, 1000, n)               # ms de desfase de la animación
+        self.periodo = rng.uniform(500, 900, n)           # ms por balanceo en reposo
+        self.entusiasmo = np.zeros(n)                     # segundos que le quedan festejando
+
+        # Posiciones ya como tuplas (esquina superior izquierda) para blits
+        fw, fh = self.frames[0].get_size()
+        self._x0, self._y0 = self.x - fw // 2, self.y - fh // 2
+        self._pos = list(zip(self._x0.tolist(), self._y0.tolist()))
+        self._tam = (fw, fh)
+        # Caja de cada capa, para descartar rápido los rects restaurados lejos
+        self._cajas = {}
+        for c in np.unique(self.capa).tolist():
+            m = self.capa == c
+            x0, y0 = int(self._x0[m].min()), int(self._y0[m].min())
+            self._cajas[c] = pygame.Rect(x0, y0, int(self._x0[m].max()) + fw - x0,
+                                         int(self._y0[m].max()) + fh - y0)
+        # Vecinos que se pisan con cada espectador (se calculan al necesitarlos)
+        self._celdas = {}
+        for i, (x, y) in enumerate(self._pos):
+            self._celdas.setdefault((x // fw, y // fh), []).append(i)
+        self._vecinos = {}
+
+        self.t = 0.0             # ms de animación
+        self.visibles = n        # cuántos se dibujan (ajustado por el presupuesto)
+        self.ms_por_espectador = None  # costo medido por espectador visible (promedio móvil)
+
+        # Frame dibujado de cada espectador (-1: no está en pantalla)
+        self._dibujado = np.full(n, -1, dtype=np.int64)
+        self._frame_de = []       # _dibujado como lista, para el frame en curso
+        self._cambiados = {}      # capa -> espectadores a repintar en este frame
+        self._restaurados = None  # rects restaurados por el renderer (None: pantalla entera)
+        self._ms = 0.0            # costo de dibujo acumulado en el frame
+        self.px_presentados = 0   # píxeles de los rects devueltos en el último frame
+
+    def __len__(self):
+        return len(self.x)
+
+    def update(self, dt):
+        self.t += dt * 1000
+        np.subtract(self.entusiasmo, dt, out=self.entusiasmo)
+        np.maximum(self.entusiasmo, 0, out=self.entusiasmo)
+        self._ajustar_densidad()
+
+    def celebrar(self, fraccion=0.7, duracion=2.0):
+        """Una parte del público se levanta a festejar (p. ej. al anotar un punto)."""
+        n = len(self)
+        elegidos = self.rng.random(n) < fraccion
+        self.entusiasmo[elegidos] = duracion * self.rng.uniform(0.6, 1.0, int(elegidos.sum()))
+
+    def _poses(self, n):
+        """Índice de frame de los primeros n espectadores, todos a la vez."""
+        t = self.t + self.fase[:n]
+        reposo = (t // self.periodo[:n]).astype(np.int32) & 1
+        festejo = 2 + ((t // 150).astype(np.int32) & 1)
+        pose = np.where(self.entusiasmo[:n] > 0, festejo, reposo)
+        return self.variante[:n] * POSES + pose
+
+    def _rect(self, i):
+        x, y = self._pos[i]
+        return pygame.Rect(x, y, *self._tam)
+
+    def _vecinos_de(self, i):
+        """Espectadores cuyo rect se pisa con el de i (i incluido), en orden de dibujo."""
+        vecinos = self._vecinos.get(i)
+        if vecinos is None:
+            fw, fh = self._tam
+            x, y = self._pos[i]
+            cx, cy = x // fw, y // fh
+            vecinos = sorted(j for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                             for j in self._celdas.get((cx + dx, cy + dy), ())
+                             if abs(self._pos[j][0] - x) < fw and abs(self._pos[j][1] - y) < fh)
+            self._vecinos[i] = vecinos
+        return vecinos
+
+    def begin_frame(self, surface, fondo, restaurados, ms_presentar=0.0):
+        """
+        Empieza el dibujo de un frame, antes que nada se dibuje encima del
+        fondo. restaurados: rects que el renderer acaba de restaurar con el
+        fondo, o None si se redibuja la pantalla entera. ms_presentar: lo
+        que costó presentar los rects del público del frame anterior (entra
+        en el presupuesto junto con el dibujo).
+
+        Restaura el fondo bajo los espectadores que cambiaron de pose: en
+        draw() se repintan recortados a esos rects.
+        """
+        self._medir(ms_presentar)
+        inicio = time.perf_counter()
+        n = self.visibles
+        objetivo = np.full(len(self), -1, dtype=np.int64)
+        objetivo[:n] = self._poses(n)
+
+        self._restaurados = restaurados
+        self._cambiados = {}
+        if restaurados is not None:
+            cambiados = np.flatnonzero(objetivo != self._dibujado)
+            for c in self._cajas:
+                self._cambiados[c] = cambiados[self.capa[cambiados] == c].tolist()
+            for i in cambiados.tolist():
+                rect = self._rect(i)
+                surface.blit(fondo, rect, rect)
+        self._dibujado = objetivo
+        self._frame_de = objetivo.tolist()
+        self.px_presentados = 0
+        self._ms += (time.perf_counter() - inicio) * 1000
+
+    def draw(self, surface, capa):
+        """
+        Dibuja lo que cambió de `capa` en este frame (todo si la pantalla se
+        redibuja entera). Devuelve los rects a presentar; el público los
+        vuelve a pintar él mismo, así que no hay que restaurarlos.
+        """
+        inicio = time.perf_counter()
+        frames, pos, frame_de = self.frames, self._pos, self._frame_de
+        rects = []
+        if self._restaurados is None:
+            en_capa = np.flatnonzero((self.capa == capa) & (self._dibujado >= 0)).tolist()
+            surface.blits([(frames[frame_de[j]], pos[j]) for j in en_capa], doreturn=False)
+        else:
+            clip = surface.get_clip()
+            # Espectadores que cambiaron: su rect con los vecinos que lo pisan
+            for i in self._cambiados.get(capa, ()):
+                rect = self._rect(i)
+                surface.set_clip(rect)
+                surface.blits([(frames[frame_de[j]], pos[j]) for j in self._vecinos_de(i)
+                               if frame_de[j] >= 0], doreturn=False)
+                rects.append(rect)
+            # Lo que el renderer restauró encima de la tribuna (ya se presenta)
+            caja = self._cajas.get(capa)
+            fw, fh = self._tam
+            for rect in self._restaurados:
+                if not caja or not caja.colliderect(rect):
+                    continue
+                tocados = np.flatnonzero((self.capa == capa) & (self._dibujado >= 0)
+                                         & (self._x0 < rect.right) & (self._x0 + fw > rect.x)
+                                         & (self._y0 < rect.bottom) & (self._y0 + fh > rect.y))
+                if len(tocados):
+                    surface.set_clip(rect)
+                    surface.blits([(frames[frame_de[j]], pos[j]) for j in tocados.tolist()],
+                                  doreturn=False)
+            surface.set_clip(clip)
+            self.px_presentados += len(rects) * fw * fh
+        self._ms += (time.perf_counter() - inicio) * 1000
+        return rects
+
+    def _medir(self, ms_presentar):
+        """Cierra la medición del frame anterior: costo por espectador visible."""
+        if self._ms and self.visibles:
+            costo = (self._ms + ms_presentar) / self.visibles
+            previo = self.ms_por_espectador
+            self.ms_por_espectador = costo if previo is None else previo * 0.9 + costo * 0.1
+        self._ms = 0.0
+
+    def _ajustar_densidad(self):
+        """Acerca `visibles` a los espectadores que entran en presupuesto_ms por frame."""
+        if not self.ms_por_espectador:
+            return
+        objetivo = max(0, min(len(self), int(self.presupuesto_ms / self.ms_por_espectador)))
+        # De a poco para que la tribuna no parpadee
+        paso = max(1, len(self) // 50)
+        self.visibles += max(-paso, min(paso, objetivo - self.visibles))
@@ -1,12 +1,22 @@
 # engine/game.py
 
 import os
+import random
 import sys
 import pygame
+from engine.animation import AnimationClip
 from engine.asset_manager import AssetManager
+from engine.collision import net_toi, segment_box_toi
 from engine.game_loop import GameLoop
-from engine.game_object import GameObject
-from engine.sprite_sheet import Spritesheet as EngineSpritesheet 
+from engine.game_object import GameObject, update_all
+from engine.hud import HUD
+from engine.input_source import KeyboardInput
+from engine.projection import CourtProjection
+from engine.renderer import DirtyRenderer
+from engine import startup
+from engine.sprite_sheet import Spritesheet as EngineSpritesheet
+from engine.trajectory import Trajectory
+from engine.win_probability import odds, sacador_tiebreak
 
 # --- Clase Spritesheet Adaptadora ---
 class Spritesheet:
@@ -27,16 +37,85 @@ class Game(GameLoop):
     SCREEN_HEIGHT = 480
     TITLE = "Tor TENNIS"
     FPS = 60
+    TICK_RATE = 60            # Pasos de simulación por segundo (paso fijo)
+    MAX_STEPS_PER_FRAME = 5   # Tope de pasos atrasados por frame
 
-    def __init__(self):
+    # Efectos de sonido -> prioridad al competir por un canal
+    EFECTOS = {"golpe": 3, "red": 3, "bote": 2, "publico": 1}
+
+    # Público: sectores de la tribuna (capas de Crowd) y ms por frame para dibujarlo
+    TRIBUNA_IZQ, TRIBUNA_DER, TRIBUNA_FRENTE = 0, 1, 2
+    CROWD_BUDGET_MS = 1.5
+
+    # Formato del partido: al mejor de 3 sets de 6 games con tie-break en 6-6
+    SETS_PARA_GANAR = 2
+    GAMES_POR_SET = 6
+    PUNTOS_TIEBREAK = 7
+    # Probabilidad de ganar el punto con el saque antes de tener estadísticas
+    # (y cuántos puntos "pesa" esa suposición frente a los jugados)
+    P_SAQUE_INICIAL = 0.6
+    PESO_INICIAL = 20
+
+    # Golpes de la IA: dónde pica la pelota (fracción del campo rival desde
+    # la mitad; el saque, más corto), a qué fracción del ancho de la cancha
+    # desde el centro cruza la línea del rival, tiempo de vuelo mínimo en s
+    # y cuánto pasa por encima de la red en píxeles
+    PROFUNDIDAD_IA = 0.6
+    PROFUNDIDAD_SAQUE_IA = 0.45
+    ANCHO_TIRO_IA = 0.25
+    TIEMPO_VUELO_IA = 1.0
+    MARGEN_RED_IA = 15
+
+    # Fracción de la velocidad horizontal con que la pelota rebota en la red
+    REBOTE_RED = 0.2
+
+    # Presupuesto de memoria de assets (bytes de píxeles y muestras): pensado
+    # para equipos de 512 MB; lo que queda afuera se libera y recarga al pedirlo
+    ASSET_BUDGET_MB = 192
+
+    def __init__(self, headless=False, input_source=None, record_path=None, async_load=None,
+                 window_size=None, fullscreen=False, scale_filter="nearest"):
+        """
+        headless: sin ventana ni dibujado (simulación, IA vs IA, CI).
+        input_source: objeto con read() que devuelve las teclas pulsadas;
+                      por defecto el teclado real.
+        record_path: si se indica, el primer partido de la sesión se graba
+                     ahí (teclas y dt por paso, ver engine/replay.py).
+        async_load: cargar los assets en segundo plano mostrando una pantalla
+                    de carga (por defecto sí con ventana, no en headless).
+        window_size / fullscreen / scale_filter: tamaño de la ventana y filtro
+                    con que se escala la imagen de 640x480 (ver GameLoop).
+        """
         super().__init__(screen_width=self.SCREEN_WIDTH,
                          screen_height=self.SCREEN_HEIGHT,
                          title=self.TITLE,
-                         fps=self.FPS)
+                         fps=self.FPS,
+                         tick_rate=self.TICK_RATE,
+                         max_steps_per_frame=self.MAX_STEPS_PER_FRAME,
+                         headless=headless,
+                         window_size=window_size,
+                         fullscreen=fullscreen,
+                         scale_filter=scale_filter)
+
+        self.input_source = input_source or KeyboardInput()
+
+        self.asset_manager = AssetManager(budget_bytes=self.ASSET_BUDGET_MB * 1024 * 1024)
+        self.asset_manager.track_cache("frames_transformados", GameObject.surface_cache)
+        self.hud = HUD()
+        self.renderer = DirtyRenderer(self.screen)
 
-        self.asset_manager = AssetManager()
+        # Sin assets todavía: la escena se arma al terminar la carga
+        self.estadio = self.cancha = self.red = None
+        self.court = CourtProjection(self.screen.get_size())
+        self.all_sprites = []
+        self.loading_progress = 0.0
+        # Efectos de sonido (None en headless o sin audio). Con sfx_muted los
+        # pasos no suenan: lo usa el rollback al re-simular frames ya oídos
+        self.sfx = None
+        self.sfx_muted = False
+        self.crowd = None  # Público animado (sin numpy o en headless no hay)
+        self._px_presentados = 0  # píxeles presentados en el último frame (costo del público)
         self.load_assets()
-        self._setup_scene()
 
         self.score_p1 = 0
         self.score_p2 = 0
@@ -44,8 +123,15 @@ class Game(GameLoop):
         
         # --- Lógica de Tenis Real ---
         self.puntos_tenis = ["0", "15", "30", "40", "AD"] # AD es para ventaja (Advantage)
-        self.indices_puntos = [0, 0]  # [P1, P2]
-        self.games_ganados = [0, 0]   # [P1, P2]
+        self.indices_puntos = [0, 0]  # [P1, P2] (en tie-break: puntos corridos)
+        self.games_ganados = [0, 0]   # [P1, P2] del set en curso
+        self.sets_ganados = [0, 0]    # [P1, P2]
+        self.sets_jugados = []        # Games de cada set terminado, p. ej. [(6, 4)]
+        self.tiebreak = False
+        self.primero_tiebreak = None  # Quién sacó el primer punto del tie-break
+        self.ganador = None           # 0 / 1 cuando termina el partido
+        # Puntos [ganados, jugados] con el saque de cada jugador (probabilidad en vivo)
+        self.stats_saque = [[0, 0], [0, 0]]
         self.server = 1
         
         # --- VARIABLES PARA EL MENÚ Y VELOCIDAD ---
@@ -67,48 +153,124 @@ class Game(GameLoop):
         self.state = "MENU"
         self.menu_option = 1  # 1 para '1 PLAYER', 2 para '2 PLAYERS'
         self.num_players = 1
+        self.ai_p1 = False     # True: el Jugador 1 también lo maneja la IA (IA vs IA)
+        self.show_profiler = False  # Overlay de tiempos por fase (F3)
+        self.ball_machine = None    # Modo práctica con lanzapelotas (tecla M en el menú)
+        self.practica_devueltas = 0  # Pelotas devueltas por el J1 en la práctica
+
+        # Error de puntería de la IA (desvío típico en píxeles, 0 = perfecta).
+        # Se sortea una vez por golpe con un RNG con semilla para que sea reproducible.
+        self.rng = random.Random(0)
+        self.ai_error = 0
+        self._ia_desvio = {1: 0.0, 2: 0.0}
+
+        # Tiempo de reacción de la IA (segundos de juego tras cada golpe antes
+        # de ir hacia la intercepción). Con ai_error forma la dificultad.
+        self.ai_reaction = 0.0
+        # Trayectoria predicha del último golpe e intercepción cacheada por jugador
+        self._prediccion = None
+        self._intercepcion = {}
+        self._tiempo_golpe = 0.0
+
+        # Posición (x, y, z) de la pelota al empezar el último paso de física:
+        # junto con la actual forma el tramo para las colisiones barridas
+        self._ball_antes = None
+
+        # Grabación del partido para reproducirlo después
+        self.record_path = record_path
+        self.recorder = None
         
         # Multiplicadores de velocidad reales
         self.speed_values = [0.6, 1.0, 1.4] 
         self.game_speed = 1.0
 
+        if async_load is None:
+            async_load = not headless
+        if async_load:
+            self.state = "LOADING"  # update_game_logic pasa al menú al terminar
+        else:
+            self.asset_manager.wait()
+            self._on_assets_loaded()
+
     def game_loop(self):
-        self.run()
+        try:
+            self.run()
+        finally:
+            self.stop_recording()
 
     def load_assets(self):
+        """
+        Encola todos los assets y lanza su carga en hilos (AssetManager).
+        Las Surfaces finales se arman en _on_assets_loaded().
+        """
         base = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "sprites")
         base = os.path.normpath(base)
         
-        # 1. Cargar Jugadores
-        json_path = os.path.join(base, "sprites.json")
-        try:
-            self.asset_manager.load_spritesheet("player", json_path)
-        except Exception as e:
-            print("Error cargando spritesheet:", e)
-            raise
-
-        # 2. CARGAR PELOTA (Manual: pelota.png tiene 2 frames de 32x32)
-        ball_path = os.path.join(base, "pelota.png")
-        if os.path.exists(ball_path):
-            ball_sheet = pygame.image.load(ball_path).convert_alpha()
+        # 1. Jugadores y pelota: del atlas recortado si está armado
+        # (python -m engine.atlas_packer), una sola imagen para decodificar
+        atlas = os.path.join(base, "atlas.json")
+        if os.path.exists(atlas):
+            self.asset_manager.queue_spritesheet("player", atlas)
+        else:
+            self.asset_manager.queue_spritesheet("player", os.path.join(base, "sprites.json"))
+
+            # 2. CARGAR PELOTA (Manual: pelota.png tiene 2 frames de 32x32)
+            ball_path = os.path.join(base, "pelota.png")
+            if os.path.exists(ball_path):
+                self.asset_manager.queue_image("pelota", ball_path)
+            else:
+                print(f"Error: No se encontró {ball_path}")
+
+        # 3. Carga de fondos
+        for name in ("estadio", "cancha", "red"):
+            self.asset_manager.queue_image(name, os.path.join(base, f"{name}.png"))
+
+        # 4. Efectos de sonido: buscar los archivos y sintetizar los que faltan
+        # también va en los hilos de carga
+        if not self.headless:
+            self.asset_manager.queue_sound_bank(os.path.join(os.path.dirname(base), "sounds"), self.EFECTOS)
+
+        # Lo que usa la escena no se libera por el presupuesto
+        self.asset_manager.pin("player", "pelota", "estadio", "cancha", "red")
+        self.asset_manager.start_loading(on_progress=self._on_asset_progress)
+
+    def _on_asset_progress(self, loaded, total):
+        self.loading_progress = loaded / total
+
+    def _on_assets_loaded(self):
+        """Arma animaciones y escena con los assets ya cargados (hilo principal)."""
+        sheet = self.asset_manager.get_spritesheet("player")
+        ball_sheet = self.asset_manager.get_image("pelota")
+        if "pelota" in sheet.tags:
+            # Frames de la pelota empaquetados en el atlas (ya recortados)
+            self.ball_animations = {"girar": sheet.get_clip("pelota")}
+            sheet.acquire(self)  # ball_animations guarda el clip
+        elif ball_sheet:
             # Cortamos los dos cuadros de 32x32
             f1 = ball_sheet.subsurface(pygame.Rect(0, 0, 32, 32))
             f2 = ball_sheet.subsurface(pygame.Rect(32, 0, 32, 32))
             # Creamos el diccionario de animación para la pelota
-            self.ball_animations = {"girar": [(f1, 100), (f2, 100)]}
+            self.ball_animations = {"girar": AnimationClip([(f1, 100), (f2, 100)], "girar")}
         else:
-            print(f"Error: No se encontró {ball_path}")
             self.ball_animations = None
 
-        # 3. Carga de fondos
-        self.estadio = self.asset_manager.load_image("estadio", os.path.join(base, "estadio.png"))
-        self.cancha = self.asset_manager.load_image("cancha", os.path.join(base, "cancha.png"))
-        self.red = self.asset_manager.load_image("red", os.path.join(base, "red.png"))
+        self.estadio = self.asset_manager.get_image("estadio")
+        self.cancha = self.asset_manager.get_image("cancha")
+        self.red = self.asset_manager.get_image("red")
+        # Proyección y límites de la cancha: una vez por juego de assets
+        self.court = CourtProjection(self.screen.get_size(),
+                                     *(s.get_size() if s else None for s in (self.estadio, self.cancha, self.red)))
+        if not self.headless:
+            self.sfx = self.asset_manager.sound_bank
+            self.crowd = self._build_crowd()
+        self._setup_scene()
+        startup.timeline.mark("assets")
         
     def _setup_scene(self):
-        ss = self.asset_manager.spritesheets["player"]
+        ss = self.asset_manager.get_spritesheet("player")
         def build_anim(tag):
-            return ss.get_animation_frames(tag, with_duration=True) 
+            # Clip compartido (se arma una vez por spritesheet)
+            return ss.get_clip(tag)
 
         animations = {
             "EnemyIdle": build_anim("EnemyIdle"), "EnemyWalk": build_anim("EnemyWalk"),
@@ -128,10 +290,89 @@ class Game(GameLoop):
             self.ball.vy = 140    # Velocidad de profundidad (hacia el fondo/frente)
             self.ball.vz = 400    # Velocidad inicial de salto (hacia arriba)
             self.ball.z = 0       # Altura inicial (en el suelo)
+            self.ball.scale_factor = 0.3  # Se recalcula en cada paso según la profundidad
             self.GRAVITY = -500   # Fuerza de gravedad (píxeles/s^2)
             self.BOUNCE = -0.7    # Elasticidad (pierde 30% de fuerza al rebotar)
         
-        self.all_sprites = pygame.sprite.Group(self.player1, self.player2, self.ball)
+        self.all_sprites = [self.player1, self.player2, self.ball]
+
+        # Los jugadores (y la pelota, si sale del atlas) dibujan frames del
+        # spritesheet: no se libera mientras existan
+        ss.acquire(self.player1)
+        ss.acquire(self.player2)
+        if self.ball_animations and "pelota" in ss.tags:
+            ss.acquire(self.ball)
+
+    def _build_crowd(self, paso=(5, 6)):
+        """
+        Un espectador por celda de `paso` píxeles en las zonas de tribuna del
+        estadio (las del color de su esquina). None si falta numpy.
+        """
+        try:
+            from engine.crowd import Crowd
+        except ImportError:
+            return None
+        if not self.estadio:
+            return None
+
+        estadio_rect, _, _ = self._layout()
+        tribuna = pygame.mask.from_threshold(self.estadio, self.estadio.get_at((0, 0)), (1, 1, 1, 255))
+        w, h = self.estadio.get_size()
+        asientos = []
+        for fila, y in enumerate(range(paso[1] // 2, h, paso[1])):
+            # Filas intercaladas: que no queden columnas perfectas
+            for x in range(paso[0] // 2 + (fila % 2) * paso[0] // 2, w, paso[0]):
+                if not tribuna.get_at((x, y)):
+                    continue
+                if y > h * 0.75:
+                    capa = self.TRIBUNA_FRENTE
+                else:
+                    capa = self.TRIBUNA_IZQ if x < w // 2 else self.TRIBUNA_DER
+                asientos.append((x + estadio_rect.x, y + estadio_rect.y, capa))
+        return Crowd(asientos, presupuesto_ms=self.CROWD_BUDGET_MS)
+
+    def _sonar(self, nombre):
+        if self.sfx and not self.sfx_muted:
+            self.sfx.play(nombre)
+
+    def store_previous_state(self):
+        """Guarda la posición de cada sprite antes del paso fijo."""
+        for sprite in self.all_sprites:
+            sprite.save_previous_state()
+        if self.ball_machine:
+            self.ball_machine.save_previous_state()
+
+    def snapshot(self):
+        """
+        Estado completo de la simulación (jugadores, pelota, marcador, RNG)
+        como tuplas: copiar y restaurar es barato (rollback de red).
+        """
+        return (self.player1.snapshot(), self.player2.snapshot(), self.ball.snapshot(),
+                tuple(self.indices_puntos), tuple(self.games_ganados), self.server,
+                tuple(self.sets_ganados), tuple(self.sets_jugados), self.tiebreak,
+                self.primero_tiebreak, self.ganador, tuple(map(tuple, self.stats_saque)),
+                self.rebotó_una_vez, self.ultimo_en_golpear, self.punto_finalizado,
+                self.rng.getstate(), tuple(self._ia_desvio.items()), self._ball_antes,
+                self._prediccion, tuple(self._intercepcion.items()), self._tiempo_golpe)
+
+    def restore(self, state):
+        """Vuelve al estado devuelto por snapshot()."""
+        (p1, p2, ball, puntos, games, self.server,
+         sets, sets_jugados, self.tiebreak, self.primero_tiebreak, self.ganador, stats,
+         self.rebotó_una_vez, self.ultimo_en_golpear, self.punto_finalizado,
+         rng_state, desvio, self._ball_antes,
+         self._prediccion, intercepcion, self._tiempo_golpe) = state
+        self.player1.restore(p1)
+        self.player2.restore(p2)
+        self.ball.restore(ball)
+        self.indices_puntos = list(puntos)
+        self.games_ganados = list(games)
+        self.sets_ganados = list(sets)
+        self.sets_jugados = list(sets_jugados)
+        self.stats_saque = [list(s) for s in stats]
+        self.rng.setstate(rng_state)
+        self._ia_desvio = dict(desvio)
+        self._intercepcion = dict(intercepcion)
 
     def handle_specific_events(self, event):
         if event.type == pygame.KEYDOWN:
@@ -153,32 +394,131 @@ class Game(GameLoop):
 
                 # Confirmar START
                 if event.key == pygame.K_RETURN:
-                    self.num_players = self.option_players
-                    self.game_speed = self.speed_values[self.option_speed]
+                    self.start_match(self.option_players, self.option_speed)
+
+                # Modo práctica: máquina lanzapelotas
+                elif event.key == pygame.K_m:
+                    self.start_ball_machine()
+
+            elif self.state == "PRACTICE" and event.key == pygame.K_m:
+                self.ball_machine = None
+                self.state = "MENU"
+
+            # Pausa: la escena queda congelada y el bucle pasa a reposo
+            elif event.key in (pygame.K_PAUSE, pygame.K_SPACE):
+                if self.state == "PLAYING":
+                    self.state = "PAUSED"
+                elif self.state == "PAUSED":
                     self.state = "PLAYING"
-                    self.reset_for_serve()
     
         if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_F2:
-                self.score_p1 = 0
-                self.score_p2 = 0
-                self.server = 1
-                self.reset_for_serve()
+            if event.key == pygame.K_F2 and self.state != "LOADING":
+                self.aplicar_evento("reiniciar_marcador")
+            elif event.key == pygame.K_F3:
+                self.show_profiler = not self.show_profiler
+            elif event.key == pygame.K_F5 and self.window is not self.screen:
+                # Alternar filtro de escalado (nearest / smooth)
+                i = self.SCALE_FILTERS.index(self.scale_filter)
+                self.set_scale_filter(self.SCALE_FILTERS[(i + 1) % len(self.SCALE_FILTERS)])
+                self.renderer.invalidate()
+            elif event.key == pygame.K_F4:
+                # Exportar los tiempos de la ventana actual
+                self.profiler.export_json("perf.json")
+                self.profiler.export_csv("perf.csv")
+                print("Tiempos exportados a perf.json y perf.csv")
             elif event.key == pygame.K_ESCAPE:
                 self.running = False
 
+    def aplicar_evento(self, nombre):
+        """
+        Cambios de estado disparados por eventos (no por las teclas del
+        paso). Se graban en el replay para reproducirlos en su lugar.
+        """
+        if self.recorder:
+            self.recorder.record_event(nombre)
+        if nombre == "reiniciar_marcador":
+            self.score_p1 = 0
+            self.score_p2 = 0
+            self._reiniciar_marcador()
+            self.reset_for_serve()
+
+    def start_match(self, num_players, option_speed, ai_p1=False):
+        """Sale del menú y comienza el partido con las opciones elegidas."""
+        self.num_players = num_players
+        self.option_speed = option_speed
+        self.game_speed = self.speed_values[option_speed]
+        self.ai_p1 = ai_p1
+        self.state = "PLAYING"
+        self._reiniciar_marcador()
+        if self.record_path:
+            self.start_recording()
+        self.reset_for_serve()
+
+    def start_recording(self):
+        """
+        Empieza a grabar el partido: fija una semilla nueva para el RNG y
+        guarda en la cabecera lo necesario para repetir start_match().
+        Solo se graba el primer partido (los siguientes parten de un estado
+        que no está en la cabecera).
+        """
+        from engine.replay import Recorder
+
+        seed = random.SystemRandom().randrange(2 ** 32)
+        self.rng.seed(seed)
+        self.recorder = Recorder({
+            "seed": seed,
+            "ai_error": self.ai_error,
+            "num_players": self.num_players,
+            "option_speed": self.option_speed,
+            "ai_p1": self.ai_p1,
+            "tick_rate": self.tick_rate,
+        })
+
+    def stop_recording(self):
+        """Guarda la grabación en curso (si la hay) en record_path."""
+        if self.recorder:
+            self.recorder.save(self.record_path)
+            if not self.headless:
+                print(f"Partido grabado en {self.record_path} ({self.recorder.ticks} pasos)")
+            self.recorder = None
+            self.record_path = None
+
+    def start_ball_machine(self, capacidad=300, por_segundo=60):
+        """
+        Práctica contra la máquina lanzapelotas: cientos de pelotas a la vez
+        con física vectorizada (necesita numpy, se importa solo aquí).
+        """
+        from engine.ball_machine import BallMachine
+
+        court = self.court
+        self.ball_machine = BallMachine(
+            capacidad=capacidad, por_segundo=por_segundo,
+            origen=(self.player2.rect.centerx, self.player2.rect.bottom),
+            seed=self.rng.randrange(2 ** 32),
+            gravity=self.GRAVITY, bounce=self.BOUNCE,
+            bounds=court.paredes, net_y=court.net_y, net_height=court.NET_HEIGHT,
+            net_x=court.NET_X, scale_table=court.scale_table)
+        self.game_speed = self.speed_values[self.option_speed]
+        self.practica_devueltas = 0
+        self.state = "PRACTICE"
+
     def reset_game(self):
         """Reinicia la posición de los jugadores y la pelota"""
         # Reposicionar Jugadores
-        self.player1.rect.center = (self.SCREEN_WIDTH // 2, self.SCREEN_HEIGHT - 60)
-        self.player2.rect.center = (self.SCREEN_WIDTH // 2, 80)
+        self.player1.rect.center = (self.court.center_x, self.SCREEN_HEIGHT - 60)
+        self.player2.rect.center = (self.court.center_x, 80)
         
         # Resetear Pelota
-        self.ball.rect.center = (self.SCREEN_WIDTH // 2, self.SCREEN_HEIGHT // 2)
+        self.ball.rect.center = (self.court.center_x, self.SCREEN_HEIGHT // 2)
         self.ball.vx = 0
         self.ball.vy = -100
         self.ball.vz = 50
         self.ball.z = 150
+
+        # Sin interpolación desde la posición anterior (teletransporte)
+        for sprite in self.all_sprites:
+            sprite.save_previous_state()
+        self._ball_antes = None
         
         # Desbloquear animaciones por si acaso
         self.player1.locked = False
@@ -186,64 +526,253 @@ class Game(GameLoop):
         self.player1.play("PlayerIdle", reset=True)
         self.player2.play("EnemyIdle", reset=True)
         
-        print("Juego Reiniciado")
+        if not self.headless:
+            print("Juego Reiniciado")
         
     def _check_ball_collision(self, player, threshold):
-        """Verifica el impacto en el punto medio del jugador"""
-        # 1. Distancia Horizontal (X): Usamos los centros
-        dist_x = abs(player.rect.centerx - self.ball.rect.centerx)
-    
-        # 2. Distancia de Profundidad (Y): 
-        # El jugador y la pelota deben estar casi en la misma línea de 'suelo'
-        dist_y = abs(player.rect.centery - self.ball.rect.centery)
-    
-        # 3. Validación de Altura (Z):
-        # Definimos que la raqueta golpea entre la cintura y la cabeza (ej: entre 20 y 70px de altura)
-        altura_minima = 0
-        altura_maxima = 75
-        esta_en_altura_raqueta = altura_minima <= self.ball.z <= altura_maxima
-        
-        # Solo hay golpe si está cerca en X, en Y, y a la altura correcta
-        # Bajamos el margen de Y a 15 para que sea más preciso
-        return dist_x < threshold and dist_y < 15 and esta_en_altura_raqueta
+        """
+        Verifica el impacto en el punto medio del jugador.
+        Prueba el tramo que recorrió la pelota en el último paso (colisión
+        barrida), así no atraviesa la raqueta con pasos largos. Si la
+        pelota entró en la zona durante el tramo, vuelve al punto de
+        contacto (de ahí sale el golpe); si ya estaba adentro, se queda.
+        """
+        # Zona de la raqueta:
+        # X: cerca del centro del jugador (threshold)
+        # Y: casi en la misma línea de 'suelo' (margen de 15)
+        # Z: entre el suelo y la cabeza (0 a 75px de altura)
+        cx, cy = player.rect.center
+        lo = (cx - threshold, cy - 15, 0)
+        hi = (cx + threshold, cy + 15, 75)
+
+        p1 = (self.ball.rect.centerx, self.ball.rect.centery, self.ball.z)
+        p0 = self._ball_antes or p1
+        t = segment_box_toi(p0, p1, lo, hi)
+        if t is None:
+            return False
+        if t > 0:
+            self._colocar_pelota(*(a + (b - a) * t for a, b in zip(p0, p1)))
+        return True
+
+    def _colocar_pelota(self, x, y, z):
+        """Pone la pelota en (x, y, z) conservando la parte sub-píxel."""
+        ix, iy = int(x), int(y)
+        self.ball.rect.center = (ix, iy)
+        self.ball.frac_x = x - ix
+        self.ball.frac_y = y - iy
+        self.ball.z = z
+
+    def _mover_ia(self, jugador, dist_umbral):
+        """
+        IA difícil (predictiva) para el jugador indicado (1: abajo, 2: arriba).
+        Devuelve True si el jugador se está moviendo.
+        """
+        yo = self.player1 if jugador == 1 else self.player2
+        rival = self.player2 if jugador == 1 else self.player1
+        # La pelota viene hacia la IA: hacia arriba para J2, hacia abajo para J1
+        viene = self.ball.vy < 0 if jugador == 2 else self.ball.vy > 0
+        is_moving = False
+
+        if viene:
+            if self._tiempo_golpe < self.ai_reaction:
+                # Todavía reaccionando: se queda donde está
+                target_x = yo.rect.centerx
+            else:
+                # Intercepción sobre la trayectoria predicha (una vez por golpe)
+                target_x = self._punto_intercepcion(jugador, yo) + self._ia_desvio[jugador]
+        else:
+            target_x = self.court.center_x # Volver al centro
+
+        # Movimiento IA
+        if yo.rect.centerx < target_x - 10: yo.vx = 180; is_moving = True
+        elif yo.rect.centerx > target_x + 10: yo.vx = -180; is_moving = True
+
+        # Golpe IA: solo a la pelota que viene o al saque (la pelota sigue quieta
+        # donde la dejó reset_for_serve()); la que acaba de golpear no se repite
+        b = self.ball
+        saque = b.vx == 0 and b.vy == 0 and b.vz == 0 and b.z == 0
+        if (viene or saque) and self._check_ball_collision(yo, dist_umbral + 10):
+            yo.play("PlayerGolpeB" if jugador == 1 else "EnemyGolpeB", reset=False, lock=True)
+            # La IA tira cruzado: si el rival está a la izquierda, ella tira a la derecha
+            lado = 1 if rival.rect.centerx < self.court.center_x else -1
+            vx, vy, vz = self._tiro_ia(jugador, lado, self.PROFUNDIDAD_SAQUE_IA if saque else None)
+            self._aplicar_golpe(jugador=jugador, vy=vy, vz=vz, custom_vx=vx)
+        return is_moving
+
+    def _tiro_ia(self, jugador, lado, profundidad=None):
+        """
+        (vx, vy, vz) para que el golpe de la IA pique dentro del campo rival.
+        lado: 1 tira a la derecha del centro, -1 a la izquierda (en la línea del rival).
+        profundidad: fracción del campo rival (desde la mitad hacia el fondo)
+        donde debe picar la pelota; por defecto PROFUNDIDAD_IA.
+
+        El tiempo de vuelo t sale de z0 + vz t - |g| t² / 2 = 0, con t al
+        menos TIEMPO_VUELO_IA y lo bastante largo para pasar la red con margen.
+        """
+        court = self.court
+        rect = court.court_rect
+        if profundidad is None:
+            profundidad = self.PROFUNDIDAD_IA
+        x0, y0, z0 = self.ball.rect.centerx, self.ball.rect.centery, self.ball.z
+        if jugador == 2:
+            objetivo_y = court.mitad_y + profundidad * (rect.bottom - court.mitad_y)
+        else:
+            objetivo_y = court.mitad_y - profundidad * (court.mitad_y - rect.top)
+        objetivo_x = court.center_x + lado * rect.width * self.ANCHO_TIRO_IA
+
+        medio_g = -self.GRAVITY / 2
+        t = self.TIEMPO_VUELO_IA
+        # Altura al cruzar la red (fracción f del recorrido): z0 (1 - f) + |g|/2 t² f (1 - f)
+        f = (court.net_y - y0) / (objetivo_y - y0) if objetivo_y != y0 else 0.0
+        if 0.0 < f < 1.0:
+            altura = court.NET_HEIGHT + self.MARGEN_RED_IA - z0 * (1 - f)
+            if altura > 0:
+                t = max(t, (altura / (medio_g * f * (1 - f))) ** 0.5)
+        vz = medio_g * t - z0 / t
+        vy = (objetivo_y - y0) / t
+        # En x se apunta a donde la pelota cruza la línea del rival (no al
+        # pique): así el ángulo que recibe es el mismo en las dos mitades
+        rival = self.player1 if jugador == 2 else self.player2
+        llegada = (rival.rect.centery - y0) / vy if vy else t
+        return (objetivo_x - x0) / max(t, llegada), vy, vz
+
+    def _controlar_p1(self, keys):
+        """
+        Movimiento y golpe del J1 humano. Devuelve (se mueve, golpe) con
+        golpe = (vy, vz) si pidió saque (O) o golpe plano (P), o None.
+        """
+        is_moving = False
+        if keys[pygame.K_LEFT]: self.player1.vx = -150; is_moving = True
+        elif keys[pygame.K_RIGHT]: self.player1.vx = 150; is_moving = True
+        if keys[pygame.K_UP]: self.player1.vy = -150; is_moving = True
+        elif keys[pygame.K_DOWN]: self.player1.vy = 150; is_moving = True
+
+        # Golpes J1
+        if keys[pygame.K_o]:
+            self.player1.play("PlayerSaque", reset=False, lock=True)
+            return is_moving, (-250, 400)
+        if keys[pygame.K_p]:
+            self.player1.play("PlayerGolpeB", reset=False, lock=True)
+            return is_moving, (-300, 200)
+        return is_moving, None
+
+    def _animar_p1(self, is_moving):
+        if not self.player1.locked:
+            anim = "PlayerWalk" if is_moving else "PlayerIdle"
+            if self.player1.current_anim != anim: self.player1.play(anim, reset=True)
+
+    def _limitar_jugadores(self):
+        """Mantiene a los jugadores en su campo y dentro de la pantalla."""
+        court = self.court
+        # --- Límites de los Jugadores (Tu código original) ---
+        if court.tiene_cancha:
+            if self.player1.rect.top < court.p1_top_min: self.player1.rect.top = court.p1_top_min
+            if self.player2.rect.bottom > court.p2_bottom_max: self.player2.rect.bottom = court.p2_bottom_max
+
+            # Perspectiva Player 2: límites laterales de su fila
+            min_x, max_x = court.p2_x_bounds(self.player2.rect.centery)
+            if self.player2.rect.left < min_x: self.player2.rect.left = min_x
+            if self.player2.rect.right > max_x: self.player2.rect.right = max_x
+
+        # Límites generales
+        izq, arriba, der, abajo = court.player_bounds
+        for p in [self.player1, self.player2]:
+            if p.rect.left < izq: p.rect.left = izq
+            if p.rect.right > der: p.rect.right = der
+            if p.rect.top < arriba: p.rect.top = arriba
+            if p.rect.bottom > abajo: p.rect.bottom = abajo
+
+    def _update_practica(self, dt, dist_umbral=40):
+        """
+        Paso del modo práctica: el J1 se mueve con los mismos controles del
+        partido y su golpe devuelve todas las pelotas de la máquina que
+        están en la zona de la raqueta.
+        """
+        keys = self.input_source.read()
+        self.player1.vx = 0
+        self.player1.vy = 0
+        is_moving, golpe = self._controlar_p1(keys)
+        store = self.ball_machine.store
+        if golpe:
+            cx, cy = self.player1.rect.center
+            devueltas = store.golpear((cx - dist_umbral, cy - 15, 0), (cx + dist_umbral, cy + 15, 75),
+                                      golpe[0], golpe[1], cx)
+            if devueltas:
+                self.practica_devueltas += devueltas
+                self._sonar("golpe")
+        self._animar_p1(is_moving)
+
+        with self.profiler.span("physics"):
+            paso = dt * self.game_speed
+            self.player1.update(paso)
+            self._limitar_jugadores()
+            self.ball_machine.update(paso)
+
+    def _predecir_trayectoria(self):
+        """Trayectoria analítica desde el estado actual de la pelota."""
+        # Límites del centro: la pelota refleja al salir de entre las paredes
+        return Trajectory(self.ball.rect.centerx, self.ball.rect.centery, self.ball.z,
+                          self.ball.vx, self.ball.vy, self.ball.vz, self.GRAVITY, self.BOUNCE,
+                          self.court.ball_x_bounds(self.ball.rect.width / 2))
+
+    def _invalidar_prediccion(self):
+        self._prediccion = None
+        self._intercepcion = {}
+
+    def _punto_intercepcion(self, jugador, yo):
+        """x donde la pelota cruza la línea del jugador (cacheado por golpe)."""
+        x = self._intercepcion.get(jugador)
+        if x is None:
+            if self._prediccion is None:
+                # Sin golpe previo (p. ej. la pelota inicial): se predice una vez
+                self._prediccion = self._predecir_trayectoria()
+            punto = self._prediccion.intercept(yo.rect.centery)
+            x = punto[1] if punto else self.court.center_x
+            self._intercepcion[jugador] = x
+        return x
+
+    def is_idle(self):
+        # En el menú y en pausa nada se anima: se redibuja solo ante eventos
+        return self.state in ("MENU", "PAUSED")
 
     def update_game_logic(self, dt):
         # 1. SI ESTAMOS EN EL MENÚ, NO PROCESAR FÍSICA DE PARTIDO
-        if self.state == "MENU":
+        if self.state in ("MENU", "PAUSED"):
+            return
+
+        if self.state == "LOADING":
+            if self.asset_manager.poll():
+                self._on_assets_loaded()
+                self.state = "MENU"
             return
 
-        keys = pygame.key.get_pressed()
+        if self.state == "PRACTICE":
+            self._update_practica(dt)
+            return
+
+        keys = self.input_source.read()
+        if self.recorder:
+            self.recorder.record(dt, keys)
+        if self.crowd:
+            self.crowd.update(dt)
         dist_umbral = 40 
-        w, h = self.screen.get_size()
-        y_antes = self.ball.rect.centery
+        court = self.court
         
-        # --- LÓGICA DE JUGADOR 1 (SIEMPRE HUMANO) ---
+        # --- LÓGICA DE JUGADOR 1 (HUMANO, O IA EN MODO IA VS IA) ---
         self.player1.vx = 0
         self.player1.vy = 0
         is_moving_p1 = False
         
-        # Variable local para la velocidad actual
-        vel_p1 = 150 * self.game_speed
-        
-        if keys[pygame.K_LEFT]: self.player1.vx = -150; is_moving_p1 = True
-        elif keys[pygame.K_RIGHT]: self.player1.vx = 150; is_moving_p1 = True
-        if keys[pygame.K_UP]: self.player1.vy = -150; is_moving_p1 = True
-        elif keys[pygame.K_DOWN]: self.player1.vy = 150; is_moving_p1 = True
-
-        # Golpes J1
-        if keys[pygame.K_o]:
-            self.player1.play("PlayerSaque", reset=False, lock=True)
-            if self._check_ball_collision(self.player1, dist_umbral):
-                self._aplicar_golpe(jugador=1, vy=-250, vz=400)
-        elif keys[pygame.K_p]:
-            self.player1.play("PlayerGolpeB", reset=False, lock=True)
-            if self._check_ball_collision(self.player1, dist_umbral):
-                self._aplicar_golpe(jugador=1, vy=-300, vz=200)
+        if self.ai_p1:
+            with self.profiler.span("ai"):
+                is_moving_p1 = self._mover_ia(1, dist_umbral)
+        else:
+            is_moving_p1, golpe = self._controlar_p1(keys)
+            if golpe and self._check_ball_collision(self.player1, dist_umbral):
+                self._aplicar_golpe(jugador=1, vy=golpe[0], vz=golpe[1])
 
         # Animaciones J1
-        if not self.player1.locked:
-            anim = "PlayerWalk" if is_moving_p1 else "PlayerIdle"
-            if self.player1.current_anim != anim: self.player1.play(anim, reset=True)
+        self._animar_p1(is_moving_p1)
 
         # --- LÓGICA DE JUGADOR 2 (IA O HUMANO) ---
         self.player2.vx = 0
@@ -251,25 +780,8 @@ class Game(GameLoop):
         is_moving_p2 = False
 
         if self.num_players == 1:
-            # --- IA DIFÍCIL (PREDICTIVA) ---
-            if self.ball.vy < 0: # La pelota viene hacia la IA
-                # Calcular intercepción
-                dist_y = abs(self.player2.rect.centery - self.ball.rect.centery)
-                tiempo = dist_y / abs(self.ball.vy) if self.ball.vy != 0 else 0
-                target_x = self.ball.rect.centerx + (self.ball.vx * tiempo)
-            else:
-                target_x = self.SCREEN_WIDTH // 2 # Volver al centro
-
-            # Movimiento IA
-            if self.player2.rect.centerx < target_x - 10: self.player2.vx = 180; is_moving_p2 = True
-            elif self.player2.rect.centerx > target_x + 10: self.player2.vx = -180; is_moving_p2 = True
-            
-            # Golpe IA
-            if self._check_ball_collision(self.player2, dist_umbral + 10):
-                self.player2.play("EnemyGolpeB", reset=False, lock=True)
-                # La IA tira cruzado: si el humano está a la izquierda, ella tira a la derecha
-                vx_dir = 150 if self.player1.rect.centerx < self.SCREEN_WIDTH // 2 else -150
-                self._aplicar_golpe(jugador=2, vy=300, vz=250, custom_vx=vx_dir)
+            with self.profiler.span("ai"):
+                is_moving_p2 = self._mover_ia(2, dist_umbral)
         else:
             # --- JUGADOR 2 HUMANO (W, A, S, D, Y, U) ---
             if keys[pygame.K_a]: self.player2.vx = -150; is_moving_p2 = True
@@ -292,240 +804,267 @@ class Game(GameLoop):
             if self.player2.current_anim != anim: self.player2.play(anim, reset=True)
 
         # --- FÍSICA GLOBAL ---
-        self.all_sprites.update(dt * self.game_speed)
-        self.ball.vz += self.GRAVITY * dt
-        self.ball.z += self.ball.vz * dt
+        with self.profiler.span("physics"):
+            # Una sola integración por paso: el tiempo de juego es dt escalado por la velocidad
+            paso = dt * self.game_speed
+            self._tiempo_golpe += paso
 
-        # [ Aquí mantén tu código de colisión con la RED y PUNTOS que ya tienes ]
-        # ... (Red, Rebotes en paredes, Perspectiva y Sistema de Puntos) ...
-        
-        # Para choque de pelota con red
-        y_antes = self.ball.rect.centery
-        # Actualizar todos (Moverá la pelota y jugadores)
-        self.all_sprites.update(dt)
+            # Inicio del tramo de la pelota (choque con red y raqueta)
+            y_antes = self.ball.rect.centery
+            self._ball_antes = (self.ball.rect.centerx, y_antes, self.ball.z)
+            # Actualizar todos (Moverá la pelota y jugadores)
+            update_all(self.all_sprites, paso)
 
-        # --- FÍSICA Y PERSPECTIVA DE LA PELOTA ---
-        w, h = self.screen.get_size()
-        
-        # Cambio altura de la pelota
-        self.ball.vz += self.GRAVITY * dt
-        self.ball.z += self.ball.vz * dt
+            # --- FÍSICA Y PERSPECTIVA DE LA PELOTA ---
+            # Cambio altura de la pelota
+            self.ball.vz += self.GRAVITY * paso
+            self.ball.z += self.ball.vz * paso
         
         # --- LÓGICA DE COLISIÓN CON LA RED ---
-        if self.cancha:
-            screen_rect = self.screen.get_rect()
-            cancha_rect = self.cancha.get_rect(center=screen_rect.center)
-            
-            # La red está físicamente en el centro vertical de la cancha
-            net_y_floor = cancha_rect.centery - 10
-            net_height = 55  # Esta es la altura en píxeles de tu sprite de red
+        with self.profiler.span("net"):
+            if court.tiene_cancha:
+                # La red está físicamente en el centro vertical de la cancha
+                net_y_floor = court.net_y
             
-            y_ahora = self.ball.rect.centery
-
-            # Comprobar si la pelota cruzó la línea de la red en este frame
-            # (Si antes estaba arriba y ahora abajo, o viceversa)
-            if (y_antes < net_y_floor <= y_ahora) or (y_ahora <= net_y_floor < y_antes):
-                if 100 < self.ball.rect.centerx < 540:
-                # Si cruza la línea, comprobamos si su altura (Z) es menor a la red
-                    if self.ball.z < net_height:
-                        # ¡CHOQUE! 
-                        # 1. Detenemos avance horizontal y de profundidad
-                        self.ball.vx = 0
-                        self.ball.vy = 0
-                    
-                        # 2. Posicionamos la pelota justo al lado del choque para que no traspase
-                        if y_antes < net_y_floor:
-                            self.ball.rect.bottom = net_y_floor - 1
-                        else:
-                            self.ball.rect.top = net_y_floor + 1
-                    
-                        # 3. Opcional: Un pequeño rebote hacia atrás para que no se quede pegada
-                        # self.ball.vy = -20 if y_ahora > net_y_floor else 20
-        
-        # 3. Rebote
-        if self.ball.z <= 0:
-            self.ball.z = 0
-            if abs(self.ball.vz) > 20:
-                self.ball.vz *= self.BOUNCE
-            else:
-                self.ball.vz = 0
+                # Comprobar si el tramo de la pelota cruzó la línea de la red en
+                # este paso por debajo de su altura (x y z en el instante del cruce)
+                p1 = (self.ball.rect.centerx, self.ball.rect.centery, self.ball.z)
+                t = net_toi(self._ball_antes, p1, net_y_floor, court.NET_X, court.NET_HEIGHT)
+                if t is not None:
+                    # ¡CHOQUE! 
+                    # 1. La pelota vuelve al punto del tramo donde tocó la red (x y
+                    #    altura del instante t), con el borde justo de su lado para que no traspase
+                    p0 = self._ball_antes
+                    x = p0[0] + (p1[0] - p0[0]) * t
+                    z = p0[2] + (p1[2] - p0[2]) * t
+                    medio = self.ball.rect.height // 2 + 1
+                    y = net_y_floor - medio if y_antes < net_y_floor else net_y_floor + medio
+                    self._colocar_pelota(x, y, z)
+
+                    # 2. Rebota hacia atrás amortiguada (cae del lado del que golpeó)
+                    self.ball.vx *= self.REBOTE_RED
+                    self.ball.vy *= -self.REBOTE_RED
+                    self._invalidar_prediccion()
+                    self._sonar("red")
         
-        # 1. Rebotes simples contra las paredes
-        if self.ball.rect.left < 60 or self.ball.rect.right > w - 60:
-            self.ball.vx *= -1
-        if self.ball.rect.top < 30 or self.ball.rect.bottom > h - 30:
-            self.ball.vy *= -1
-
-        # 2. EFECTO PERSPECTIVA: Escala según la posición Y
-        # y=20 (fondo) -> escala 0.4 | y=460 (frente) -> escala 1.2
-        min_y, max_y = 20, 460
-        rango_y = max_y - min_y
-        porcentaje_y = (self.ball.rect.centery - min_y) / rango_y
-        porcentaje_y = max(0, min(1, porcentaje_y)) # Asegurar que esté entre 0 y 1
+        with self.profiler.span("physics"):
+            # 3. Rebote
+            if self.ball.z <= 0:
+                self.ball.z = 0
+                if abs(self.ball.vz) > 20:
+                    self.ball.vz *= self.BOUNCE
+                    self._sonar("bote")
+                else:
+                    self.ball.vz = 0
         
-        self.ball.scale_factor = 0.2 + (porcentaje_y * 0.2)
-
-        # --- Límites de los Jugadores (Tu código original) ---
-        if self.cancha:
-            screen_rect = self.screen.get_rect()
-            estadio_rect = self.estadio.get_rect(center=screen_rect.center) if self.estadio else screen_rect
-            red_rect = self.red.get_rect(center=screen_rect.center) if self.red else screen_rect
+            # 1. Rebotes simples contra las paredes
+            izq, arriba, der, abajo = court.paredes
+            if self.ball.rect.left < izq or self.ball.rect.right > der:
+                self.ball.vx *= -1
+            if self.ball.rect.top < arriba or self.ball.rect.bottom > abajo:
+                self.ball.vy *= -1
+                # Cambió de sentido en profundidad: la intercepción ya no vale
+                self._invalidar_prediccion()
 
-            if self.player1.rect.top < (red_rect.bottom - 130): self.player1.rect.top = red_rect.bottom - 130
-            if self.player2.rect.bottom > (red_rect.top -10): self.player2.rect.bottom = red_rect.top - 10
-            
-            # Perspectiva Player 2
-            max_w_p2, min_w_p2 = w * 0.4, w * 0.2
-            red_y, top_y = estadio_rect.centery - 55, estadio_rect.top
-            f = max(0, min(1, (red_y - self.player2.rect.centery) / (red_y - top_y)))
-            allowed_w = min_w_p2 + (max_w_p2 - min_w_p2) * (1 - f)
-            if self.player2.rect.left < estadio_rect.centerx - allowed_w: self.player2.rect.left = estadio_rect.centerx - allowed_w
-            if self.player2.rect.right > estadio_rect.centerx + allowed_w: self.player2.rect.right = estadio_rect.centerx + allowed_w
+            # 2. EFECTO PERSPECTIVA: Escala según la fila (tabla de la proyección)
+            self.ball.scale_factor = court.scale_at(self.ball.rect.centery)
 
-        # Límites generales
-        for p in [self.player1, self.player2]:
-            if p.rect.left < 0: p.rect.left = 0
-            if p.rect.right > w: p.rect.right = w 
-            if p.rect.top < -15: p.rect.top = -15
-            if p.rect.bottom > (h - 20): p.rect.bottom = h - 20
+            self._limitar_jugadores()
             
         # --- SISTEMA DE PUNTOS ---
 
         # --- LÓGICA DE REBOTE Y PUNTOS ---
-        if self.ball.z <= 0 and not self.punto_finalizado:
-            self.ball.z = 0
+        with self.profiler.span("scoring"):
+            if self.ball.z <= 0 and not self.punto_finalizado:
+                self.ball.z = 0
             
-            # Definimos el rectángulo de la cancha basado en tu sprite (ajusta si es necesario)
-            rect_cancha = pygame.Rect(120, 100, 400, 280) 
-            mitad_y = rect_cancha.centery
+                # Zona de juego y mitad de la cancha (de la proyección)
+                rect_cancha = court.court_rect
+                mitad_y = court.mitad_y
             
-            # 1. ¿Cayó fuera de la cancha completa? (OUT)
-            if not rect_cancha.collidepoint(self.ball.rect.center):
-                # El punto va para el rival del que golpeó
-                # Si golpeó P1 (1), punto para P2 (índice 1). Si golpeó P2 (2), punto para P1 (índice 0).
-                punto_para = 1 if self.ultimo_en_golpear == 1 else 0
-                self.anotar_punto(punto_para)
-                self.punto_finalizado = True
-                self.reset_for_serve()
-
-            # 2. ¿Cayó dentro de la cancha?
-            else:
-                if self.rebotó_una_vez:
-                    # SEGUNDO rebote: Punto para el que lanzó la pelota
-                    # P1 lanza -> punto para P1 (0). P2 lanza -> punto para P2 (1).
-                    self.anotar_punto(self.ultimo_en_golpear - 1)
+                # 1. ¿Cayó fuera de la cancha completa? (OUT; tras un pique válido
+                # el segundo bote cuenta para el que golpeó aunque caiga afuera)
+                if not self.rebotó_una_vez and not rect_cancha.collidepoint(self.ball.rect.center):
+                    # El punto va para el rival del que golpeó
+                    # Si golpeó P1 (1), punto para P2 (índice 1). Si golpeó P2 (2), punto para P1 (índice 0).
+                    punto_para = 1 if self.ultimo_en_golpear == 1 else 0
+                    self.anotar_punto(punto_para)
                     self.punto_finalizado = True
                     self.reset_for_serve()
+
+                # 2. ¿Cayó dentro de la cancha?
                 else:
-                    # PRIMER rebote: Validar red y campo correcto
-                    # Si P1 golpea, centery DEBE ser < mitad_y (campo de arriba)
-                    # Si P2 golpea, centery DEBE ser > mitad_y (campo de abajo)
-                    lado_incorrecto = (self.ultimo_en_golpear == 1 and self.ball.rect.centery > mitad_y) or \
-                                      (self.ultimo_en_golpear == 2 and self.ball.rect.centery < mitad_y)
-                    
-                    if lado_incorrecto:
-                        # No pasó la red: punto para el rival
-                        punto_para = 1 if self.ultimo_en_golpear == 1 else 0
-                        self.anotar_punto(punto_para)
+                    if self.rebotó_una_vez:
+                        # SEGUNDO rebote: Punto para el que lanzó la pelota
+                        # P1 lanza -> punto para P1 (0). P2 lanza -> punto para P2 (1).
+                        self.anotar_punto(self.ultimo_en_golpear - 1)
                         self.punto_finalizado = True
                         self.reset_for_serve()
                     else:
-                        # Rebote válido, sigue el juego
-                        self.rebotó_una_vez = True
-                        # Usamos la constante BOUNCE que tengas definida para mantener consistencia
-                        self.ball.vz *= self.BOUNCE if hasattr(self, 'BOUNCE') else -0.5
+                        # PRIMER rebote: Validar red y campo correcto
+                        # Si P1 golpea, centery DEBE ser < mitad_y (campo de arriba)
+                        # Si P2 golpea, centery DEBE ser > mitad_y (campo de abajo)
+                        lado_incorrecto = (self.ultimo_en_golpear == 1 and self.ball.rect.centery > mitad_y) or \
+                                          (self.ultimo_en_golpear == 2 and self.ball.rect.centery < mitad_y)
+                    
+                        if lado_incorrecto:
+                            # No pasó la red: punto para el rival
+                            punto_para = 1 if self.ultimo_en_golpear == 1 else 0
+                            self.anotar_punto(punto_para)
+                            self.punto_finalizado = True
+                            self.reset_for_serve()
+                        else:
+                            # Rebote válido, sigue el juego (el rebote ya lo aplicó la física:
+                            # aplicarlo de nuevo invertía vz y la pelota picaba dos veces seguidas)
+                            self.rebotó_una_vez = True
 
           
-        # Si la pelota se detiene (choca con la red o se queda muerta)
-        elif self.ball.vx == 0 and self.ball.vy == 0 and self.ball.z == 0:
-            # Podrías añadir un temporizador aquí antes de resetear
-            pass
+            # Si la pelota se detiene (choca con la red o se queda muerta)
+            elif self.ball.vx == 0 and self.ball.vy == 0 and self.ball.z == 0:
+                # Podrías añadir un temporizador aquí antes de resetear
+                pass
+
+    def _layout(self):
+        """Rects de estadio, cancha y red centrados en la pantalla (ya calculados en la proyección)."""
+        court = self.court
+        return court.estadio_rect, court.cancha_rect, court.red_rect
+
+    def _bake_background(self):
+        """Compone estadio, cancha y red en una sola Surface estática."""
+        background = pygame.Surface(self.screen.get_size()).convert()
+        estadio_rect, cancha_rect, red_rect = self._layout()
+
+        if self.estadio:
+            background.fill((0, 0, 0))
+            background.blit(self.estadio, estadio_rect.topleft)
+        else:
+            background.fill((30, 30, 40))
+
+        if self.cancha: background.blit(self.cancha, cancha_rect.topleft)
+        if red_rect: background.blit(self.red, red_rect.topleft)
+        return background
 
     def draw_game_elements(self):
-    
-        self.screen.fill((0, 0, 0)) # Fondo negro clásico
+
+        if self.state == "LOADING":
+            self.screen.fill((0, 0, 0))
+            self.hud.draw_loading(self.screen, self.loading_progress)
+            return None
         
         if self.state == "MENU":
             
-            font = pygame.font.SysFont("monospace", 30)
-            
-            # Dibujar Fila 1: Jugadores
-            color_p = (255, 255, 0) if self.menu_row == 0 else (255, 255, 255)
-            txt_p = font.render(f"PLAYERS: < {self.option_players} >", True, color_p)
-            self.screen.blit(txt_p, (150, 200))
-            
-            # Dibujar Fila 2: Velocidad
-            speeds_txt = ["SLOW", "NORMAL", "FAST"]
-            color_s = (255, 255, 0) if self.menu_row == 1 else (255, 255, 255)
-            txt_s = font.render(f"SPEED: < {speeds_txt[self.option_speed]} >", True, color_s)
-            self.screen.blit(txt_s, (150, 260))
-
-            # Cursor NES (Triángulo a la izquierda de la fila activa)
-         
-            cursor_y = 255 if self.menu_option == 1 else 305
-            pygame.draw.polygon(self.screen, (255, 255, 255), 
-                                [(self.SCREEN_WIDTH//2 - 110, cursor_y), 
-                                 (self.SCREEN_WIDTH//2 - 110, cursor_y + 20), 
-                                 (self.SCREEN_WIDTH//2 - 90, cursor_y + 10)])
-        
-        elif self.state == "PLAYING":
+            self.screen.fill((0, 0, 0)) # Fondo negro clásico
+            self.hud.draw_menu(self.screen, self.option_players, self.option_speed,
+                               self.menu_row, self.menu_option)
+            if self.show_profiler:
+                self.hud.draw_profiler(self.screen, self.profiler)
+
+            # Al volver al partido hay que redibujar la pantalla entera
+            self.renderer.invalidate()
+            return None
+
+        elif self.state == "PRACTICE":
+
+            # Cientos de pelotas: se redibuja todo y se presenta entero
+            if self.renderer.background is None:
+                self.renderer.set_background(self._bake_background())
+            self.screen.blit(self.renderer.background, (0, 0))
+            frame = self.ball.animations["girar"][0][0]
+            self.ball_machine.draw(self.screen, frame, self.ball.surface_cache, self.alpha)
+            self.player1.draw(self.screen, self.alpha)
+            self.hud.draw_practice(self.screen, self.practica_devueltas)
+            self.hud.draw_fps(self.screen, self.clock)
+            if self.show_profiler:
+                self.hud.draw_profiler(self.screen, self.profiler)
+
+            self.renderer.invalidate()
+            return None
         
-            screen_rect = self.screen.get_rect()
+        elif self.state in ("PLAYING", "PAUSED"):
 
-            if self.estadio: self.screen.blit(self.estadio, self.estadio.get_rect(center=screen_rect.center).topleft)
-            else:
-                self.screen.fill((30, 30, 40)) 
+            if self.renderer.background is None:
+                self.renderer.set_background(self._bake_background())
+            self.renderer.begin_frame()
+            mark = self.renderer.mark
 
-            if self.cancha: self.screen.blit(self.cancha, self.cancha.get_rect(center=screen_rect.center).topleft)
+            # Público de las tribunas del fondo (detrás de todo lo que se mueve).
+            # Se repinta él mismo: sus rects solo se presentan
+            if self.crowd:
+                self.crowd.begin_frame(self.screen, self.renderer.background, self.renderer.restored,
+                                       self._ms_presentar_publico())
+                for capa in (self.TRIBUNA_IZQ, self.TRIBUNA_DER):
+                    for rect in self.crowd.draw(self.screen, capa):
+                        self.renderer.present(rect)
         
-            # Dibujamos la sombra (usamos getattr por seguridad)
-            z_actual = getattr(self.ball, 'z', 0)
+            # Posición de la pelota interpolada entre pasos fijos
+            ball_x, ball_y, z_actual = self.ball.interpolated_position(self.alpha)
+            detras_de_red = []
         
             # Dibujamos la sombra siempre que la pelota no esté "bajo tierra"
             if z_actual >= 0:
             # La sombra se hace un poco más pequeña si la pelota sube mucho
-                factor_sombra = self.ball.scale_factor * (1 - min(0.5, z_actual / 500))
-                shadow_w = int(20 * factor_sombra)
-                shadow_h = int(10 * factor_sombra)
+                shadow_w, shadow_h = self.court.shadow_size(ball_y, z_actual)
             
             # Crear superficie de sombra con transparencia
                 shadow_surf = pygame.Surface((shadow_w * 2, shadow_h * 2), pygame.SRCALPHA)
                 pygame.draw.ellipse(shadow_surf, (0, 0, 0, 100), shadow_surf.get_rect())
             
             # IMPORTANTE: La sombra se dibuja en la posición real (el suelo)
-                self.screen.blit(shadow_surf, shadow_surf.get_rect(center=self.ball.rect.center))
+                detras_de_red.append(mark(self.screen.blit(shadow_surf, shadow_surf.get_rect(center=(round(ball_x), round(ball_y))))))
 
             # DIBUJAR EN ORDEN DE PROFUNDIDAD
-            self.player2.draw(self.screen) # Jugador al fondo
+            detras_de_red.append(mark(self.player2.draw(self.screen, self.alpha))) # Jugador al fondo
         
             # Dibujar Pelota (la lógica de escala debe estar en el draw de GameObject)
-            self.ball.draw(self.screen)
+            detras_de_red.append(mark(self.ball.draw(self.screen, self.alpha)))
+
+            # La red ya está en el fondo: solo se repinta donde la taparon
+            _, _, red_rect = self._layout()
+            if red_rect:
+                self.renderer.restore(self.red, red_rect.topleft, detras_de_red)
 
-            if self.red and self.cancha:
-                cancha_rect = self.cancha.get_rect(center=screen_rect.center)
-                red_rect = self.red.get_rect(midtop=(cancha_rect.centerx, cancha_rect.centery - 55))
-                self.screen.blit(self.red, red_rect.topleft)
+            mark(self.player1.draw(self.screen, self.alpha)) # Jugador al frente
 
-            self.player1.draw(self.screen) # Jugador al frente
+            # La tribuna de adelante tapa al jugador 1 cuando baja hasta el borde
+            if self.crowd:
+                for rect in self.crowd.draw(self.screen, self.TRIBUNA_FRENTE):
+                    self.renderer.present(rect)
         
             # --- DIBUJAR MARCADOR ---
-            font = pygame.font.SysFont("Arial", 20, bold=True)
-
             # Obtener los textos de tenis (0, 15, 30, 40, AD)
-            p1_tenis = self.puntos_tenis[self.indices_puntos[0]]
-            p2_tenis = self.puntos_tenis[self.indices_puntos[1]]
-            texto_juegos = font.render(f"GAMES - P1: {self.games_ganados[0]} | P2: {self.games_ganados[1]}", True, (255, 255, 255))
-            texto_puntos = font.render(f"PUNTOS - P1: {p1_tenis} | P2: {p2_tenis}", True, (255, 255, 0))
-
-            self.screen.blit(texto_juegos, (20, 20))
-            self.screen.blit(texto_puntos, (20, 45))
-        
+            if self.tiebreak:
+                p1_tenis, p2_tenis = (str(p) for p in self.indices_puntos)
+            else:
+                p1_tenis = self.puntos_tenis[self.indices_puntos[0]]
+                p2_tenis = self.puntos_tenis[self.indices_puntos[1]]
+            mark(self.hud.draw_scoreboard(self.screen, (p1_tenis, p2_tenis), self.games_ganados,
+                                          self.sets_ganados, self.probabilidad_victoria()))
 
             # FPS
-            font = pygame.font.SysFont(None, 20)
-            fps_text = font.render(f"FPS: {int(self.clock.get_fps())}", True, (255, 255, 255))
-            self.screen.blit(fps_text, (5, 5))
+            mark(self.hud.draw_fps(self.screen, self.clock))
+
+            if self.show_profiler:
+                mark(self.hud.draw_profiler(self.screen, self.profiler))
+
+            if self.state == "PAUSED":
+                # El cartel tapa la escena: al reanudar se redibuja entera
+                self.hud.draw_paused(self.screen)
+                self.renderer.invalidate()
+                return None
+
+            rects = self.renderer.end_frame()
+            if rects is None:
+                self._px_presentados = self.screen.get_width() * self.screen.get_height()
+            else:
+                self._px_presentados = sum(r.w * r.h for r in rects)
+            return rects
         
+    def _ms_presentar_publico(self):
+        """Parte del último present (por píxeles) que corresponde a los rects del público."""
+        if not self._px_presentados:
+            return 0.0
+        return self.profiler.last("flip") * self.crowd.px_presentados / self._px_presentados
+
     def reset_for_serve(self):
         """Posiciona la pelota frente al jugador que saca"""
         self.ball.vx = 0
@@ -541,12 +1080,49 @@ class Game(GameLoop):
             # Frente al Jugador 2 (arriba)
             self.ball.rect.centerx = self.player2.rect.centerx -20 
             self.ball.rect.centery = self.player2.rect.bottom - 50
+
+        # La pelota aparece en el saque, no debe interpolarse desde donde estaba
+        # ni barrer colisiones desde allí
+        self.ball.save_previous_state()
+        self._ball_antes = None
+        self._invalidar_prediccion()
             
             
+    def _reiniciar_marcador(self):
+        self.indices_puntos = [0, 0]
+        self.games_ganados = [0, 0]
+        self.sets_ganados = [0, 0]
+        self.sets_jugados = []
+        self.tiebreak = False
+        self.primero_tiebreak = None
+        self.ganador = None
+        self.stats_saque = [[0, 0], [0, 0]]
+        self.server = 1
+
     def anotar_punto(self, jugador_index): # 0 para P1, 1 para P2
+        if self.ganador is not None:
+            return
         rival_index = 1 if jugador_index == 0 else 0
-        
-        # Lógica simplificada de puntuación
+        self._sonar("publico")
+        if self.crowd:
+            self.crowd.celebrar()
+
+        stats = self.stats_saque[self.server - 1]
+        stats[1] += 1
+        if jugador_index == self.server - 1:
+            stats[0] += 1
+
+        if self.tiebreak:
+            # Tie-break: puntos corridos, a 7 con diferencia de 2
+            self.indices_puntos[jugador_index] += 1
+            a, b = self.indices_puntos[jugador_index], self.indices_puntos[rival_index]
+            if a >= self.PUNTOS_TIEBREAK and a - b >= 2:
+                self.ganar_game(jugador_index)
+            else:
+                self.server = sacador_tiebreak(self.primero_tiebreak, sum(self.indices_puntos))
+            return
+
+        # Puntuación de un game (0, 15, 30, 40, AD)
         if self.indices_puntos[jugador_index] < 3: # De 0 a 30
             self.indices_puntos[jugador_index] += 1
         elif self.indices_puntos[jugador_index] == 3: # Está en 40
@@ -560,9 +1136,55 @@ class Game(GameLoop):
             self.ganar_game(jugador_index)
 
     def ganar_game(self, jugador_index):
+        rival_index = 1 if jugador_index == 0 else 0
         self.games_ganados[jugador_index] += 1
         self.indices_puntos = [0, 0] # Resetear puntos del game
-        print(f"Juego para el Jugador {jugador_index + 1}!")
+        if not self.headless:
+            print(f"Juego para el Jugador {jugador_index + 1}!")
+
+        # El saque alterna cada game; tras el tie-break abre quien recibió primero
+        if self.tiebreak:
+            self.server = 3 - self.primero_tiebreak
+            self.tiebreak = False
+            self.primero_tiebreak = None
+            self.ganar_set(jugador_index)
+            return
+        self.server = 3 - self.server
+
+        games, rival = self.games_ganados[jugador_index], self.games_ganados[rival_index]
+        if games >= self.GAMES_POR_SET and games - rival >= 2:
+            self.ganar_set(jugador_index)
+        elif games == rival == self.GAMES_POR_SET:
+            self.tiebreak = True
+            self.primero_tiebreak = self.server
+
+    def ganar_set(self, jugador_index):
+        self.sets_ganados[jugador_index] += 1
+        self.sets_jugados.append(tuple(self.games_ganados))
+        self.games_ganados = [0, 0]
+        if not self.headless:
+            print(f"Set para el Jugador {jugador_index + 1}! ({self.sets_ganados[0]}-{self.sets_ganados[1]})")
+        if self.sets_ganados[jugador_index] >= self.SETS_PARA_GANAR:
+            self.ganador = jugador_index
+            if not self.headless:
+                print(f"Partido para el Jugador {jugador_index + 1}!")
+
+    def probabilidad_victoria(self):
+        """
+        Probabilidad de que gane el Jugador 1 desde el marcador actual, con la
+        tasa de puntos ganados al saque de cada uno (suavizada hacia
+        P_SAQUE_INICIAL). Las tasas se redondean a centésimos para reutilizar
+        las tablas memoizadas: cada consulta es O(1).
+        """
+        if self.ganador is not None:
+            return 1.0 if self.ganador == 0 else 0.0
+        tasas = []
+        for ganados, jugados in self.stats_saque:
+            p = (ganados + self.P_SAQUE_INICIAL * self.PESO_INICIAL) / (jugados + self.PESO_INICIAL)
+            tasas.append(min(0.99, max(0.01, round(p, 2))))
+        tabla = odds(tasas[0], tasas[1], self.SETS_PARA_GANAR, self.GAMES_POR_SET)
+        return tabla.win_probability(self.indices_puntos, self.games_ganados, self.sets_ganados,
+                                     self.server, self.tiebreak, self.primero_tiebreak)
         
     def _aplicar_golpe(self, jugador, vy, vz, custom_vx=None):
         """
@@ -575,9 +1197,15 @@ class Game(GameLoop):
         self.ultimo_en_golpear = jugador
         self.rebotó_una_vez = False
         self.punto_finalizado = False
+        self._sonar("golpe")
         
         self.ball.vy = vy
         self.ball.vz = vz
+
+        # Nuevo desvío de puntería de la IA para el próximo golpe
+        if self.ai_error:
+            self._ia_desvio = {1: self.rng.gauss(0, self.ai_error),
+                               2: self.rng.gauss(0, self.ai_error)}
         
         if custom_vx is not None:
             self.ball.vx = custom_vx
@@ -586,3 +1214,8 @@ class Game(GameLoop):
             # Si toca el borde derecho, sale hacia la derecha
             jugador_obj = self.player1 if jugador == 1 else self.player2
             self.ball.vx = (self.ball.rect.centerx - jugador_obj.rect.centerx) * 4
+
+        # Trayectoria del golpe: se resuelve una sola vez y la IA la consulta
+        self._invalidar_prediccion()
+        self._prediccion = self._predecir_trayectoria()
+        self._tiempo_golpe = 0.0
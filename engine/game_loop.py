@@ -1,56 +1,270 @@
 # engine/game_loop.py
 import pygame
 
+from engine import startup
+from engine.profiler import FrameProfiler
+
 
 class GameLoop:
     """
     Clase base que gestiona el bucle principal, eventos, actualizaciones y dibujado.
     Los juegos específicos deben heredar de esta clase.
+
+    Si se pasa tick_rate, la simulación avanza en pasos fijos de 1/tick_rate
+    segundos (acumulador) y el dibujado interpola entre los dos últimos pasos.
+    Con tick_rate=None se usa el dt variable de clock.tick (modo clásico).
+
+    Con headless=True no se abre ventana ni se dibuja: self.screen es una
+    Surface en memoria y la simulación se avanza a mano con step().
+
+    Con lazy_init=True (por defecto) solo se inicializa el display; fuentes,
+    mixer y joystick se levantan al primer uso con startup.ensure().
+
+    Mientras is_idle() devuelva True (menús, pausa) no se corre a fps fijos:
+    el bucle se bloquea en pygame.event.wait y solo redibuja al llegar un
+    evento o tras request_redraw().
+
+    Resolución interna fija: se dibuja siempre en self.screen
+    (screen_width x screen_height). Si la ventana (window_size, o la pantalla
+    completa) tiene otro tamaño, self.screen es una Surface fuera de pantalla
+    y se presenta con un único escalado centrado en self.window:
+    scale_filter="nearest" usa el mayor factor entero que entra (y con él
+    solo se escalan los rects sucios); "smooth" ocupa todo lo que permite la
+    proporción con smoothscale.
     """
 
-    def __init__(self, screen_width, screen_height, title, fps):
-        pygame.init()
-        pygame.mixer.init()
+    SCALE_FILTERS = ("nearest", "smooth")
 
-        self.screen = pygame.display.set_mode((screen_width, screen_height))
-        pygame.display.set_caption(title)
+    def __init__(self, screen_width, screen_height, title, fps,
+                 tick_rate=None, max_steps_per_frame=5, headless=False, lazy_init=True,
+                 window_size=None, fullscreen=False, scale_filter="nearest"):
+        self.headless = headless
+        if headless:
+            # Sin display: solo una Surface con el tamaño lógico de la pantalla
+            self.screen = pygame.Surface((screen_width, screen_height))
+            self.window = None
+            self.scale_filter = scale_filter
+        else:
+            if lazy_init:
+                startup.ensure("display")
+            else:
+                pygame.mixer.pre_init(**startup.MIXER_CONFIG)
+                pygame.init()
+                pygame.mixer.init()
+
+            if fullscreen:
+                # (0, 0): resolución del escritorio
+                self.window = pygame.display.set_mode(window_size or (0, 0), pygame.FULLSCREEN)
+            else:
+                self.window = pygame.display.set_mode(window_size or (screen_width, screen_height))
+            pygame.display.set_caption(title)
+            if self.window.get_size() == (screen_width, screen_height):
+                # Mismo tamaño: se dibuja directo en la ventana, sin escalar
+                self.screen = self.window
+            else:
+                self.screen = pygame.Surface((screen_width, screen_height)).convert()
+            self.set_scale_filter(scale_filter)
         self.clock = pygame.time.Clock()
         self.fps = fps
         self.running = False
 
-    def _handle_events(self):
+        # --- Paso fijo ---
+        self.tick_rate = tick_rate
+        self.fixed_dt = 1.0 / tick_rate if tick_rate else None
+        # Tope de pasos por frame para evitar la "espiral de la muerte"
+        self.max_steps_per_frame = max_steps_per_frame
+        self.accumulator = 0.0
+        # Fracción entre el paso anterior y el actual (0..1) usada al dibujar
+        self.alpha = 1.0
+
+        # Tiempos por fase (eventos, update, draw, flip); apagado en headless
+        self.profiler = FrameProfiler(enabled=not headless)
+        self._first_frame = True
+        startup.timeline.mark("init")
+
+        # --- Reposo por eventos ---
+        # Despertar periódico aunque no haya entrada (0 = esperar indefinidamente)
+        self.idle_timeout_ms = 1000
+        self._needs_redraw = True
+        self._was_idle = False
+
+    def _handle_events(self, events=None):
         """Maneja eventos globales como cerrar la ventana."""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            self.handle_specific_events(event)
+        with self.profiler.span("events"):
+            for event in pygame.event.get() if events is None else events:
+                self._needs_redraw = True
+                if event.type == pygame.QUIT:
+                    self.running = False
+                self.handle_specific_events(event)
 
     def _update(self, dt):
         """Llama al método de actualización de la clase hija con dt en segundos."""
-        self.update_game_logic(dt)
+        with self.profiler.span("update"):
+            self.update_game_logic(dt)
+
+    def _update_fixed(self, frame_dt):
+        """
+        Consume el tiempo real del frame en pasos de fixed_dt.
+        Si el frame tardó demasiado se descarta el atraso en vez de
+        encadenar cada vez más pasos (espiral de la muerte).
+        """
+        self.accumulator += frame_dt
+        steps = 0
+        while self.accumulator >= self.fixed_dt:
+            if steps >= self.max_steps_per_frame:
+                self.accumulator = 0.0
+                break
+            self.store_previous_state()
+            self._update(self.fixed_dt)
+            self.accumulator -= self.fixed_dt
+            steps += 1
+        self.alpha = self.accumulator / self.fixed_dt
+
+    def step(self, dt=None):
+        """
+        Avanza la simulación un paso sin eventos ni dibujado (modo headless).
+        Sin dt se usa el paso fijo configurado.
+        """
+        if dt is None:
+            dt = self.fixed_dt or 1.0 / self.fps
+        self.store_previous_state()
+        self._update(dt)
+
+    def set_scale_filter(self, scale_filter):
+        """Elige el filtro de escalado ("nearest" o "smooth") y recalcula dónde se presenta."""
+        if scale_filter not in self.SCALE_FILTERS:
+            raise ValueError(f"Filtro de escalado desconocido: {scale_filter!r}")
+        self.scale_filter = scale_filter
+        if self.window is None or self.screen is self.window:
+            return
+
+        ww, wh = self.window.get_size()
+        sw, sh = self.screen.get_size()
+        factor = min(ww / sw, wh / sh)
+        # Con nearest, factor entero si la ventana lo permite (píxeles parejos)
+        self._int_scale = int(factor) if scale_filter == "nearest" and factor >= 1 else None
+        if self._int_scale:
+            factor = self._int_scale
+        self._present_rect = pygame.Rect(0, 0, int(sw * factor), int(sh * factor))
+        self._present_rect.center = (ww // 2, wh // 2)
+        # Destino fijo del escalado: no se crea ninguna Surface por frame
+        self._present_target = self.window.subsurface(self._present_rect)
+
+        # Bandas negras alrededor de la imagen
+        self.window.fill((0, 0, 0))
+        self._present_full = True
+
+    def _present(self, rects):
+        """Lleva el frame de self.screen a la ventana (rects None = completo)."""
+        if self.screen is self.window:
+            if rects is None:
+                pygame.display.flip()
+            else:
+                # Solo se presentan las zonas que cambiaron
+                pygame.display.update(rects)
+            return
+
+        if self._int_scale and rects is not None and not self._present_full:
+            # Factor entero: cada rect sucio se escala por separado sin costuras
+            k = self._int_scale
+            ox, oy = self._present_rect.topleft
+            bounds = self.screen.get_rect()
+            destinos = []
+            for rect in rects:
+                rect = rect.clip(bounds)
+                if not (rect.w and rect.h):
+                    continue
+                destino = pygame.Rect(ox + rect.x * k, oy + rect.y * k, rect.w * k, rect.h * k)
+                pygame.transform.scale(self.screen.subsurface(rect), destino.size,
+                                       self.window.subsurface(destino))
+                destinos.append(destino)
+            pygame.display.update(destinos)
+            return
+
+        if self.scale_filter == "smooth":
+            pygame.transform.smoothscale(self.screen, self._present_rect.size, self._present_target)
+        else:
+            pygame.transform.scale(self.screen, self._present_rect.size, self._present_target)
+        # La primera vez también hay que mostrar las bandas negras
+        pygame.display.flip()
+        self._present_full = False
 
     def _draw(self):
         """Llama al método de dibujado de la clase hija."""
-        self.draw_game_elements()
-        pygame.display.flip()
+        if self.headless:
+            return
+        with self.profiler.span("draw"):
+            rects = self.draw_game_elements()
+        with self.profiler.span("flip"):
+            self._present(rects)
+
+        if self._first_frame:
+            self._first_frame = False
+            startup.timeline.mark("first_frame")
+
+    def request_redraw(self):
+        """Pide un redibujado aunque la escena esté en reposo."""
+        self._needs_redraw = True
+
+    def _idle_frame(self):
+        """
+        Un ciclo en reposo: espera un evento (o idle_timeout_ms) sin gastar CPU
+        y dibuja solo si algo cambió. No avanza la simulación.
+        """
+        if not self._needs_redraw:
+            event = pygame.event.wait(self.idle_timeout_ms)
+            if event.type != pygame.NOEVENT:
+                self._handle_events([event] + pygame.event.get())
+        if self._needs_redraw and self.running:
+            self._needs_redraw = False
+            self._draw()
+        # Al salir del reposo el primer dt (y el primer frame del perfilador)
+        # no debe incluir la espera
+        self.clock.tick()
+        self.accumulator = 0.0
+        self.profiler.discard_frame()
 
     def run(self):
         """El bucle principal del juego."""
         self.running = True
         while self.running:
+            if self.is_idle():
+                if not self._was_idle:
+                    self._was_idle = True
+                    self._needs_redraw = True
+                self._idle_frame()
+                continue
+            self._was_idle = False
+
             dt = self.clock.tick(self.fps) / 1000.0  # milisegundos → segundos
             self._handle_events()
-            self._update(dt)
+            if self.fixed_dt:
+                self._update_fixed(dt)
+            else:
+                self._update(dt)
+                self.alpha = 1.0
             self._draw()
+            self.profiler.end_frame()
         pygame.quit()
 
     # --- Métodos para ser sobreescritos por las clases hijas ---
+    def is_idle(self):
+        """True si no hay nada animándose y basta con redibujar ante eventos."""
+        return False
+
     def handle_specific_events(self, event):
         pass
 
     def update_game_logic(self, dt):
         pass
 
-    def draw_game_elements(self):
+    def store_previous_state(self):
+        """Guarda el estado previo a cada paso fijo (para interpolar al dibujar)."""
         pass
 
+    def draw_game_elements(self):
+        """
+        Dibuja el frame. Puede devolver la lista de rects que cambiaron
+        para presentar solo esas zonas; con None se presenta la pantalla entera.
+        """
+        pass
@@ -1,29 +1,61 @@
 # engine/game_object.py
 import pygame
 
+from engine.animation import build_clips
+from engine.surface_cache import SurfaceCache
 
-class GameObject(pygame.sprite.Sprite):
+
+class GameObject:
     """
     Clase base mejorada que maneja imágenes estáticas y animaciones nombradas.
     Compatible con spritesheets con duración por frame.
+
+    Entidad compacta: atributos fijos en __slots__ (sin __dict__ por objeto)
+    y altura/velocidad vertical/escala explícitas en todos los objetos.
+    El rect es la posición entera; frac_x/frac_y acumulan la parte
+    sub-píxel del movimiento para no perderla al truncar.
+
+    Las animaciones son AnimationClip compartidos; el objeto solo guarda el
+    tiempo transcurrido en el clip actual (anim_time, ms) y el frame se
+    busca en la tabla del clip, así un dt largo no atrasa la animación.
     """
 
-    def __init__(self, x, y, animations, default_anim=None):
-        super().__init__()
+    __slots__ = (
+        "animations", "current_anim", "current_frame", "image", "anim_time",
+        "rect", "frac_x", "frac_y", "vx", "vy", "z", "vz", "scale_factor",
+        "flip_x", "locked", "prev_x", "prev_y", "prev_z",
+        "__weakref__",  # dueño de spritesheets (Spritesheet.acquire)
+    )
 
-        # animations: dict { anim_name: [ (Surface, duration_ms), ... ] }
-        self.animations = animations
+    # Cache de frames espejados/escalados compartido por todos los objetos
+    surface_cache = SurfaceCache(max_entries=256)
+
+    def __init__(self, x, y, animations, default_anim=None):
+        # animations: dict { anim_name: AnimationClip }. Las listas
+        # [(Surface, duration_ms), ...] se convierten, pero entonces el clip
+        # es propio del objeto: para compartirlo, pasar clips ya armados.
+        self.animations = build_clips(animations)
         self.current_anim = default_anim or list(animations.keys())[0]
 
         self.current_frame = 0
-        self.image, self.frame_duration = self.animations[self.current_anim][self.current_frame]
-        self.rect = self.image.get_rect(center=(x, y))
+        clip = self.animations[self.current_anim]
+        self.image = clip.surfaces[0]
+        # El rect tiene el tamaño del frame sin recortar (atlas recortados)
+        self.rect = pygame.Rect((0, 0), clip.source_size(0))
+        self.rect.center = (x, y)
 
-        self.anim_timer = 0  # acumulador en ms
+        self.anim_time = 0.0  # ms transcurridos en el clip actual
 
-        # Movimiento
+        # Movimiento (px/s) y resto sub-píxel acumulado
         self.vx = 0
         self.vy = 0
+        self.frac_x = 0.0
+        self.frac_y = 0.0
+
+        # Altura sobre el suelo (solo la usa la pelota) y escala de perspectiva
+        self.z = 0.0
+        self.vz = 0.0
+        self.scale_factor = 1.0
                 
         # Control de espejo
         self.flip_x = False
@@ -31,6 +63,43 @@ class GameObject(pygame.sprite.Sprite):
         # 🔒 control de bloqueo de animación
         self.locked = False 
 
+        # Posición del paso anterior (para interpolar al dibujar)
+        self.save_previous_state()
+
+    def save_previous_state(self):
+        """Guarda la posición actual como la del paso anterior."""
+        self.prev_x, self.prev_y = self.rect.center
+        self.prev_z = self.z
+
+    def snapshot(self):
+        """Estado mínimo del objeto como tupla inmutable (rollback, pruebas)."""
+        return (self.rect.x, self.rect.y, self.frac_x, self.frac_y, self.vx, self.vy,
+                self.z, self.vz, self.scale_factor,
+                self.current_anim, self.current_frame, self.anim_time,
+                self.locked, self.flip_x)
+
+    def restore(self, state):
+        """Vuelve al estado devuelto por snapshot()."""
+        (self.rect.x, self.rect.y, self.frac_x, self.frac_y, self.vx, self.vy,
+         self.z, self.vz, self.scale_factor,
+         self.current_anim, self.current_frame, self.anim_time,
+         self.locked, self.flip_x) = state
+        self.image = self.animations[self.current_anim].surfaces[self.current_frame]
+        self.save_previous_state()
+
+    def interpolated_position(self, alpha=1.0):
+        """
+        Devuelve (x, y, z) interpolados entre el paso anterior y el actual.
+        alpha=1.0 equivale a la posición actual.
+        """
+        x, y = self.rect.center
+        z = self.z
+        if alpha >= 1.0:
+            return x, y, z
+        return (self.prev_x + (x - self.prev_x) * alpha,
+                self.prev_y + (y - self.prev_y) * alpha,
+                self.prev_z + (z - self.prev_z) * alpha)
+
     def play(self, anim_name, reset=False, lock=False):
         if anim_name in self.animations:
             # si está bloqueado no se puede interrumpir
@@ -40,8 +109,8 @@ class GameObject(pygame.sprite.Sprite):
             if reset or anim_name != self.current_anim:
                 self.current_anim = anim_name
                 self.current_frame = 0
-                self.anim_timer = 0
-                self.image, self.frame_duration = self.animations[self.current_anim][self.current_frame]
+                self.anim_time = 0.0
+                self.image = self.animations[self.current_anim].surfaces[0]
 
                 if lock:
                     self.locked = True  # 🔒 bloquear hasta terminar
@@ -51,20 +120,17 @@ class GameObject(pygame.sprite.Sprite):
         dt en segundos (float). 
         Maneja animación y movimiento.
         """
-        # Actualizar animación
-        frames = self.animations[self.current_anim]
-        self.anim_timer += dt * 1000  # dt a ms
-        if self.anim_timer >= self.frame_duration:
-            self.anim_timer -= self.frame_duration
-            self.current_frame += 1
-
-            # Si se pasó del último frame
-            if self.current_frame >= len(frames):
-                self.current_frame = 0
-                # 🔓 desbloquear al terminar animación
-                self.locked = False  
-
-            self.image, self.frame_duration = frames[self.current_frame]
+        # Actualizar animación: el frame sale del tiempo transcurrido
+        clip = self.animations[self.current_anim]
+        t = self.anim_time + dt * 1000  # dt a ms
+        if t >= clip.total:
+            # Terminó al menos una vuelta: se sigue en la vuelta que toca
+            t %= clip.total
+            # 🔓 desbloquear al terminar animación
+            self.locked = False
+        self.anim_time = t
+        self.current_frame = clip.index_at(t)
+        self.image = clip.surfaces[self.current_frame]
 
         # Detectar dirección horizontal para flip
         if self.vx < 0:
@@ -72,28 +138,48 @@ class GameObject(pygame.sprite.Sprite):
         elif self.vx > 0:
             self.flip_x = False
 
-        # Actualizar posición
-        self.rect.x += int(self.vx * dt)
-        self.rect.y += int(self.vy * dt)
+        # Actualizar posición: se mueve la parte entera y se guarda el resto
+        fx = self.frac_x + self.vx * dt
+        fy = self.frac_y + self.vy * dt
+        dx = int(fx)
+        dy = int(fy)
+        self.frac_x = fx - dx
+        self.frac_y = fy - dy
+        self.rect.x += dx
+        self.rect.y += dy
 
 
-    def draw(self, surface):
-        # 1. Aplicamos el espejado (tu lógica original)
-        img = pygame.transform.flip(self.image, self.flip_x, False) if self.flip_x else self.image
-        
-        # 2. Aplicamos la perspectiva (solo si el objeto tiene scale_factor y es distinto de 1)
-        # hasattr evita errores si otros objetos no usan escala
-        if hasattr(self, 'scale_factor') and self.scale_factor != 1.0:
-            original_size = img.get_size()
-            new_size = (int(original_size[0] * self.scale_factor), 
-                        int(original_size[1] * self.scale_factor))
-            img = pygame.transform.scale(img, new_size)
+    def draw(self, surface, alpha=1.0):
+        # 1 y 2. Espejado y perspectiva (scale_factor 1.0 = sin escalar)
+        # El resultado sale de un cache LRU compartido: no se crean Surfaces por frame
+        img = self.surface_cache.get(self.image, self.flip_x, self.scale_factor)
 
         # 3. Calculamos el nuevo rect para que la imagen se dibuje centrada 
         # La 'z' eleva la imagen visualmente, pero el rect.center sigue en el suelo
-        altura = getattr(self, 'z', 0)
-        pos_visual = (self.rect.centerx, self.rect.centery - altura)
+        # alpha < 1 interpola entre el paso fijo anterior y el actual
+        x, y, altura = self.interpolated_position(alpha)
+        pos_visual = (round(x), round(y - altura))
         
-        new_rect = img.get_rect(center=pos_visual)
+        offset = self.animations[self.current_anim].offsets[self.current_frame]
+        if offset is None:
+            new_rect = img.get_rect(center=pos_visual)
+        else:
+            # Frame recortado de un atlas: se centra el lienzo original (con
+            # la misma escala cuantizada del cache) y el recorte va en su lugar
+            ox, oy, sw, sh = offset
+            if self.flip_x:
+                ox = sw - ox - self.image.get_width()
+            step = self.surface_cache.scale_step
+            escala = round(self.scale_factor / step) * step
+            lienzo_w, lienzo_h = int(sw * escala), int(sh * escala)
+            new_rect = img.get_rect(topleft=(pos_visual[0] - lienzo_w // 2 + round(ox * escala),
+                                             pos_visual[1] - lienzo_h // 2 + round(oy * escala)))
         
-        surface.blit(img, new_rect)
+        # Devuelve el rect ocupado (para el dibujado por rects sucios)
+        return surface.blit(img, new_rect)
+
+
+def update_all(objects, dt):
+    """Pasada plana de update sobre una lista de objetos (sin Group de pygame)."""
+    for obj in objects:
+        obj.update(dt)
@@ -0,0 +1,117 @@
+# engine/headless.py
+"""
+Simulación de partidos sin ventana (IA vs IA).
+
+Uso desde la línea de comandos:
+    python -m engine.headless --partidos 200 --procesos 4
+
+Cada partido corre en una instancia de Game(headless=True) avanzada con
+step() tan rápido como permita la CPU. simular_lote() reparte los partidos
+en un pool de procesos para balanceo y pruebas de regresión en CI.
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine.game import Game
+from engine.input_source import ScriptedInput
+
+
+def simular_partido(sets_para_ganar=1, option_speed=1, max_ticks=200_000, dt=None,
+                    seed=0, ai_error=30):
+    """
+    Juega un partido IA vs IA hasta que alguien gana sets_para_ganar sets
+    o se agotan max_ticks pasos. Devuelve un dict con el resultado.
+
+    ai_error: desvío de puntería de ambas IA en píxeles (con 0 los
+    peloteos entre dos IA perfectas no terminan nunca).
+    """
+    game = Game(headless=True, input_source=ScriptedInput())
+    game.SETS_PARA_GANAR = sets_para_ganar
+    game.rng.seed(seed)
+    game.ai_error = ai_error
+    game.start_match(num_players=1, option_speed=option_speed, ai_p1=True)
+
+    inicio = time.perf_counter()
+    ticks = 0
+    while ticks < max_ticks and game.ganador is None:
+        game.step(dt)
+        ticks += 1
+    duracion = time.perf_counter() - inicio
+    # Puntos jugados: los que se sacaron con cada saque
+    puntos = game.stats_saque[0][1] + game.stats_saque[1][1]
+
+    # None: partido sin terminar (max_ticks)
+    ganador = None if game.ganador is None else game.ganador + 1
+
+    return {
+        "seed": seed,
+        "ganador": ganador,
+        "sets": [list(s) for s in game.sets_jugados],
+        "games": list(game.games_ganados),
+        "puntos": puntos,
+        "ticks": ticks,
+        "segundos_simulados": ticks * (dt or game.fixed_dt),
+        "segundos_reales": duracion,
+    }
+
+
+def _simular_partido_kwargs(kwargs):
+    # Función de módulo (picklable) para el pool de procesos
+    return simular_partido(**kwargs)
+
+
+def simular_lote(partidos, procesos=None, seed=0, **kwargs):
+    """
+    Simula varios partidos en paralelo con un ProcessPoolExecutor.
+    Cada partido usa la semilla seed + i, así el lote es reproducible.
+    procesos=None usa tantos procesos como CPUs; procesos=1 corre en serie.
+    """
+    trabajos = [dict(kwargs, seed=seed + i) for i in range(partidos)]
+    if procesos == 1:
+        return [simular_partido(**kw) for kw in trabajos]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(_simular_partido_kwargs, trabajos))
+
+
+def resumir(resultados):
+    """Agrega los resultados de un lote (victorias, ticks por segundo, etc.)."""
+    ticks = sum(r["ticks"] for r in resultados)
+    segundos = sum(r["segundos_reales"] for r in resultados)
+    return {
+        "partidos": len(resultados),
+        "victorias_p1": sum(1 for r in resultados if r["ganador"] == 1),
+        "victorias_p2": sum(1 for r in resultados if r["ganador"] == 2),
+        "sin_terminar": sum(1 for r in resultados if r["ganador"] is None),
+        "puntos": sum(r["puntos"] for r in resultados),
+        "ticks": ticks,
+        "ticks_por_segundo": ticks / segundos if segundos else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulación headless de partidos IA vs IA")
+    parser.add_argument("--partidos", type=int, default=10)
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--sets", type=int, default=1, help="sets para ganar el partido")
+    parser.add_argument("--velocidad", type=int, default=1, choices=[0, 1, 2],
+                        help="0: SLOW, 1: NORMAL, 2: FAST")
+    parser.add_argument("--max-ticks", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--error-ia", type=float, default=30,
+                        help="desvío de puntería de la IA en píxeles")
+    args = parser.parse_args(argv)
+
+    resultados = simular_lote(args.partidos, procesos=args.procesos,
+                              seed=args.seed,
+                              ai_error=args.error_ia,
+                              sets_para_ganar=args.sets,
+                              option_speed=args.velocidad,
+                              max_ticks=args.max_ticks)
+    print(json.dumps(resumir(resultados), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# engine/hud.py
+from collections import OrderedDict
+
+import pygame
+
+from engine import startup
+
+
+class TextCache:
+    """
+    Fuentes creadas una sola vez y textos renderizados memorizados.
+    Clave de texto: (string, fuente, color).
+
+    pygame.font.SysFont recorre la lista de fuentes del sistema, así que
+    cada fuente se pide una vez y se reutiliza. Al superar max_entries se
+    descarta el texto usado hace más tiempo (LRU, como SurfaceCache).
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._fonts = {}
+        self._entries = OrderedDict()
+
+    def font(self, name, size, bold=False):
+        """Devuelve la fuente (name, size, bold), creándola la primera vez."""
+        key = (name, size, bold)
+        font = self._fonts.get(key)
+        if font is None:
+            startup.ensure("font")
+            font = pygame.font.SysFont(name, size, bold=bold)
+            self._fonts[key] = font
+        return font
+
+    def render(self, text, font_key, color):
+        """
+        Devuelve la Surface de text con la fuente font_key=(name, size, bold).
+        Solo se rasteriza la primera vez que se pide la combinación.
+        """
+        key = (text, font_key, color)
+        surf = self._entries.get(key)
+        if surf is not None:
+            self._entries.move_to_end(key)
+            return surf
+
+        surf = self.font(*font_key).render(text, True, color)
+        self._entries[key] = surf
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class HUD:
+    """
+    Capa de interfaz: menú, marcador y contador de FPS.
+
+    El marcador se compone en una Surface propia que solo se vuelve a
+    dibujar cuando cambian los puntos o los games. El FPS se actualiza
+    cada fps_interval_ms en vez de en cada frame.
+    """
+
+    MENU_FONT = ("monospace", 30, False)
+    SCORE_FONT = ("Arial", 20, True)
+    FPS_FONT = (None, 20, False)
+    PROFILER_FONT = ("monospace", 14, False)
+
+    WHITE = (255, 255, 255)
+    YELLOW = (255, 255, 0)
+
+    SPEEDS_TXT = ["SLOW", "NORMAL", "FAST"]
+
+    def __init__(self, fps_interval_ms=250):
+        self.text = TextCache()
+        self.fps_interval_ms = fps_interval_ms
+
+        self._score_key = None
+        self._score_surf = None
+
+        self._fps_surf = None
+        self._fps_last_ms = None
+
+        self._prof_surf = None
+        self._prof_last_ms = None
+
+    def draw_menu(self, surface, option_players, option_speed, menu_row, menu_option):
+        # Fila 1: Jugadores
+        color_p = self.YELLOW if menu_row == 0 else self.WHITE
+        surface.blit(self.text.render(f"PLAYERS: < {option_players} >", self.MENU_FONT, color_p), (150, 200))
+
+        # Fila 2: Velocidad
+        color_s = self.YELLOW if menu_row == 1 else self.WHITE
+        surface.blit(self.text.render(f"SPEED: < {self.SPEEDS_TXT[option_speed]} >", self.MENU_FONT, color_s), (150, 260))
+
+        # Cursor NES (Triángulo a la izquierda de la fila activa)
+        cx = surface.get_width() // 2
+        cursor_y = 255 if menu_option == 1 else 305
+        pygame.draw.polygon(surface, self.WHITE,
+                            [(cx - 110, cursor_y),
+                             (cx - 110, cursor_y + 20),
+                             (cx - 90, cursor_y + 10)])
+
+    def draw_paused(self, surface):
+        """Cartel de pausa sobre la escena congelada."""
+        w, h = surface.get_size()
+        txt = self.text.render("PAUSED", self.MENU_FONT, self.YELLOW)
+        surface.blit(txt, txt.get_rect(center=(w // 2, h // 2)))
+
+    def draw_practice(self, surface, devueltas, pos=(20, 20)):
+        """Contador del modo práctica: pelotas devueltas a la máquina."""
+        return surface.blit(self.text.render(f"DEVUELTAS: {devueltas}", self.SCORE_FONT, self.YELLOW), pos)
+
+    def draw_loading(self, surface, progress):
+        """Pantalla de carga: texto y barra de progreso (progress de 0 a 1)."""
+        w, h = surface.get_size()
+        txt = self.text.render("LOADING...", self.MENU_FONT, self.WHITE)
+        surface.blit(txt, txt.get_rect(center=(w // 2, h // 2 - 30)))
+
+        barra = pygame.Rect(0, 0, w // 2, 16)
+        barra.center = (w // 2, h // 2 + 10)
+        pygame.draw.rect(surface, self.WHITE, barra, 2)
+        lleno = barra.inflate(-6, -6)
+        lleno.w = int(lleno.w * max(0.0, min(1.0, progress)))
+        if lleno.w:
+            pygame.draw.rect(surface, self.YELLOW, lleno)
+
+    def draw_scoreboard(self, surface, puntos, games, sets=None, prob_p1=None, pos=(20, 20)):
+        """
+        puntos: textos de tenis de cada jugador, p. ej. ("15", "40").
+        games: games ganados de cada jugador en el set.
+        sets: sets ganados de cada jugador (opcional).
+        prob_p1: probabilidad de que gane el Jugador 1 (opcional, se muestra en %).
+        """
+        pct = None if prob_p1 is None else round(prob_p1 * 100)
+        key = (tuple(puntos), tuple(games), tuple(sets) if sets else None, pct)
+        if key != self._score_key:
+            self._score_key = key
+            self._score_surf = self._build_scoreboard(puntos, games, sets, pct)
+        return surface.blit(self._score_surf, pos)
+
+    def _build_scoreboard(self, puntos, games, sets=None, pct=None):
+        lineas = [self.text.render(f"GAMES - P1: {games[0]} | P2: {games[1]}", self.SCORE_FONT, self.WHITE),
+                  self.text.render(f"PUNTOS - P1: {puntos[0]} | P2: {puntos[1]}", self.SCORE_FONT, self.YELLOW)]
+        if sets is not None:
+            lineas.append(self.text.render(f"SETS - P1: {sets[0]} | P2: {sets[1]}", self.SCORE_FONT, self.WHITE))
+        if pct is not None:
+            lineas.append(self.text.render(f"GANA P1: {pct}% | P2: {100 - pct}%", self.SCORE_FONT, self.WHITE))
+
+        # Misma separación que antes: una línea cada 25 px (juegos en y=20, puntos en y=45)
+        w = max(t.get_width() for t in lineas)
+        h = 25 * (len(lineas) - 1) + lineas[-1].get_height()
+        surf = pygame.Surface((w, h), pygame.SRCALPHA)
+        for i, texto in enumerate(lineas):
+            surf.blit(texto, (0, 25 * i))
+        return surf
+
+    def draw_fps(self, surface, clock, pos=(5, 5)):
+        now = pygame.time.get_ticks()
+        if self._fps_surf is None or now - self._fps_last_ms >= self.fps_interval_ms:
+            self._fps_last_ms = now
+            self._fps_surf = self.text.render(f"FPS: {int(clock.get_fps())}", self.FPS_FONT, self.WHITE)
+        return surface.blit(self._fps_surf, pos)
+
+    def draw_profiler(self, surface, profiler, pos=(5, 70)):
+        """Overlay con p50/p95/p99 por fase; se recompone cada fps_interval_ms."""
+        now = pygame.time.get_ticks()
+        if self._prof_surf is None or now - self._prof_last_ms >= self.fps_interval_ms:
+            self._prof_last_ms = now
+            self._prof_surf = self._build_profiler(profiler.lines())
+        return surface.blit(self._prof_surf, pos)
+
+    def _build_profiler(self, lines):
+        # Los números cambian en cada recomposición: se renderizan sin cache
+        font = self.text.font(*self.PROFILER_FONT)
+        textos = [font.render("fase       p50    p95    p99 ms", True, self.YELLOW)]
+        textos += [font.render(line, True, self.WHITE) for line in lines]
+
+        alto_linea = font.get_linesize()
+        w = max(t.get_width() for t in textos) + 8
+        h = alto_linea * len(textos) + 8
+        surf = pygame.Surface((w, h), pygame.SRCALPHA)
+        surf.fill((0, 0, 0, 160))
+        for i, t in enumerate(textos):
+            surf.blit(t, (4, 4 + i * alto_linea))
+        return surf
+
+    def invalidate(self):
+        """Fuerza a recomponer el marcador, el FPS y el overlay en el próximo dibujado."""
+        self._score_key = None
+        self._fps_surf = None
+        self._prof_surf = None
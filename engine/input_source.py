@@ -0,0 +1,34 @@
+# engine/input_source.py
+import pygame
+
+
+class KeyboardInput:
+    """
+    Fuente de entrada por defecto: lee el teclado real con pygame.
+    read() devuelve una secuencia indexable por constantes pygame.K_*.
+    """
+
+    def read(self):
+        return pygame.key.get_pressed()
+
+
+class ScriptedInput:
+    """
+    Fuente de entrada inyectada (modo headless, IA vs IA, pruebas).
+    Se indexa igual que pygame.key.get_pressed(): keys[pygame.K_LEFT] -> bool.
+    """
+
+    def __init__(self, pressed=()):
+        self.pressed = set(pressed)
+
+    def press(self, key):
+        self.pressed.add(key)
+
+    def release(self, key):
+        self.pressed.discard(key)
+
+    def read(self):
+        return self
+
+    def __getitem__(self, key):
+        return key in self.pressed
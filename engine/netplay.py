@@ -0,0 +1,355 @@
+# engine/netplay.py
+"""
+Modo versus en red con rollback sobre UDP.
+
+Cada máquina simula el partido completo con pasos fijos deterministas.
+La entrada local se aplica con unos frames de retardo (input delay) y se
+envía al rival; mientras no llega la entrada remota se predice repitiendo
+la última confirmada. Si al llegar no coincide con lo predicho, se
+restaura el snapshot de ese frame (Game.snapshot/restore) y se vuelven a
+simular los frames siguientes (rollback).
+
+Prueba con dos procesos locales por loopback, latencia y pérdida simuladas:
+    python -m engine.netplay --jugador 1 --puerto 5001 --remoto 127.0.0.1:5002 --headless --ticks 3000 --latencia 60 --perdida 0.1
+    python -m engine.netplay --jugador 2 --puerto 5002 --remoto 127.0.0.1:5001 --headless --ticks 3000 --latencia 60 --perdida 0.1
+Ambos deben imprimir el mismo checksum. Sin --headless se juega con ventana
+(cada jugador usa flechas + O/P en su teclado).
+"""
+
+import argparse
+import heapq
+import json
+import random
+import socket
+import struct
+import time
+import zlib
+
+import pygame
+
+# Controles de un jugador, en orden de bit
+P1_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_o, pygame.K_p)
+P2_KEYS = (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s, pygame.K_y, pygame.K_u)
+
+# ack (último frame del rival recibido en orden), primer frame, cantidad + máscaras
+_PACKET = struct.Struct("<iiB")
+MAX_INPUTS_PER_PACKET = 64
+
+
+def local_mask(keys):
+    """Máscara de los controles locales (siempre flechas + O/P)."""
+    mask = 0
+    for bit, key in enumerate(P1_KEYS):
+        if keys[key]:
+            mask |= 1 << bit
+    return mask
+
+
+class NetInput:
+    """
+    Fuente de entrada para Game: las máscaras de ambos jugadores del frame
+    que se está simulando, mapeadas a las teclas de J1 y J2.
+    """
+
+    def __init__(self):
+        self.masks = {1: 0, 2: 0}
+        self._bits = {}
+        for jugador, keys in ((1, P1_KEYS), (2, P2_KEYS)):
+            for bit, key in enumerate(keys):
+                self._bits[key] = (jugador, 1 << bit)
+
+    def read(self):
+        return self
+
+    def __getitem__(self, key):
+        entrada = self._bits.get(key)
+        if entrada is None:
+            return False
+        jugador, bit = entrada
+        return bool(self.masks[jugador] & bit)
+
+
+class UdpTransport:
+    """
+    Socket UDP no bloqueante. latency_ms y loss simulan una red mala en
+    el envío (con ambos extremos simulando, el RTT es 2 * latency_ms).
+    """
+
+    def __init__(self, local_port, remote_addr, latency_ms=0, loss=0.0, seed=None, host="127.0.0.1"):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, local_port))
+        self.sock.setblocking(False)
+        self.remote_addr = remote_addr
+        self.latency = latency_ms / 1000.0
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self._cola = []   # (hora de envío, n, payload)
+        self._n = 0
+
+    def send(self, payload):
+        if self.loss and self.rng.random() < self.loss:
+            return
+        if self.latency:
+            self._n += 1
+            heapq.heappush(self._cola, (time.perf_counter() + self.latency, self._n, payload))
+        else:
+            self._sendto(payload)
+
+    def flush(self):
+        """Envía los paquetes retenidos cuya latencia ya se cumplió."""
+        ahora = time.perf_counter()
+        while self._cola and self._cola[0][0] <= ahora:
+            self._sendto(heapq.heappop(self._cola)[2])
+
+    def _sendto(self, payload):
+        try:
+            self.sock.sendto(payload, self.remote_addr)
+        except OSError:
+            pass  # El rival todavía no abrió su puerto: se reenvía en el próximo paquete
+
+    def receive(self):
+        paquetes = []
+        while True:
+            try:
+                data, _ = self.sock.recvfrom(2048)
+            except (BlockingIOError, ConnectionResetError):
+                return paquetes
+            paquetes.append(data)
+
+    def close(self):
+        self.sock.close()
+
+
+class RollbackSession:
+    """
+    Sincroniza dos Game por entrada con retardo + rollback.
+
+    frame: próximo frame a simular. Para cada frame se guarda el snapshot
+    previo a simularlo, así un rollback al frame f restaura snapshots[f] y
+    re-simula f .. frame-1 con las entradas corregidas.
+    """
+
+    def __init__(self, game, transport, local_player, input_delay=2, max_rollback=8):
+        self.game = game
+        self.transport = transport
+        self.local = local_player
+        self.remote = 2 if local_player == 1 else 1
+        self.input_delay = input_delay
+        self.max_rollback = max_rollback
+
+        self.net_input = NetInput()
+        game.input_source = self.net_input
+
+        self.frame = 0
+        # Los primeros input_delay frames no tienen entrada: ambos lados saben que es 0
+        self.inputs = {p: {f: 0 for f in range(input_delay)} for p in (1, 2)}
+        self.predicted = {}      # frame -> máscara remota usada sin confirmar
+        self.snapshots = {}      # frame -> Game.snapshot() antes de simularlo
+        self.remote_confirmed = input_delay - 1  # último frame remoto contiguo conocido
+        self.remote_ack = input_delay - 1        # último frame local que el rival confirmó
+
+        # Estadísticas
+        self.rollbacks = 0
+        self.resim_frames = 0
+        self.max_rollback_ms = 0.0
+        self.stalls = 0
+
+    # --- Simulación ---
+    def _remote_input(self, f):
+        mask = self.inputs[self.remote].get(f)
+        if mask is not None:
+            self.predicted.pop(f, None)
+            return mask
+        # Predicción: se repite la última entrada confirmada
+        mask = self.inputs[self.remote][self.remote_confirmed]
+        self.predicted[f] = mask
+        return mask
+
+    def _simulate(self, f):
+        self.snapshots[f] = self.game.snapshot()
+        self.net_input.masks[self.local] = self.inputs[self.local][f]
+        self.net_input.masks[self.remote] = self._remote_input(f)
+        self.game.step()
+
+    def _rollback(self, f):
+        inicio = time.perf_counter()
+        self.game.restore(self.snapshots[f])
+        # Esos frames ya sonaron: re-simularlos no debe repetir los efectos
+        self.game.sfx_muted = True
+        try:
+            for g in range(f, self.frame):
+                self._simulate(g)
+        finally:
+            self.game.sfx_muted = False
+        self.rollbacks += 1
+        self.resim_frames += self.frame - f
+        self.max_rollback_ms = max(self.max_rollback_ms, (time.perf_counter() - inicio) * 1000.0)
+
+    # --- Red ---
+    def _send(self):
+        inicio = self.remote_ack + 1
+        ultimo = max(self.inputs[self.local])
+        fin = min(ultimo, inicio + MAX_INPUTS_PER_PACKET - 1)
+        masks = bytes(self.inputs[self.local][f] for f in range(inicio, fin + 1))
+        self.transport.send(_PACKET.pack(self.remote_confirmed, inicio, len(masks)) + masks)
+
+    def _receive(self):
+        """Procesa los paquetes del rival. Devuelve el primer frame mal predicho (o None)."""
+        rollback = None
+        remotos = self.inputs[self.remote]
+        for data in self.transport.receive():
+            if len(data) < _PACKET.size:
+                continue
+            ack, inicio, n = _PACKET.unpack_from(data)
+            self.remote_ack = max(self.remote_ack, ack)
+            for i, mask in enumerate(data[_PACKET.size:_PACKET.size + n]):
+                f = inicio + i
+                if f in remotos:
+                    continue
+                remotos[f] = mask
+                previsto = self.predicted.pop(f, None)
+                if previsto is not None and previsto != mask and (rollback is None or f < rollback):
+                    rollback = f
+            while self.remote_confirmed + 1 in remotos:
+                self.remote_confirmed += 1
+        return rollback
+
+    def _prune(self):
+        # Los frames confirmados y ya simulados no pueden volver a simularse
+        for f in [f for f in self.snapshots if f <= self.remote_confirmed]:
+            del self.snapshots[f]
+        hasta = min(self.remote_confirmed, self.frame)
+        for f in [f for f in self.inputs[self.remote] if f < hasta]:
+            del self.inputs[self.remote][f]
+        # Las locales hacen falta hasta que el rival las tenga y no se puedan re-simular
+        hasta = min(self.remote_ack, self.remote_confirmed, self.frame - 1)
+        for f in [f for f in self.inputs[self.local] if f <= hasta]:
+            del self.inputs[self.local][f]
+
+    def poll(self):
+        """Recibe, corrige con rollback si hizo falta y reenvía lo no confirmado."""
+        self.transport.flush()
+        rollback = self._receive()
+        if rollback is not None and rollback < self.frame:
+            self._rollback(rollback)
+        self._prune()
+
+    def advance(self, mask):
+        """
+        Avanza un frame con la entrada local `mask`. Devuelve False si hubo
+        que esperar al rival (demasiados frames sin confirmar).
+        """
+        self.poll()
+        if self.frame - self.remote_confirmed > self.max_rollback:
+            self.stalls += 1
+            self._send()
+            return False
+
+        self.inputs[self.local][self.frame + self.input_delay] = mask
+        self._simulate(self.frame)
+        self.frame += 1
+        self._send()
+        return True
+
+    def synced(self):
+        """True si todos los frames simulados usaron entradas confirmadas."""
+        return self.remote_confirmed >= self.frame - 1 and not self.predicted
+
+    def checksum(self):
+        """CRC del estado de juego (jugadores, pelota, marcador) para comparar entre máquinas."""
+        g = self.game
+        estado = (g.player1.snapshot(), g.player2.snapshot(), g.ball.snapshot(),
+                  g.indices_puntos, g.games_ganados, g.sets_ganados, g.server)
+        return zlib.crc32(repr(estado).encode("utf-8"))
+
+
+def _crear_partida(headless, option_speed):
+    from engine.game import Game
+    game = Game(headless=headless, async_load=False)
+    game.start_match(num_players=2, option_speed=option_speed)
+    return game
+
+
+def prueba_headless(session, ticks, seed, linger=1.0):
+    """
+    Juega `ticks` frames con entradas aleatorias (bot), espera a que todo
+    quede confirmado y devuelve el resumen con el checksum final.
+    """
+    rng = random.Random(seed)
+    mask = 0
+    inicio = time.perf_counter()
+    while session.frame < ticks:
+        if session.frame % 10 == 0:
+            mask = rng.randrange(64)
+        if not session.advance(mask):
+            time.sleep(0.001)
+
+    # Esperar las últimas entradas del rival y seguir reenviando las nuestras un rato
+    fin_espera = None
+    while True:
+        session.poll()
+        session._send()
+        if session.synced():
+            if fin_espera is None:
+                fin_espera = time.perf_counter() + linger
+            elif time.perf_counter() >= fin_espera:
+                break
+        time.sleep(0.002)
+
+    return {
+        "frame": session.frame,
+        "checksum": session.checksum(),
+        "rollbacks": session.rollbacks,
+        "frames_resimulados": session.resim_frames,
+        "max_rollback_ms": round(session.max_rollback_ms, 3),
+        "esperas": session.stalls,
+        "segundos": round(time.perf_counter() - inicio, 2),
+    }
+
+
+def jugar(session):
+    """Partido con ventana a la velocidad del juego."""
+    game = session.game
+    game.running = True
+    while game.running:
+        game.clock.tick(game.fps)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                game.running = False
+        session.advance(local_mask(pygame.key.get_pressed()))
+        game.alpha = 1.0
+        game._draw()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Versus en red con rollback (UDP)")
+    parser.add_argument("--jugador", type=int, choices=[1, 2], required=True)
+    parser.add_argument("--puerto", type=int, required=True, help="puerto UDP local")
+    parser.add_argument("--remoto", required=True, help="host:puerto del rival")
+    parser.add_argument("--retardo", type=int, default=2, help="input delay en frames")
+    parser.add_argument("--max-rollback", type=int, default=8)
+    parser.add_argument("--latencia", type=float, default=0, help="latencia simulada en ms")
+    parser.add_argument("--perdida", type=float, default=0.0, help="fracción de paquetes perdidos")
+    parser.add_argument("--velocidad", type=int, default=1, choices=[0, 1, 2])
+    parser.add_argument("--headless", action="store_true", help="prueba sin ventana con un bot")
+    parser.add_argument("--ticks", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    host, puerto = args.remoto.rsplit(":", 1)
+    transport = UdpTransport(args.puerto, (host, int(puerto)), latency_ms=args.latencia,
+                             loss=args.perdida, seed=args.seed + args.jugador)
+    game = _crear_partida(args.headless, args.velocidad)
+    session = RollbackSession(game, transport, args.jugador,
+                              input_delay=args.retardo, max_rollback=args.max_rollback)
+    try:
+        if args.headless:
+            print(json.dumps(prueba_headless(session, args.ticks, args.seed * 100 + args.jugador), indent=2))
+        else:
+            jugar(session)
+    finally:
+        transport.close()
+
+
+if __name__ == "__main__":
+    main()
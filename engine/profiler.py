@@ -0,0 +1,151 @@
+# engine/profiler.py
+import csv
+import json
+import time
+from collections import deque
+
+
+class _Span:
+    """Context manager que mide un tramo y lo suma al frame actual."""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    """Span vacío para cuando el profiler está desactivado."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class FrameProfiler:
+    """
+    Tiempos por fase de cada frame (eventos, update, draw, flip...) y
+    sub-tramos con nombre dentro de la lógica (ai, physics, net, scoring).
+
+    Los tramos que se repiten en un mismo frame (varios pasos fijos) se
+    suman. end_frame() cierra el frame y guarda cada fase en una ventana
+    móvil de los últimos `window` frames, de donde salen los percentiles.
+    """
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window=300, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self._samples = {}   # fase -> deque de ms
+        self._current = {}   # fase -> segundos acumulados en este frame
+        self._frame_start = None
+
+    def span(self, name):
+        """with profiler.span("physics"): ... mide el bloque (no hace nada si está desactivado)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def add(self, name, seconds):
+        self._current[name] = self._current.get(name, 0.0) + seconds
+
+    def end_frame(self):
+        """Cierra el frame: guarda cada fase y el tiempo total entre frames."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self._current["frame"] = now - self._frame_start
+        self._frame_start = now
+
+        for name, seconds in self._current.items():
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(seconds * 1000.0)
+        self._current = {}
+
+    def last(self, name):
+        """ms de `name` en el último frame cerrado (0 si no hay muestras)."""
+        samples = self._samples.get(name)
+        return samples[-1] if samples else 0.0
+
+    def discard_frame(self):
+        """
+        Descarta el frame en curso (tramos medidos y reloj): lo que pase
+        hasta el próximo end_frame() no incluye este tiempo, p. ej. una
+        espera en reposo.
+        """
+        self._current = {}
+        if self.enabled:
+            self._frame_start = time.perf_counter()
+
+    def reset(self):
+        self._samples.clear()
+        self._current = {}
+        self._frame_start = None
+
+    # --- Estadísticas ---
+    @staticmethod
+    def _percentile(ordenados, p):
+        # Interpolación lineal entre los dos vecinos más cercanos
+        if not ordenados:
+            return 0.0
+        k = (len(ordenados) - 1) * p / 100.0
+        i = int(k)
+        j = min(i + 1, len(ordenados) - 1)
+        return ordenados[i] + (ordenados[j] - ordenados[i]) * (k - i)
+
+    def summary(self):
+        """{fase: {"p50", "p95", "p99", "max", "mean", "count"}} en milisegundos."""
+        resumen = {}
+        for name, samples in self._samples.items():
+            ordenados = sorted(samples)
+            datos = {f"p{p}": self._percentile(ordenados, p) for p in self.PERCENTILES}
+            datos["max"] = ordenados[-1] if ordenados else 0.0
+            datos["mean"] = sum(ordenados) / len(ordenados) if ordenados else 0.0
+            datos["count"] = len(ordenados)
+            resumen[name] = datos
+        return resumen
+
+    def lines(self):
+        """Texto del overlay: una línea por fase, con p50/p95/p99 en ms."""
+        resumen = self.summary()
+        return [f"{name:<8} {d['p50']:6.2f} {d['p95']:6.2f} {d['p99']:6.2f}"
+                for name, d in sorted(resumen.items())]
+
+    # --- Exportación ---
+    def export_json(self, path):
+        """Guarda el resumen y las muestras de la ventana actual."""
+        with open(path, "w") as f:
+            json.dump({
+                "window": self.window,
+                "summary": self.summary(),
+                "samples": {name: list(s) for name, s in self._samples.items()},
+            }, f, indent=2)
+
+    def export_csv(self, path):
+        """Una fila por fase con sus percentiles (ms)."""
+        columnas = [f"p{p}" for p in self.PERCENTILES] + ["max", "mean", "count"]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["phase"] + columnas)
+            for name, d in sorted(self.summary().items()):
+                writer.writerow([name] + [d[c] for c in columnas])
@@ -0,0 +1,132 @@
+# engine/projection.py
+"""
+Proyección de la cancha a la pantalla, calculada una sola vez por juego de assets.
+
+Coordenadas lógicas: x (ancho), y (profundidad, la fila del suelo en
+pantalla) y z (altura sobre el suelo). En pantalla un punto se dibuja en
+(x, y - z) y su tamaño depende solo de la fila y.
+
+CourtProjection reúne lo que antes se recalculaba en cada paso con
+get_rect(center=...) y constantes repetidas: rects de estadio, cancha y
+red, la línea y altura de la red, la zona de juego para los piques, los
+límites de las paredes y de los jugadores, y dos tablas por fila (escala de
+la pelota y límites laterales del jugador 2 por la perspectiva). Gameplay,
+dibujado e IA las consultan en O(1).
+"""
+
+import pygame
+
+
+class CourtProjection:
+    """
+    screen_size: tamaño lógico de la pantalla.
+    estadio_size / cancha_size / red_size: tamaños de los sprites de fondo
+    (None si faltan); todos se centran en la pantalla.
+    """
+
+    # Escala de la pelota: ESCALA[0] en la fila FILAS_ESCALA[0] (fondo) hasta
+    # ESCALA[1] en FILAS_ESCALA[1] (frente), constante fuera de ese rango
+    FILAS_ESCALA = (20, 460)
+    ESCALA = (0.2, 0.4)
+
+    NET_HEIGHT = 55             # Altura en píxeles del sprite de la red
+    NET_X = (100, 540)          # Tramo horizontal donde la red detiene la pelota
+    CANCHA_JUEGO = (120, 100, 400, 280)  # Zona válida para los piques (OUT fuera de ella)
+    MARGEN_PAREDES = (60, 30)   # La pelota rebota a esta distancia de los bordes
+
+    # Jugador 2: medio ancho permitido entre el fondo y la red (fracción del ancho)
+    ANCHO_P2 = (0.2, 0.4)
+
+    def __init__(self, screen_size, estadio_size=None, cancha_size=None, red_size=None):
+        self.size = w, h = screen_size
+        screen_rect = pygame.Rect((0, 0), screen_size)
+        self.center_x = w // 2
+
+        self.estadio_rect = pygame.Rect((0, 0), estadio_size) if estadio_size else screen_rect.copy()
+        self.estadio_rect.center = screen_rect.center
+        self.cancha_rect = pygame.Rect((0, 0), cancha_size) if cancha_size else screen_rect.copy()
+        self.cancha_rect.center = screen_rect.center
+        self.tiene_cancha = cancha_size is not None
+
+        # La red se dibuja colgando del centro de la cancha
+        self.red_rect = None
+        if red_size and cancha_size:
+            self.red_rect = pygame.Rect((0, 0), red_size)
+            self.red_rect.midtop = (self.cancha_rect.centerx, self.cancha_rect.centery - 55)
+
+        # Línea del suelo de la red (choque de la pelota)
+        self.net_y = self.cancha_rect.centery - 10
+
+        self.court_rect = pygame.Rect(self.CANCHA_JUEGO)
+        self.mitad_y = self.court_rect.centery
+
+        mx, my = self.MARGEN_PAREDES
+        self.paredes = (mx, my, w - mx, h - my)   # left, top, right, bottom
+
+        # --- Límites de los jugadores ---
+        self.player_bounds = (0, -15, w, h - 20)  # left, top, right, bottom
+        # Para los límites de campo la red se toma centrada en la pantalla
+        red_limite = pygame.Rect((0, 0), red_size) if red_size else screen_rect.copy()
+        red_limite.center = screen_rect.center
+        self.p1_top_min = red_limite.bottom - 130
+        self.p2_bottom_max = red_limite.top - 10
+
+        self._escala = self._tabla_escala(h)
+        self._p2_izq, self._p2_der = self._tablas_p2(w, h)
+
+    # --- Tablas por fila ---
+    def _tabla_escala(self, h):
+        min_y, max_y = self.FILAS_ESCALA
+        e0, e1 = self.ESCALA
+        rango_y = max_y - min_y
+        tabla = []
+        for y in range(h):
+            porcentaje_y = max(0, min(1, (y - min_y) / rango_y))
+            tabla.append(e0 + (porcentaje_y * (e1 - e0)))
+        return tabla
+
+    def _tablas_p2(self, w, h):
+        estadio = self.estadio_rect
+        min_w, max_w = w * self.ANCHO_P2[0], w * self.ANCHO_P2[1]
+        red_y, top_y = estadio.centery - 55, estadio.top
+        izq, der = [], []
+        for y in range(h):
+            f = max(0, min(1, (red_y - y) / (red_y - top_y)))
+            allowed_w = min_w + (max_w - min_w) * (1 - f)
+            izq.append(estadio.centerx - allowed_w)
+            der.append(estadio.centerx + allowed_w)
+        return izq, der
+
+    def _fila(self, y):
+        # Fuera de la pantalla las tablas ya son constantes: basta con recortar
+        y = int(y)
+        return 0 if y < 0 else (len(self._escala) - 1 if y >= len(self._escala) else y)
+
+    # --- Consultas ---
+    def scale_at(self, y):
+        """Escala de perspectiva de la pelota en la fila y."""
+        return self._escala[self._fila(y)]
+
+    @property
+    def scale_table(self):
+        """Escala por fila (lista de largo alto de pantalla), para consultas vectorizadas."""
+        return self._escala
+
+    def p2_x_bounds(self, y):
+        """(x mínima, x máxima) para los bordes del jugador 2 en la fila y."""
+        i = self._fila(y)
+        return self._p2_izq[i], self._p2_der[i]
+
+    def shadow_size(self, y, z):
+        """Ancho y alto de la elipse de sombra de la pelota: más chica cuanto más alta."""
+        factor = self.scale_at(y) * (1 - min(0.5, z / 500))
+        return int(20 * factor), int(10 * factor)
+
+    def to_screen(self, x, y, z=0.0):
+        """Punto lógico (x, profundidad, altura) -> posición en pantalla."""
+        return x, y - z
+
+    def ball_x_bounds(self, medio):
+        """Límites del centro de una pelota de medio ancho `medio` entre las paredes."""
+        left, _, right, _ = self.paredes
+        return left + medio, right - medio
@@ -0,0 +1,81 @@
+# engine/renderer.py
+import pygame
+
+
+class DirtyRenderer:
+    """
+    Dibujado por rectángulos sucios sobre un fondo estático precompuesto.
+
+    En cada frame solo se restaura el fondo bajo los rects que ocupaban
+    los objetos móviles en el frame anterior y se dibujan los del actual.
+    end_frame() devuelve la lista de rects para pygame.display.update(),
+    o None cuando hace falta redibujar (y presentar) la pantalla entera:
+    primer frame, cambio de fondo o después de invalidate().
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.background = None
+        self._prev_rects = []
+        self._rects = []
+        self._present = []
+        self._full = True
+        # Rects que restauró el último begin_frame() (None: pantalla entera)
+        self.restored = None
+
+    def set_background(self, background):
+        """Fija el fondo precompuesto (estadio, cancha, red...)."""
+        self.background = background
+        self.invalidate()
+
+    def invalidate(self):
+        """El próximo frame redibuja y presenta la pantalla completa."""
+        self._full = True
+
+    def begin_frame(self):
+        """Borra a los objetos del frame anterior restaurando el fondo debajo."""
+        if self._full:
+            self.screen.blit(self.background, (0, 0))
+            self.restored = None
+        else:
+            for rect in self._prev_rects:
+                self.screen.blit(self.background, rect, rect)
+            self.restored = self._prev_rects
+        self._rects = []
+        self._present = []
+
+    def mark(self, rect):
+        """Registra un rect dibujado en este frame (recortado a la pantalla)."""
+        rect = rect.clip(self.screen.get_rect())
+        if rect.w and rect.h:
+            self._rects.append(rect)
+        return rect
+
+    def present(self, rect):
+        """
+        Registra un rect solo para presentarlo en este frame: quien lo dibujó
+        se encarga de dejarlo bien en los siguientes (no se restaura).
+        """
+        self._present.append(rect)
+        return rect
+
+    def restore(self, layer, layer_pos, rects):
+        """
+        Vuelve a dibujar la parte de una capa estática (p. ej. la red) que
+        quedó tapada por objetos que están detrás de ella.
+        """
+        layer_rect = layer.get_rect(topleft=layer_pos)
+        for rect in rects:
+            clip = rect.clip(layer_rect)
+            if clip.w and clip.h:
+                self.screen.blit(layer, clip, clip.move(-layer_rect.x, -layer_rect.y))
+
+    def end_frame(self):
+        """Devuelve los rects a presentar (anteriores + actuales) o None si es completo."""
+        if self._full:
+            self._full = False
+            rects = None
+        else:
+            rects = self._prev_rects + self._rects + self._present
+        self._prev_rects = self._rects
+        return rects
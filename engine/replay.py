@@ -0,0 +1,180 @@
+# engine/replay.py
+"""
+Grabación determinista de partidos y reproducción a alta velocidad.
+
+Formato del archivo (binario, little endian):
+    b"TTRP" + versión (uint8) + largo de la cabecera (uint32) + cabecera JSON
+    y luego un registro por paso de simulación: dt (float64) + teclas (uint16)
+
+La cabecera guarda las opciones del partido y la semilla del RNG; las
+teclas van como máscara de bits sobre KEYS. Con eso el mismo camino de
+update (Game.update_game_logic) reproduce el partido paso a paso.
+
+Los eventos que cambian el estado fuera del paso (p. ej. F2, reiniciar el
+marcador) van como registros propios entre los pasos: dt 0 y la máscara
+con el bit EVENTO más el índice del evento en EVENTOS. Al reproducirlos se
+aplican con Game.aplicar_evento() en el mismo lugar de la secuencia.
+
+Uso desde la línea de comandos:
+    python -m engine.replay partida.ttr                 # sin dibujar, a máxima velocidad
+    python -m engine.replay partida.ttr --tiempo-real   # con ventana, a velocidad real
+    python -m engine.replay partida.ttr --perfil        # con cProfile
+"""
+
+import argparse
+import json
+import struct
+import time
+
+import pygame
+
+MAGIC = b"TTRP"
+VERSION = 2
+VERSIONES_LEGIBLES = (1, 2)  # la 1 es igual pero nunca tiene eventos
+_HEADER = struct.Struct("<4sBI")
+_TICK = struct.Struct("<dH")  # dt completo: con float32 la reproducción no sería exacta
+
+# Teclas que lee Game.update_game_logic, en orden de bit
+KEYS = (
+    pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_o, pygame.K_p,
+    pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s, pygame.K_y, pygame.K_u,
+)
+_BITS = {key: 1 << bit for bit, key in enumerate(KEYS)}
+
+# Eventos grabados (ver Game.aplicar_evento), por índice
+EVENTOS = ("reiniciar_marcador",)
+EVENTO = 1 << 15
+
+
+def encode_keys(keys):
+    """Máscara de bits con las teclas de KEYS pulsadas en keys."""
+    mask = 0
+    for key, bit in _BITS.items():
+        if keys[key]:
+            mask |= bit
+    return mask
+
+
+class Recorder:
+    """Acumula (dt, teclas) por paso y los eventos entre pasos, en el formato compacto."""
+
+    def __init__(self, header):
+        self.header = header
+        self._ticks = bytearray()
+        self.ticks = 0
+        self.eventos = 0
+
+    def record(self, dt, keys):
+        self._ticks += _TICK.pack(dt, encode_keys(keys))
+        self.ticks += 1
+
+    def record_event(self, nombre):
+        """Graba el evento `nombre` (uno de EVENTOS) antes del próximo paso."""
+        self._ticks += _TICK.pack(0.0, EVENTO | EVENTOS.index(nombre))
+        self.eventos += 1
+
+    def save(self, path):
+        cabecera = json.dumps(self.header).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(cabecera)))
+            f.write(cabecera)
+            f.write(self._ticks)
+
+
+def load(path):
+    """
+    Lee una grabación. Devuelve (cabecera, [(dt, máscara), ...]); los
+    registros con el bit EVENTO en la máscara son eventos, no pasos.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, largo = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version not in VERSIONES_LEGIBLES:
+        raise ValueError(f"'{path}' no es una grabación válida (versión {VERSION})")
+    inicio = _HEADER.size
+    header = json.loads(data[inicio:inicio + largo].decode("utf-8"))
+    ticks = list(_TICK.iter_unpack(data[inicio + largo:]))
+    return header, ticks
+
+
+class ReplayInput:
+    """
+    Fuente de entrada que devuelve las teclas grabadas del paso actual.
+    Se indexa igual que pygame.key.get_pressed().
+    """
+
+    def __init__(self):
+        self.mask = 0
+
+    def read(self):
+        return self
+
+    def __getitem__(self, key):
+        return bool(self.mask & _BITS.get(key, 0))
+
+
+def replay(path, tiempo_real=False):
+    """
+    Reproduce una grabación por el mismo camino de update.
+    Sin tiempo_real corre headless y sin límite de velocidad.
+    Devuelve un dict con el marcador final y los ticks por segundo.
+    """
+    from engine.game import Game
+
+    header, ticks = load(path)
+    entrada = ReplayInput()
+    game = Game(headless=not tiempo_real, input_source=entrada, async_load=False)
+    game.rng.seed(header["seed"])
+    game.ai_error = header["ai_error"]
+    game.start_match(header["num_players"], header["option_speed"], ai_p1=header["ai_p1"])
+
+    inicio = time.perf_counter()
+    pasos = 0
+    for dt, mask in ticks:
+        if mask & EVENTO:
+            game.aplicar_evento(EVENTOS[mask & ~EVENTO])
+            continue
+        entrada.mask = mask
+        game.step(dt)
+        pasos += 1
+        if tiempo_real:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return None
+            game.alpha = 1.0
+            game._draw()
+            game.clock.tick(1.0 / dt)
+    duracion = time.perf_counter() - inicio
+
+    return {
+        "ticks": pasos,
+        "sets": list(game.sets_ganados),
+        "games": list(game.games_ganados),
+        "puntos": list(game.indices_puntos),
+        "segundos_reales": duracion,
+        "ticks_por_segundo": pasos / duracion if duracion else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reproduce un partido grabado")
+    parser.add_argument("archivo")
+    parser.add_argument("--tiempo-real", action="store_true",
+                        help="con ventana y a la velocidad original")
+    parser.add_argument("--perfil", action="store_true",
+                        help="perfilar la reproducción con cProfile")
+    args = parser.parse_args(argv)
+
+    if args.perfil:
+        import cProfile
+        import pstats
+        perfil = cProfile.Profile()
+        resultado = perfil.runcall(replay, args.archivo, args.tiempo_real)
+        pstats.Stats(perfil).sort_stats("cumulative").print_stats(25)
+    else:
+        resultado = replay(args.archivo, args.tiempo_real)
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
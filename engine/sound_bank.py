@@ -0,0 +1,149 @@
+# engine/sound_bank.py
+"""
+Efectos de sonido de baja latencia.
+
+Todos los efectos se decodifican completos al cargar (pygame.mixer.Sound
+guarda las muestras PCM en memoria) y se reproducen sobre un grupo fijo de
+canales reservados. Si no hay canal libre se le roba el suyo al sonido de
+menor prioridad (y entre iguales al más viejo); si todos son más
+importantes, el efecto nuevo se descarta.
+
+play() solo consulta diccionarios y listas ya armados: nada de archivos ni
+objetos nuevos en el camino del frame.
+
+Si falta el archivo de un efecto se sintetiza uno simple (ver SINTESIS) para
+que el juego suene igual sin assets de audio (la síntesis usa numpy; sin
+numpy esos efectos no suenan).
+"""
+
+import pygame
+
+
+# --- Síntesis de respaldo: nombre -> (duración en s, función (t, ruido) -> muestras en -1..1) ---
+# Las recetas trabajan sobre arrays de numpy (tiempos y ruido) de todo el efecto;
+# reciben el módulo porque numpy es opcional y se importa recién al sintetizar.
+def _golpe(np, t, ruido):
+    return np.exp(-t * 70) * (0.6 * np.sin(2 * np.pi * 900 * t) + 0.4 * ruido)
+
+
+def _bote(np, t, ruido):
+    # Golpe sordo que baja de tono
+    return np.exp(-t * 45) * np.sin(2 * np.pi * (220 - 600 * t) * t)
+
+
+def _red(np, t, ruido):
+    zumbido = np.where(np.sin(2 * np.pi * 110 * t) >= 0, 1.0, -1.0)
+    return np.exp(-t * 20) * (0.5 * zumbido + 0.2 * ruido)
+
+
+def _publico(np, t, ruido):
+    # Aplauso: ruido con subida rápida y caída lenta
+    return np.minimum(1.0, t * 8) * np.exp(-t * 2.2) * ruido
+
+
+SINTESIS = {
+    "golpe": (0.08, _golpe),
+    "bote": (0.10, _bote),
+    "red": (0.20, _red),
+    "publico": (1.40, _publico),
+}
+
+
+def sintetizar_muestras(nombre, frecuencia, canales, volumen=0.5, seed=0):
+    """
+    Muestras PCM de 16 bits (bytes intercalados por canal) del efecto de
+    respaldo `nombre`, o None si no hay receta o falta numpy (el juego
+    queda sin ese efecto). No toca pygame: se puede llamar desde los hilos
+    de carga (ver AssetManager.queue_sound_bank).
+    """
+    receta = SINTESIS.get(nombre)
+    if receta is None:
+        return None
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    duracion, fn = receta
+    n = int(duracion * frecuencia)
+
+    # RNG propio: no toca el de la partida (replays y rollback deterministas)
+    blanco = np.random.default_rng(seed).uniform(-1.0, 1.0, n)
+    # Ruido blanco suavizado con un pasabajos de un polo (r += 0.35 (u - r)),
+    # como convolución con su respuesta al impulso (0.65^64 ya es despreciable)
+    ruido = np.convolve(blanco, 0.35 * 0.65 ** np.arange(64))[:n]
+    t = np.arange(n) / frecuencia
+    v = np.clip(fn(np, t, ruido) * volumen, -1.0, 1.0)
+    muestras = (v * 32767).astype(np.int16)
+    return np.repeat(muestras, canales).tobytes()
+
+
+def sintetizar(nombre, volumen=0.5, seed=0):
+    """
+    Sound con el efecto de respaldo `nombre`, en el formato del mixer ya
+    inicializado. Devuelve None si no hay receta o el formato no es de 16 bits.
+    """
+    init = pygame.mixer.get_init()
+    if init is None or abs(init[1]) != 16:
+        return None
+    frecuencia, _, canales = init
+    muestras = sintetizar_muestras(nombre, frecuencia, canales, volumen, seed)
+    if muestras is None:
+        return None
+    return pygame.mixer.Sound(buffer=muestras)
+
+
+class SoundBank:
+    """
+    Efectos precargados y un grupo fijo de `channels` canales reservados.
+    add(nombre, sound, prioridad) registra un efecto; play(nombre) lo suena.
+    """
+
+    def __init__(self, channels=8):
+        if pygame.mixer.get_num_channels() < channels:
+            pygame.mixer.set_num_channels(channels)
+        # Reservados: Sound.play() suelto nunca los toma
+        pygame.mixer.set_reserved(channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        # Por canal: prioridad y orden de inicio del sonido que lleva
+        self._prioridad = [0] * channels
+        self._inicio = [0] * channels
+        self._contador = 0
+        self.sounds = {}  # nombre -> (Sound, prioridad)
+        self.robados = 0
+        self.descartados = 0
+
+    def add(self, nombre, sound, prioridad=0):
+        self.sounds[nombre] = (sound, prioridad)
+
+    def play(self, nombre):
+        """Suena el efecto. Devuelve el índice del canal usado o -1."""
+        entrada = self.sounds.get(nombre)
+        if entrada is None:
+            return -1
+        sound, prioridad = entrada
+
+        prioridades, inicios = self._prioridad, self._inicio
+        elegido = -1
+        for i in range(len(self.channels)):
+            if not self.channels[i].get_busy():
+                elegido = i
+                break
+            # Víctima: menor prioridad y, a igual prioridad, el más viejo
+            if (elegido < 0 or prioridades[i] < prioridades[elegido]
+                    or (prioridades[i] == prioridades[elegido] and inicios[i] < inicios[elegido])):
+                elegido = i
+        else:
+            if self._prioridad[elegido] > prioridad:
+                self.descartados += 1
+                return -1
+            self.robados += 1
+
+        self._contador += 1
+        prioridades[elegido] = prioridad
+        inicios[elegido] = self._contador
+        self.channels[elegido].play(sound)
+        return elegido
+
+    def stop(self):
+        for canal in self.channels:
+            canal.stop()
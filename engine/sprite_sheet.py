@@ -1,54 +1,218 @@
-import pygame
-import json
-import os
-
-class Spritesheet:
-    def __init__(self, json_path):
-        with open(json_path, "r") as f:
-            self.data = json.load(f)
-
-        # carga la imagen que figura en el JSON
-        image_path = self.data["meta"]["image"]
-        if not os.path.isabs(image_path):
-            image_path = os.path.join(os.path.dirname(json_path), image_path)
-        self.image = pygame.image.load(image_path).convert_alpha()
-
-    def get_frame(self, frame_name):
-        frame = self.data["frames"][frame_name]["frame"]
-        rect = pygame.Rect(frame["x"], frame["y"], frame["w"], frame["h"])
-        surf = pygame.Surface((rect.w, rect.h), pygame.SRCALPHA)
-        surf.blit(self.image, (0, 0), rect)
-        return surf
-
-    def get_animation_frames(self, anim_name, with_duration=False):
-        """
-        Devuelve una lista de frames de la animación.
-        Si with_duration=True, devuelve [(Surface, duration_ms), ...]
-        Caso contrario, solo [Surface, ...]
-        """
-        frames = []
-        if "frameTags" in self.data["meta"]:
-            for tag in self.data["meta"]["frameTags"]:
-                if tag["name"] == anim_name:
-                    for i in range(tag["from"], tag["to"] + 1):
-                        frame_name = f"Sprites {i}.ase"
-                        frame_info = self.data["frames"][frame_name]
-                        duration = frame_info["duration"]
-                        surf = self.get_frame(frame_name)
-                        if with_duration:
-                            frames.append((surf, duration))
-                        else:
-                            frames.append(surf)
-                    return frames
-
-        # fallback por prefijo si no existe el tag
-        for fname, frame_info in self.data["frames"].items():
-            if fname.startswith(anim_name):
-                duration = frame_info["duration"]
-                surf = self.get_frame(fname)
-                if with_duration:
-                    frames.append((surf, duration))
-                else:
-                    frames.append(surf)
-        return frames
-
+import pygame
+import json
+import os
+import pickle
+import weakref
+from bisect import bisect_left
+
+from engine.animation import AnimationClip
+from engine.surface_cache import surface_bytes
+
+
+def convert_alpha(surf):
+    """
+    convert_alpha() solo cuando hay ventana creada.
+    En modo headless no existe display y la Surface se usa tal cual.
+    """
+    if pygame.display.get_surface() is None:
+        return surf
+    return surf.convert_alpha()
+
+
+class Spritesheet:
+    """
+    Spritesheet indexado una sola vez al cargar:
+      - tags:   nombre de animación -> (from, to)
+      - frames: nombre de frame -> (x, y, w, h, duration, ox, oy, sw, sh), en
+                el orden del JSON; (ox, oy) es dónde va el frame recortado
+                dentro del lienzo original de sw x sh (ver atlas_packer)
+
+    Los frames se entregan como subsurface del atlas (comparten sus píxeles,
+    no se copian) y siempre es la misma Surface para el mismo nombre, así
+    los caches que usan la Surface como clave (SurfaceCache) aciertan.
+
+    Dueños: quien guarde clips o frames del spritesheet (p. ej. un
+    GameObject) se registra con acquire(owner) y se quita con
+    release(owner); si el dueño se destruye sale solo. Mientras tenga
+    dueños, in_use() es True y AssetManager no lo libera.
+
+    cache_path: si se indica, el índice ya parseado se guarda ahí con pickle
+    y en el próximo arranque se lee directamente, sin parsear el JSON. El
+    cache se invalida solo si cambia el tamaño o la fecha del JSON.
+    """
+
+    CACHE_VERSION = 2
+
+    def __init__(self, json_path, cache_path=None, index=None, image=None):
+        """
+        index / image: índice y atlas ya cargados (p. ej. en un hilo de
+        AssetManager); si faltan se leen aquí. El atlas se convierte siempre
+        en el hilo principal.
+        """
+        self.json_path = json_path
+
+        if index is None:
+            index = self.load_index(json_path, cache_path)
+
+        self.image_path = index["image"]
+        self.tags = index["tags"]
+        self.frames = index["frames"]
+        self.frame_names = list(self.frames)
+        self._order = {name: i for i, name in enumerate(self.frame_names)}
+        self._sorted_names = sorted(self.frame_names)
+        self._surfaces = {}
+        self._clips = {}
+        self._owners = weakref.WeakSet()
+
+        # carga la imagen que figura en el JSON
+        if image is None:
+            image = pygame.image.load(self.image_path)
+        self.image = convert_alpha(image)
+
+    # --- Índice ---
+    @classmethod
+    def load_index(cls, json_path, cache_path=None):
+        """
+        Índice del JSON (tags, frames, ruta del atlas), desde cache_path si
+        es válido. No toca pygame: se puede llamar desde otro hilo.
+        """
+        index = cls._load_cache(json_path, cache_path) if cache_path else None
+        if index is None:
+            index = cls._build_index(json_path)
+            if cache_path:
+                cls._save_cache(json_path, cache_path, index)
+        return index
+
+    @staticmethod
+    def _build_index(json_path):
+        with open(json_path, "r") as f:
+            data = json.load(f)
+
+        image_path = data["meta"]["image"]
+        if not os.path.isabs(image_path):
+            image_path = os.path.join(os.path.dirname(json_path), image_path)
+
+        frames = {}
+        for name, info in data["frames"].items():
+            r = info["frame"]
+            sss = info.get("spriteSourceSize", {"x": 0, "y": 0})
+            source = info.get("sourceSize", r)
+            frames[name] = (r["x"], r["y"], r["w"], r["h"], info.get("duration", 100),
+                            sss["x"], sss["y"], source["w"], source["h"])
+
+        tags = {tag["name"]: (tag["from"], tag["to"])
+                for tag in data["meta"].get("frameTags", [])}
+        return {"image": image_path, "frames": frames, "tags": tags}
+
+    @classmethod
+    def _source_signature(cls, json_path):
+        st = os.stat(json_path)
+        return (cls.CACHE_VERSION, st.st_size, st.st_mtime_ns)
+
+    @classmethod
+    def _load_cache(cls, json_path, cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get("signature") == cls._source_signature(json_path):
+                return cached["index"]
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+            pass
+        return None
+
+    @classmethod
+    def _save_cache(cls, json_path, cache_path, index):
+        # Si no se puede escribir el cache se sigue sin él
+        try:
+            with open(cache_path, "wb") as f:
+                pickle.dump({"signature": cls._source_signature(json_path), "index": index}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
+
+    # --- Frames ---
+    def get_frame(self, frame_name):
+        surf = self._surfaces.get(frame_name)
+        if surf is None:
+            x, y, w, h = self.frames[frame_name][:4]
+            surf = self.image.subsurface(pygame.Rect(x, y, w, h))
+            self._surfaces[frame_name] = surf
+        return surf
+
+    def memory_bytes(self):
+        """Bytes de píxeles del atlas y de los frames que no lo comparten."""
+        return surface_bytes(self.image) + sum(surface_bytes(s) for s in self._surfaces.values())
+
+    def loaded_frames(self):
+        """Surfaces de los frames ya pedidos (claves de los caches de transformaciones)."""
+        return list(self._surfaces.values())
+
+    def acquire(self, owner):
+        """Registra a owner como usuario de clips o frames de este spritesheet."""
+        self._owners.add(owner)
+
+    def release(self, owner):
+        self._owners.discard(owner)
+
+    def in_use(self):
+        """True si algún dueño registrado con acquire() sigue vivo."""
+        return len(self._owners) > 0
+
+    def get_offset(self, frame_name):
+        """
+        (ox, oy, sw, sh) del frame: posición del recorte dentro del lienzo
+        original y tamaño de ese lienzo. None si el frame no está recortado.
+        """
+        _, _, w, h, _, ox, oy, sw, sh = self.frames[frame_name]
+        if (ox, oy, w, h) == (0, 0, sw, sh):
+            return None
+        return ox, oy, sw, sh
+
+    def _frames_for(self, names, with_duration):
+        if with_duration:
+            return [(self.get_frame(n), self.frames[n][4]) for n in names]
+        return [self.get_frame(n) for n in names]
+
+    def get_animation_frames(self, anim_name, with_duration=False):
+        """
+        Devuelve una lista de frames de la animación.
+        Si with_duration=True, devuelve [(Surface, duration_ms), ...]
+        Caso contrario, solo [Surface, ...]
+        """
+        return self._frames_for(self._names_for(anim_name), with_duration)
+
+    def _names_for(self, anim_name):
+        """Nombres de frame del tag anim_name o, si no existe, de los que empiezan así."""
+        tag = self.tags.get(anim_name)
+        if tag is not None:
+            start, end = tag
+            return self.frame_names[start:end + 1]
+
+        # fallback por prefijo si no existe el tag
+        return self._names_by_prefix(anim_name)
+
+    def get_clip(self, anim_name):
+        """
+        AnimationClip de la animación (ver get_animation_frames). Se arma una
+        sola vez por nombre: todos los que lo piden comparten el mismo clip.
+        """
+        clip = self._clips.get(anim_name)
+        if clip is None:
+            names = self._names_for(anim_name)
+            clip = AnimationClip(self._frames_for(names, True), anim_name,
+                                 offsets=[self.get_offset(n) for n in names])
+            self._clips[anim_name] = clip
+        return clip
+
+    def get_animation_frames_by_prefix(self, prefix, with_duration=False):
+        """Frames cuyo nombre empieza por prefix, en el orden del JSON."""
+        return self._frames_for(self._names_by_prefix(prefix), with_duration)
+
+    def _names_by_prefix(self, prefix):
+        i = bisect_left(self._sorted_names, prefix)
+        matches = []
+        while i < len(self._sorted_names) and self._sorted_names[i].startswith(prefix):
+            matches.append(self._sorted_names[i])
+            i += 1
+        matches.sort(key=self._order.__getitem__)
+        return matches
@@ -0,0 +1,71 @@
+# engine/startup.py
+"""
+Arranque perezoso de subsistemas de pygame y línea de tiempo del arranque.
+
+ensure("font") inicializa un subsistema la primera vez que se usa (display,
+font, mixer, joystick) en vez de pygame.init() completo al empezar. Cada
+inicialización y cada hito (import, init, assets, first_frame) queda en
+`timeline` con su tiempo desde que se importó este módulo.
+"""
+
+import time
+
+import pygame
+
+_T0 = time.perf_counter()
+
+# Buffer chico para que un efecto suene ~12 ms después de pedirlo (el de
+# pygame por defecto ronda los 20-40 ms)
+MIXER_CONFIG = {"frequency": 44100, "size": -16, "channels": 2, "buffer": 512}
+
+
+def _init_mixer():
+    pygame.mixer.pre_init(**MIXER_CONFIG)
+    pygame.mixer.init()
+
+
+_SUBSYSTEMS = {
+    "display": (pygame.display.get_init, pygame.display.init),
+    "font": (pygame.font.get_init, pygame.font.init),
+    "mixer": (pygame.mixer.get_init, _init_mixer),
+    "joystick": (pygame.joystick.get_init, pygame.joystick.init),
+}
+
+
+class StartupTimeline:
+    """Hitos del arranque: nombre -> segundos desde _T0 (solo el primero de cada nombre)."""
+
+    def __init__(self):
+        self.marks = {}
+        # Con verbose se imprime report() en cuanto estén todos los hitos de report_after
+        self.verbose = False
+        self.report_after = ("first_frame",)
+        self._reported = False
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - _T0
+            if self.verbose and not self._reported and all(m in self.marks for m in self.report_after):
+                self._reported = True
+                print(self.report())
+        return self.marks[name]
+
+    def report(self):
+        """Texto con cada hito en ms desde el inicio y la diferencia con el anterior."""
+        lines = ["--- Arranque ---"]
+        previo = 0.0
+        for name, t in sorted(self.marks.items(), key=lambda kv: kv[1]):
+            lines.append(f"{name:<16} {t * 1000:8.1f} ms  (+{(t - previo) * 1000:.1f})")
+            previo = t
+        return "\n".join(lines)
+
+
+timeline = StartupTimeline()
+
+
+def ensure(name):
+    """Inicializa el subsistema `name` si todavía no lo está (y lo anota en timeline)."""
+    get_init, init = _SUBSYSTEMS[name]
+    if not get_init():
+        init()
+        timeline.mark(f"init:{name}")
@@ -0,0 +1,96 @@
+# engine/surface_cache.py
+from collections import OrderedDict
+
+import pygame
+
+
+def surface_bytes(surf):
+    """
+    Bytes de píxeles propios de surf. Una subsurface comparte los píxeles
+    de su padre y cuenta 0.
+    """
+    if surf is None or surf.get_parent() is not None:
+        return 0
+    return surf.get_pitch() * surf.get_height()
+
+
+class SurfaceCache:
+    """
+    Cache LRU de frames transformados (espejo + escala).
+    Clave: (Surface original, flip_x, escala cuantizada).
+
+    La escala se cuantiza en pasos de scale_step para que valores casi
+    iguales (p. ej. la perspectiva de la pelota) compartan la misma Surface.
+    Al superar max_entries se descarta la entrada usada hace más tiempo.
+    `bytes` lleva la memoria de las Surfaces transformadas que guarda.
+    """
+
+    def __init__(self, max_entries=256, scale_step=0.01):
+        self.max_entries = max_entries
+        self.scale_step = scale_step
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+
+    def get(self, frame, flip_x=False, scale=1.0):
+        """Devuelve el frame espejado y escalado, creándolo solo si no está en cache."""
+        # Escala 1 exacta aparte: con pasos que no dividen a 1 (0.03, 0.07...)
+        # cuantizarla daría 0.99 / 0.98 y reescalaría frames que no cambian
+        if scale == 1.0:
+            if not flip_x:
+                return frame  # Sin transformación: no hace falta cachear
+            q = None
+        else:
+            q = round(scale / self.scale_step)
+
+        key = (frame, flip_x, q)
+        img = self._entries.get(key)
+        if img is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return img
+
+        self.misses += 1
+        img = pygame.transform.flip(frame, True, False) if flip_x else frame
+        escala = 1.0 if q is None else q * self.scale_step
+        if escala != 1.0:
+            w, h = frame.get_size()
+            img = pygame.transform.scale(img, (max(1, int(w * escala)), max(1, int(h * escala))))
+
+        self._entries[key] = img
+        self.bytes += surface_bytes(img)
+        if len(self._entries) > self.max_entries:
+            _, viejo = self._entries.popitem(last=False)
+            self.bytes -= surface_bytes(viejo)
+        return img
+
+    def forget(self, frames):
+        """
+        Descarta las transformaciones de `frames` (p. ej. los de un atlas
+        que se libera: si no, el cache lo mantendría vivo).
+        """
+        frames = set(frames)
+        for key in [k for k in self._entries if k[0] in frames]:
+            self.bytes -= surface_bytes(self._entries.pop(key))
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Contadores para depuración: aciertos, fallos, tamaño y tasa de acierto."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def __len__(self):
+        return len(self._entries)
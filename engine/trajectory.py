@@ -0,0 +1,99 @@
+# engine/trajectory.py
+"""
+Predicción analítica de la trayectoria de la pelota.
+
+Se resuelve una sola vez por golpe (en vez de extrapolar en cada frame):
+  - x(t): movimiento uniforme reflejado entre las paredes laterales
+  - y(t): movimiento uniforme en profundidad
+  - z(t): parábolas sucesivas con gravedad, cada rebote multiplica la
+          velocidad vertical por BOUNCE y se corta cuando ya no rebota
+La IA consulta los puntos ya calculados (bote, intercepción).
+"""
+
+import math
+
+
+def reflejar(x, lo, hi):
+    """Posición de un punto que rebota entre lo y hi tras avanzar libremente hasta x."""
+    ancho = hi - lo
+    if ancho <= 0:
+        return lo
+    periodo = 2 * ancho
+    u = (x - lo) % periodo
+    return lo + (u if u <= ancho else periodo - u)
+
+
+class Trajectory:
+    """
+    Trayectoria de la pelota desde (x0, y0, z0) con velocidad (vx, vy, vz),
+    en píxeles y segundos de juego. x_bounds: límites del centro de la pelota.
+    """
+
+    MIN_REBOTE = 20   # Igual que Game: con |vz| menor la pelota ya no rebota
+    MAX_REBOTES = 8
+
+    def __init__(self, x0, y0, z0, vx, vy, vz, gravity, bounce, x_bounds):
+        self.x0, self.y0, self.z0 = x0, y0, z0
+        self.vx, self.vy, self.vz = vx, vy, vz
+        self.gravity = gravity
+        self.bounce = bounce
+        self.x_bounds = x_bounds
+        # Cada tramo: (t_inicio, z_inicio, vz_inicio); se calculan de una vez
+        self.tramos = self._calcular_tramos()
+
+    def _calcular_tramos(self):
+        g = self.gravity
+        tramos = [(0.0, max(0.0, self.z0), self.vz)]
+        t, z, vz = tramos[0]
+        for _ in range(self.MAX_REBOTES):
+            # z + vz*s + g/2*s^2 = 0, raíz positiva (g < 0)
+            disc = vz * vz - 2 * g * z
+            s = (-vz - math.sqrt(disc)) / g if g else None
+            if s is None or s <= 0:
+                break
+            t += s
+            impacto = vz + g * s
+            if abs(impacto) <= self.MIN_REBOTE:
+                tramos.append((t, 0.0, 0.0))
+                break
+            vz = impacto * self.bounce
+            z = 0.0
+            tramos.append((t, z, vz))
+        return tramos
+
+    # --- Consultas ---
+    def x_at(self, t):
+        return reflejar(self.x0 + self.vx * t, *self.x_bounds)
+
+    def y_at(self, t):
+        return self.y0 + self.vy * t
+
+    def z_at(self, t):
+        for t0, z0, vz0 in reversed(self.tramos):
+            if t >= t0:
+                if vz0 == 0 and z0 == 0:
+                    return 0.0
+                s = t - t0
+                return max(0.0, z0 + vz0 * s + 0.5 * self.gravity * s * s)
+        return self.z0
+
+    def landing(self):
+        """Primer bote: (t, x, y), o None si la pelota no vuelve a caer."""
+        if len(self.tramos) < 2:
+            return None
+        t = self.tramos[1][0]
+        return t, self.x_at(t), self.y_at(t)
+
+    def time_at_y(self, y):
+        """Instante en que la pelota llega a la profundidad y (None si no llega)."""
+        if self.vy == 0:
+            return None
+        t = (y - self.y0) / self.vy
+        return t if t >= 0 else None
+
+    def intercept(self, y):
+        """(t, x, z) cuando la pelota pasa por la profundidad y, o None."""
+        t = self.time_at_y(y)
+        if t is None:
+            return None
+        return t, self.x_at(t), self.z_at(t)
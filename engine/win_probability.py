@@ -0,0 +1,196 @@
+# engine/win_probability.py
+"""
+Probabilidad exacta de ganar el partido desde cualquier marcador.
+
+Programación dinámica sobre los estados del tenis (puntos del game o del
+tie-break, games del set, sets y quién saca), con la probabilidad de
+ganar el punto con el saque de cada jugador como único dato:
+
+  - game:      P(el que saca gana el game) desde (puntos saque, puntos resto);
+               el deuce se resuelve en forma cerrada
+  - tie-break: a 7 con diferencia de 2, el saque cambia tras el primer punto
+               y luego cada dos
+  - set:       a GAMES_POR_SET con diferencia de 2 y tie-break en el empate;
+               el resultado incluye quién saca primero en el set siguiente
+  - partido:   al mejor de (2 * sets_para_ganar - 1) sets
+
+odds() memoiza un MatchOdds por combinación de probabilidades y formato:
+las tablas se arman una vez y después cada consulta (p. ej. en el dibujado
+del marcador) son unas pocas búsquedas en diccionarios.
+
+Convenciones: jugadores 1 y 2; las probabilidades devueltas son siempre
+de que gane el jugador 1.
+"""
+
+from functools import lru_cache
+
+
+class MatchOdds:
+    """
+    p1_saque: probabilidad de que el jugador 1 gane un punto con su saque.
+    p2_saque: ídem para el jugador 2 con el suyo.
+    """
+
+    PUNTOS_TIEBREAK = 7
+
+    def __init__(self, p1_saque, p2_saque, sets_para_ganar=2, games_por_set=6):
+        self.p1_saque = p1_saque
+        self.p2_saque = p2_saque
+        self.sets_para_ganar = sets_para_ganar
+        self.games_por_set = games_por_set
+
+        # P(gana J1 el punto) según quién saca
+        self._punto = {1: p1_saque, 2: 1 - p2_saque}
+        self._game = {}      # (sacador, puntos saque, puntos resto) -> P(gana el sacador)
+        self._tiebreak = {}  # (primer sacador, a, b) -> P(gana J1)
+        self._set = {}       # (g1, g2, sacador) -> (J1 y saca 1, J1 y saca 2, J2 y saca 1, J2 y saca 2)
+        self._partido = {}   # (s1, s2, sacador) -> P(gana J1)
+
+        # Todas las tablas de una vez: las consultas posteriores no calculan nada
+        for sacador in (1, 2):
+            for s1 in range(sets_para_ganar + 1):
+                for s2 in range(sets_para_ganar + 1):
+                    self._p_partido(s1, s2, sacador)
+            for g1 in range(games_por_set + 2):
+                for g2 in range(games_por_set + 2):
+                    self._p_set(g1, g2, sacador)
+            for a in range(5):
+                for b in range(5):
+                    self._p_game(sacador, a, b)
+
+    # --- Game ---
+    def _p_game(self, sacador, a, b):
+        """P(el sacador gana el game) con a puntos suyos y b del resto (índices 0, 15, 30, 40, AD)."""
+        clave = (sacador, a, b)
+        p = self._game.get(clave)
+        if p is not None:
+            return p
+        q = self._punto[sacador] if sacador == 1 else 1 - self._punto[sacador]
+        deuce = q * q / (q * q + (1 - q) * (1 - q))
+        if a >= 3 and b >= 3:
+            # 40-40, ventaja saque (4, 3) o ventaja resto (3, 4)
+            p = deuce if a == b else (q + (1 - q) * deuce if a > b else q * deuce)
+        elif a >= 4:
+            p = 1.0
+        elif b >= 4:
+            p = 0.0
+        else:
+            p = q * self._p_game(sacador, a + 1, b) + (1 - q) * self._p_game(sacador, a, b + 1)
+        self._game[clave] = p
+        return p
+
+    def p_game_j1(self, sacador, puntos_j1, puntos_j2):
+        """P(gana J1 el game en curso) con los índices de puntos de cada jugador."""
+        if sacador == 1:
+            return self._p_game(1, puntos_j1, puntos_j2)
+        return 1 - self._p_game(2, puntos_j2, puntos_j1)
+
+    # --- Tie-break ---
+    def _p_tiebreak(self, primero, a, b):
+        """P(gana J1 el tie-break) con a puntos de J1 y b de J2; `primero` sacó el primer punto."""
+        meta = self.PUNTOS_TIEBREAK
+        if a >= meta and a - b >= 2:
+            return 1.0
+        if b >= meta and b - a >= 2:
+            return 0.0
+        clave = (primero, a, b)
+        p = self._tiebreak.get(clave)
+        if p is not None:
+            return p
+        if a == b and a >= meta - 1:
+            # Empate desde 6-6: cada par de puntos lo saca uno de cada uno
+            u, v = self._punto[1], self._punto[2]
+            p = u * v / (u * v + (1 - u) * (1 - v))
+        else:
+            w = self._punto[sacador_tiebreak(primero, a + b)]
+            p = w * self._p_tiebreak(primero, a + 1, b) + (1 - w) * self._p_tiebreak(primero, a, b + 1)
+        self._tiebreak[clave] = p
+        return p
+
+    # --- Set ---
+    def _p_set(self, g1, g2, sacador):
+        """
+        Distribución del final del set desde g1-g2 con `sacador` en el próximo
+        game: (J1 y saca 1, J1 y saca 2, J2 y saca 1, J2 y saca 2), donde
+        "saca" es quien abre el set siguiente.
+        """
+        clave = (g1, g2, sacador)
+        r = self._set.get(clave)
+        if r is not None:
+            return r
+        meta = self.games_por_set
+        if g1 >= meta and g1 - g2 >= 2:
+            r = (1.0, 0.0, 0.0, 0.0) if sacador == 1 else (0.0, 1.0, 0.0, 0.0)
+        elif g2 >= meta and g2 - g1 >= 2:
+            r = (0.0, 0.0, 1.0, 0.0) if sacador == 1 else (0.0, 0.0, 0.0, 1.0)
+        elif g1 == g2 == meta:
+            # Tie-break: el set siguiente lo abre quien recibió el primer punto
+            pt = self._p_tiebreak(sacador, 0, 0)
+            r = _resultado_set(pt, 3 - sacador)
+        elif g1 > meta or g2 > meta:
+            # Marcador imposible (p. ej. 8-6 sin diferencia previa): no se usa
+            r = (0.0, 0.0, 0.0, 0.0)
+        else:
+            pg = self.p_game_j1(sacador, 0, 0)
+            gana = self._p_set(g1 + 1, g2, 3 - sacador)
+            pierde = self._p_set(g1, g2 + 1, 3 - sacador)
+            r = tuple(pg * x + (1 - pg) * y for x, y in zip(gana, pierde))
+        self._set[clave] = r
+        return r
+
+    # --- Partido ---
+    def _p_partido(self, s1, s2, sacador):
+        """P(gana J1 el partido) al empezar un set con s1-s2 y `sacador` abriéndolo."""
+        meta = self.sets_para_ganar
+        if s1 >= meta:
+            return 1.0
+        if s2 >= meta:
+            return 0.0
+        clave = (s1, s2, sacador)
+        p = self._partido.get(clave)
+        if p is None:
+            p = self._tras_set(s1, s2, self._p_set(0, 0, sacador))
+            self._partido[clave] = p
+        return p
+
+    def _tras_set(self, s1, s2, resultado):
+        j1_s1, j1_s2, j2_s1, j2_s2 = resultado
+        return (j1_s1 * self._p_partido(s1 + 1, s2, 1) + j1_s2 * self._p_partido(s1 + 1, s2, 2) +
+                j2_s1 * self._p_partido(s1, s2 + 1, 1) + j2_s2 * self._p_partido(s1, s2 + 1, 2))
+
+    def win_probability(self, puntos, games, sets, sacador, tiebreak=False, primero_tiebreak=None):
+        """
+        P(gana J1 el partido) desde el marcador en vivo.
+        puntos: índices de puntos del game (0..4 como Game.puntos_tenis) o,
+                en tie-break, puntos de cada uno. games / sets: de cada jugador.
+        sacador: quién saca el punto actual (1 o 2).
+        primero_tiebreak: quién sacó el primer punto del tie-break.
+        """
+        s1, s2 = sets
+        g1, g2 = games
+        if tiebreak:
+            pt = self._p_tiebreak(primero_tiebreak or sacador, puntos[0], puntos[1])
+            return self._tras_set(s1, s2, _resultado_set(pt, 3 - (primero_tiebreak or sacador)))
+        pg = self.p_game_j1(sacador, puntos[0], puntos[1])
+        siguiente = 3 - sacador
+        gana = self._p_set(g1 + 1, g2, siguiente)
+        pierde = self._p_set(g1, g2 + 1, siguiente)
+        return pg * self._tras_set(s1, s2, gana) + (1 - pg) * self._tras_set(s1, s2, pierde)
+
+
+def sacador_tiebreak(primero, n):
+    """Quién saca el punto n (desde 0) de un tie-break que abrió `primero`."""
+    return primero if ((n + 1) // 2) % 2 == 0 else 3 - primero
+
+
+def _resultado_set(p_j1, abre_siguiente):
+    """Distribución de _p_set para un set que gana J1 con p_j1 y cuyo siguiente abre `abre_siguiente`."""
+    if abre_siguiente == 1:
+        return (p_j1, 0.0, 1 - p_j1, 0.0)
+    return (0.0, p_j1, 0.0, 1 - p_j1)
+
+
+@lru_cache(maxsize=64)
+def odds(p1_saque, p2_saque, sets_para_ganar=2, games_por_set=6):
+    """MatchOdds memoizado por probabilidades de saque y formato."""
+    return MatchOdds(p1_saque, p2_saque, sets_para_ganar, games_por_set)
@@ -1,10 +1,41 @@
 # main.py FINAL
+import argparse
 import os
 import sys
+from engine import startup
 import pygame
 from engine.game import Game
 
+startup.timeline.mark("import")
+
+
+def tam_ventana(texto):
+    """'1920x1080' -> (1920, 1080)"""
+    try:
+        ancho, alto = (int(v) for v in texto.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tamaño inválido: {texto!r} (usar ANCHOxALTO)")
+    return ancho, alto
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tor TENNIS")
+    parser.add_argument("--grabar", metavar="ARCHIVO",
+                        help="graba el partido para reproducirlo con python -m engine.replay")
+    parser.add_argument("--arranque", action="store_true",
+                        help="muestra los tiempos de arranque (import, init, assets, primer frame)")
+    parser.add_argument("--ventana", metavar="ANCHOxALTO", type=tam_ventana,
+                        help="tamaño de la ventana (la imagen de 640x480 se escala)")
+    parser.add_argument("--pantalla-completa", action="store_true",
+                        help="pantalla completa a la resolución del escritorio")
+    parser.add_argument("--filtro", choices=Game.SCALE_FILTERS, default="nearest",
+                        help="filtro del escalado: nearest (píxeles enteros) o smooth")
+    args = parser.parse_args()
+    startup.timeline.verbose = args.arranque
+    startup.timeline.report_after = ("assets", "first_frame")
+    # Rutas relativas al directorio desde donde se lanzó, antes del chdir
+    record_path = os.path.abspath(args.grabar) if args.grabar else None
+
     try:
         # Fijar el directorio de trabajo (para rutas de assets)
         base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -16,7 +47,8 @@ if __name__ == "__main__":
     # pero no hace daño dejarlo. Lo quitamos para mayor limpieza.
     
     try:
-        game = Game()
+        game = Game(record_path=record_path, window_size=args.ventana,
+                    fullscreen=args.pantalla_completa, scale_filter=args.filtro)
         game.game_loop() # o game.run() si usas el método original
     except Exception as e:
         print(f"[ERROR] {e}", file=sys.stderr)